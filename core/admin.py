@@ -2,12 +2,16 @@ from django.contrib import admin
 
 from django import forms
 from django.shortcuts import redirect
-from django.urls import path
+from django.http import JsonResponse
+from django.urls import path, reverse
 from django.contrib import messages
-from django.db import transaction
 from django.template.response import TemplateResponse
 
-from core.models import Profile, ClassName, Subject, Chapter, Question
+from core.changelist import AutocompleteListFilter, EstimatedCountPaginator
+from core.importers import DEFAULT_BATCH_SIZE, DEFAULT_NEAR_DUPLICATES
+from core.jobs import enqueue
+from core.models import Profile, ClassName, Subject, Chapter, Question, QuestionChapter, Job
+from core.search import search_questions
 
 
 # Register your models here.
@@ -27,21 +31,44 @@ class SubjectAdmin(admin.ModelAdmin):
     list_display = ('name', 'class_name',)
     list_filter = ('class_name',)
     search_fields = ('name',)
+    ordering = ('name', 'id')  # autocomplete ফলাফলের স্থির ক্রম
 
 
 class ChapterAdmin(admin.ModelAdmin):
     list_display = ('name', 'subject')
     list_filter = ('name', 'subject')
     search_fields = ('name',)
+    ordering = ('name', 'id')
+
+
+class QuestionChapterInline(admin.TabularInline):
+    # একটি প্রশ্ন আরও অধ্যায়ে যোগ করতে — কপি তৈরি না করে শুধু লিংক
+    model = QuestionChapter
+    extra = 1
+    autocomplete_fields = ('chapter',)
+    verbose_name = 'অধ্যায়'
+    verbose_name_plural = 'যে অধ্যায়গুলোতে প্রশ্নটি আছে'
 
 
 class QuestionAdmin(admin.ModelAdmin):
     list_display = ('id', 'short_text',  'question_type_display', 'class_name', 'subject', 'chapter', 'created_at')
-    list_filter = ('question_type', 'class_name', 'subject', 'chapter')
+    # বড় টেবিল: FK এক join-এ, COUNT(*) এর বদলে আনুমানিক সংখ্যা, subject/chapter ফিল্টার autocomplete দিয়ে
+    list_select_related = ('class_name', 'subject', 'chapter')
+    list_filter = ('question_type', 'class_name', ('subject', AutocompleteListFilter),
+                   ('chapters', AutocompleteListFilter))
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    inlines = [QuestionChapterInline]
     # list_editable = ('question_type',)
     search_fields = ('text', 'option_a', 'option_b', 'option_c', 'option_d')
+    search_help_text = 'প্রশ্ন বা অপশনের শব্দ লিখুন (full-text সার্চ)'
     change_list_template = 'admin/questions_change_list.html'
 
+    class Media:
+        css = {'all': ('admin/css/vendor/select2/select2.css', 'admin/css/autocomplete.css')}
+        js = ('admin/js/vendor/jquery/jquery.js', 'admin/js/vendor/select2/select2.full.js',
+              'admin/js/jquery.init.js', 'admin/js/autocomplete.js', 'assets/js/admin-autocomplete-filter.js')
+
     def get_urls(self):
         urls = super().get_urls()
         custom_urls = [
@@ -52,94 +79,51 @@ class QuestionAdmin(admin.ModelAdmin):
     def upload_csv(self, request):
         class QuestionUploadForm(forms.Form):
             csv_file = forms.FileField()
+            batch_size = forms.IntegerField(required=False, min_value=1, initial=DEFAULT_BATCH_SIZE)
+            near_duplicates = forms.ChoiceField(
+                choices=[('flag', 'তালিকায় দেখাও, তবে ইমপোর্ট করো'),
+                         ('skip', 'বাদ দাও'),
+                         ('off', 'যাচাই করো না')],
+                initial=DEFAULT_NEAR_DUPLICATES,
+                label='প্রায়-একই প্রশ্ন',
+            )
 
         if request.method == 'POST':
             form = QuestionUploadForm(request.POST, request.FILES)
             if form.is_valid():
-                f = form.cleaned_data['csv_file']
-                import csv, io
-                decoded = f.read().decode('utf-8')
-                reader = csv.DictReader(io.StringIO(decoded))
-                created = 0
-                errors = []
-                notes = []
-                for row_num, row in enumerate(reader, start=2):
-                    try:
-                        # Try common column names for class
-                        class_name = (row.get('class_name') or row.get('class') or row.get('class_id') or '').strip()
-                        subject_name = (row.get('subject') or '').strip()
-
-                        # If class_name not provided, try to infer from an existing Subject record
-                        class_obj = None
-                        subject_obj = None
-                        if class_name:
-                            class_obj, _ = ClassName.objects.get_or_create(name=class_name)
-
-                        if not subject_name:
-                            raise ValueError('missing subject')
-
-                        # If class wasn't provided but a matching subject exists in DB, infer class from it
-                        if not class_obj:
-                            subj_match = Subject.objects.filter(name__iexact=subject_name).select_related('class_name').first()
-                            if subj_match:
-                                subject_obj = subj_match
-                                class_obj = subj_match.class_name
-                            else:
-                                # Fallback: create/use an 'Unspecified' class so rows without class_name are still imported.
-                                class_obj, _ = ClassName.objects.get_or_create(name='Unspecified')
-                                notes.append(f"Row {row_num}: class_name missing; assigned fallback class 'Unspecified' for subject '{subject_name}'")
-
-                        # If subject_obj wasn't inferred above, create/get it using the determined class_obj
-                        if not subject_obj:
-                            subject_obj, _ = Subject.objects.get_or_create(name=subject_name, class_name=class_obj)
-
-                        chap_name = (row.get('chapter') or '').strip()
-                        if chap_name:
-                            chapter_obj, _ = Chapter.objects.get_or_create(name=chap_name, subject=subject_obj)
-                        else:
-                            chapter_obj = None
-
-                        text = (row.get('text') or row.get('question') or '').strip()
-                        if not text:
-                            raise ValueError('missing question text')
-
-                        question_type = (row.get('question_type') or 'mcq').strip()
-
-                        with transaction.atomic():
-                            Question.objects.create(
-                                text=text,
-                                question_type=question_type,
-                                class_name=class_obj,
-                                subject=subject_obj,
-                                chapter=chapter_obj,
-                                option_a=row.get('option_a') or None,
-                                option_b=row.get('option_b') or None,
-                                option_c=row.get('option_c') or None,
-                                option_d=row.get('option_d') or None,
-                                correct_option=(row.get('correct_option') or '').strip() or None
-                            )
-                        created += 1
-                    except Exception as e:
-                        errors.append(f'Row {row_num}: {str(e)}')
-
-                messages.success(request, f'Created {created} questions. {len(errors)} rows failed.')
-                if errors:
-                    max_show = 10
-                    show = errors[:max_show]
-                    more = len(errors) - len(show)
-                    err_text = '; '.join(show)
-                    if more > 0:
-                        err_text += f'; and {more} more...'
-                    messages.warning(request, err_text)
-                return redirect('..')
+                # বড় ফাইল request-এর ভিতরে প্রসেস না করে worker-এর জন্য job হিসেবে জমা রাখা হয়
+                job = enqueue(
+                    'import_questions_csv',
+                    payload={'batch_size': form.cleaned_data.get('batch_size'),
+                             'near_duplicates': form.cleaned_data['near_duplicates']},
+                    upload=form.cleaned_data['csv_file'],
+                    user=request.user,
+                )
+                status_url = reverse('job_status', args=[job.id])
+                if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+                    return JsonResponse({'job_id': job.id, 'status_url': status_url,
+                                         'message': 'আপলোড সম্পন্ন, ইমপোর্ট চলছে…'}, status=202)
+                messages.info(request, f'CSV ইমপোর্ট job #{job.id} শুরু হয়েছে।')
+                return redirect(f'{request.path}?job={job.id}')
         else:
             form = QuestionUploadForm()
+        job = None
+        job_id = request.GET.get('job')
+        if job_id and job_id.isdigit():
+            job = Job.objects.filter(id=int(job_id)).first()
         context = dict(
             self.admin_site.each_context(request),
             form=form,
+            job=job,
         )
         return TemplateResponse(request, 'admin/questions_upload.html', context)
 
+    def get_search_results(self, request, queryset, search_term):
+        # search_fields-এর LIKE '%x%' এর বদলে full-text ইনডেক্স ব্যবহার করা হয়
+        if not search_term.strip():
+            return queryset, False
+        return search_questions(queryset, search_term), False
+
     def short_text(self, obj):
         return (obj.text[:80] + '...') if getattr(obj, 'text', None) and len(obj.text) > 80 else getattr(obj, 'text', '')
     short_text.short_description = 'Question'
@@ -152,11 +136,18 @@ class QuestionAdmin(admin.ModelAdmin):
         return getattr(obj, 'question_type', '')
     question_type_display.short_description = 'Question Type'
 
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'processed', 'total', 'succeeded', 'failed', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    readonly_fields = ('started_at', 'finished_at', 'worker')
+
+
 admin.site.register(Profile, ProfileAdmin)
 admin.site.register(ClassName, ClassNameAdmin)
 admin.site.register(Subject, SubjectAdmin)
 admin.site.register(Chapter, ChapterAdmin)
 admin.site.register(Question, QuestionAdmin)
+admin.site.register(Job, JobAdmin)
 admin.site.site_header = "স্বাগতম - ই-প্রশ্ন ব্যাংক"         # হেডার
 admin.site.site_title = "ই-প্রশ্ন ব্যাংক | এডমিন প্যানেল"       # ব্রাউজার ট্যাব
 admin.site.index_title = "ই-প্রশ্ন ব্যাংক"  # ড্যাশবোর্ড হোম
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.core import checks
+
+        from core import signals  # noqa: F401  (signal receivers রেজিস্টার করে)
+        from core.pdf import check_fonts
+        checks.register(check_fonts, deploy=True)
@@ -0,0 +1,184 @@
+# file: core/async_views.py
+"""
+ASGI প্রোফাইলের (question_bank.settings_asgi) জন্য হট read endpoint-গুলোর async সংস্করণ।
+
+URL ও নাম core.views-এর মতোই (core/urls_async.py আগে বসে সেগুলো ঢেকে দেয়),
+রেসপন্সও হুবহু এক। ডাটাবেসের অপেক্ষা async ORM দিয়ে হয়, তাই অপেক্ষার সময়
+worker thread আটকে থাকে না। taxonomy ও লোকেশন ডেটা সাধারণত মেমরি থেকেই আসে;
+শুধু ক্যাশ মিস হলে `taxonomy.aget_tree()` async ORM-এ ট্রি বানায়।
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.db.models import Count, Q
+from django.http import JsonResponse
+from django.shortcuts import render
+from django.urls import reverse
+
+from . import availability, locations, taxonomy
+from .http_cache import location_conditional, taxonomy_conditional
+from .membership import filter_chapters
+from .models import Question, QuestionPaper
+from .pagination import akeyset_page, parse_per_page, parse_start
+from .question_types import normalize_question_type
+from .search import asearch_questions
+
+
+@location_conditional
+async def ajax_load_districts(request):
+    return JsonResponse(locations.districts(request.GET.get('division')), safe=False)
+
+
+@location_conditional
+async def ajax_load_thanas(request):
+    thanas = locations.thanas(request.GET.get('division'), request.GET.get('district'))
+    return JsonResponse(thanas, safe=False)
+
+
+@taxonomy_conditional
+async def ajax_load_subjects(request):
+    tree = await taxonomy.aget_tree()
+    return JsonResponse(taxonomy.get_subjects(request.GET.get('class_id'), tree), safe=False)
+
+
+@taxonomy_conditional
+async def ajax_load_chapters(request):
+    tree = await taxonomy.aget_tree()
+    return JsonResponse(taxonomy.get_chapters(request.GET.get('subject_id'), tree), safe=False)
+
+
+@taxonomy_conditional
+async def ajax_load_class_tree(request):
+    tree = taxonomy.class_tree(request.GET.get('class_id'), await taxonomy.aget_tree())
+    if tree is None:
+        return JsonResponse({'error': 'invalid class'}, status=404)
+    return JsonResponse(tree)
+
+
+@login_required
+async def teacher_question_select(request):
+    """Async core.views.teacher_question_select (same parameters, JSON and page)."""
+    tree = await taxonomy.aget_tree()
+    classes = taxonomy.get_classes(tree)
+    subjects = []
+    chapters = []
+    questions = []
+    page = None
+    available = None
+    show_questions = False
+
+    class_id = request.GET.get('class_id')
+    subject_id = request.GET.get('subject_id')
+    chapter_ids_raw = request.GET.get('chapter_ids') or request.GET.get('chapter_id') or ''
+    chapter_ids = [int(x) for x in str(chapter_ids_raw).split(',') if x.strip().isdigit()]
+    qtype_key = normalize_question_type((request.GET.get('question_type') or '').strip())
+
+    if class_id:
+        subjects = taxonomy.get_subjects(class_id, tree)
+    if subject_id:
+        chapters = taxonomy.get_chapters(subject_id, tree)
+
+    if class_id and subject_id and chapter_ids and qtype_key:
+        show_questions = True
+        base_qs = filter_chapters(Question.objects.filter(
+            class_name_id=class_id,
+            subject_id=subject_id,
+            question_type=qtype_key,
+        ), chapter_ids)
+        page = await akeyset_page(
+            base_qs,
+            cursor=request.GET.get('cursor'),
+            per_page=parse_per_page(request.GET.get('question_count')),
+            start_index=parse_start(request.GET.get('start')),
+        )
+        questions = page.items
+        available = await availability.aavailable_count(class_id, subject_id, chapter_ids, qtype_key)
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'questions': [q.as_dict() for q in questions],
+            'available': available,
+            'has_next': bool(page and page.has_next),
+            'next_cursor': page.next_cursor if page else None,
+            'next_start': page.next_start_index if page else None,
+        })
+
+    return await sync_to_async(render)(request, 'core/teacher_select_questions.html', {
+        'classes': classes,
+        'subjects': subjects,
+        'chapters': chapters,
+        'questions': questions,
+        'page': page,
+        'available': available,
+        'show_questions': show_questions,
+    })
+
+
+@login_required
+async def teacher_search_questions(request):
+    """Async core.views.teacher_search_questions (same parameters and JSON)."""
+    query = (request.GET.get('q') or '').strip()
+    if not query:
+        return JsonResponse({'error': 'q is required'}, status=400)
+
+    qs = Question.objects.all()
+    class_id = request.GET.get('class_id')
+    subject_id = request.GET.get('subject_id')
+    chapter_ids = [int(x) for x in (request.GET.get('chapter_ids') or '').split(',') if x.strip().isdigit()]
+    qtype_key = normalize_question_type(request.GET.get('question_type') or '')
+    if class_id and class_id.isdigit():
+        qs = qs.filter(class_name_id=class_id)
+    if subject_id and subject_id.isdigit():
+        qs = qs.filter(subject_id=subject_id)
+    if chapter_ids:
+        qs = filter_chapters(qs, chapter_ids)
+    if qtype_key:
+        qs = qs.filter(question_type=qtype_key)
+
+    try:
+        limit = min(max(int(request.GET.get('limit') or 20), 1), 100)
+    except ValueError:
+        limit = 20
+
+    qs = (await asearch_questions(qs, query)).order_by('-created_at', '-id')
+    results = [row async for row in qs.values(
+        'id', 'text', 'question_type', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_option',
+        'class_name_id', 'subject_id', 'chapter_id',
+    )[:limit]]
+    return JsonResponse({'query': query, 'count': len(results), 'results': results})
+
+
+@login_required
+async def my_papers_list(request):
+    """Async core.views.my_papers_list; the HTML template still renders in a thread."""
+    user = await request.auser()
+    papers_list = QuestionPaper.objects.filter(
+        Q(creator=user) | Q(creator__isnull=True)
+    ).select_related('class_level').prefetch_related('subjects').annotate(question_total=Count('questions'))
+
+    papers = await akeyset_page(
+        papers_list,
+        cursor=request.GET.get('cursor'),
+        per_page=10,
+        start_index=parse_start(request.GET.get('start')),
+    )
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'papers': [
+                {
+                    'id': p.id,
+                    'program_name': p.program_name,
+                    'question_type': p.question_type,
+                    'number_of_questions': p.number_of_questions,
+                    'created_at': p.created_at.isoformat(),
+                    'detail_url': reverse('paper_detail', args=[p.id]),
+                }
+                for p in papers
+            ],
+            'has_next': papers.has_next,
+            'next_cursor': papers.next_cursor,
+            'next_start': papers.next_start_index,
+        })
+
+    # টেমপ্লেট combined পেপারের প্রথম প্রশ্ন lazily পড়ে, তাই sync context-এ রেন্ডার
+    return await sync_to_async(render)(request, 'core/my_papers_list.html', {'papers': papers})
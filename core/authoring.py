@@ -0,0 +1,164 @@
+# file: core/authoring.py
+"""
+বাইরের authoring টুল ও প্রশ্ন তৈরির মডাল থেকে একসাথে অনেক প্রশ্ন লেখা।
+
+প্রতিটি item-এর class/subject/chapter ক্যাশ করা taxonomy ট্রি (core.taxonomy)
+থেকে মেলানো হয় — id বা নাম দুটোই চলে, আর যাচাইয়ে কোনো query লাগে না।
+এরপর সব বৈধ প্রশ্ন একটি transaction-এ একটি `bulk_create` দিয়ে লেখা হয়
+(core.membership.store_questions) — প্রতিটি item একটি প্রশ্ন, তার সব অধ্যায়
+membership লিংক হিসেবে; একই কনটেন্টের প্রশ্ন আগে থেকে থাকলে সেটিতেই লিংক যোগ হয়।
+
+Item ফরম্যাট:
+    {"class": 3 | "নবম শ্রেণি", "subject": 12 | "গণিত",
+     "chapters": [40, "বীজগণিত", ...],            # ঐচ্ছিক; প্রথমটি প্রধান অধ্যায়
+     "question_type": "mcq", "text": "...",
+     "options": {"a": "...", "b": "...", "c": "...", "d": "..."},   # বা option_a..option_d
+     "correct_option": "a" | "ক", "category": "sa"}
+"""
+from django.conf import settings
+from django.db import transaction
+
+from core import taxonomy
+from core.membership import store_questions
+from core.models import Question
+from core.question_types import normalize_question_type
+
+MAX_BATCH_SIZE = getattr(settings, 'AUTHORING_MAX_BATCH', 1000)
+OPTION_KEYS = ('a', 'b', 'c', 'd')
+# বাংলা অপশন লেবেলও গ্রহণযোগ্য; সংরক্ষণ হয় a-d হিসেবে
+_BN_OPTIONS = {'ক': 'a', 'খ': 'b', 'গ': 'c', 'ঘ': 'd'}
+CATEGORIES = {key for key, _ in Question.CATEGORY_CHOICES}
+QUESTION_TYPES = {key for key, _ in Question.QUESTION_TYPE_CHOICES}
+
+
+class TaxonomyIndex:
+    """Id and name lookups over one snapshot of the cached taxonomy tree."""
+
+    def __init__(self, tree=None):
+        tree = tree or taxonomy.get_tree()
+        self.classes = {c['id']: c for c in tree['classes']}
+        self.subjects = tree['subjects']
+        self.chapters = tree['chapters']
+        self.class_names = {c['name'].strip().lower(): c['id'] for c in tree['classes']}
+        self.subject_names = {(s['class_name_id'], s['name'].strip().lower()): s['id'] for s in self.subjects.values()}
+        self.chapter_names = {(ch['subject_id'], ch['name'].strip().lower()): ch['id'] for ch in self.chapters.values()}
+
+    @staticmethod
+    def _lookup(value, by_id, by_name, scope=None):
+        if isinstance(value, bool) or value in (None, ''):
+            return None
+        if isinstance(value, int) or (isinstance(value, str) and value.strip().isdigit()):
+            return int(value) if int(value) in by_id else None
+        if isinstance(value, str):
+            key = value.strip().lower()
+            return by_name.get(key if scope is None else (scope, key))
+        return None
+
+    def class_id(self, value):
+        return self._lookup(value, self.classes, self.class_names)
+
+    def subject_id(self, value, class_id):
+        subject_id = self._lookup(value, self.subjects, self.subject_names, class_id)
+        if subject_id is not None and self.subjects[subject_id]['class_name_id'] != class_id:
+            return None
+        return subject_id
+
+    def chapter_id(self, value, subject_id):
+        chapter_id = self._lookup(value, self.chapters, self.chapter_names, subject_id)
+        if chapter_id is not None and self.chapters[chapter_id]['subject_id'] != subject_id:
+            return None
+        return chapter_id
+
+
+def _text(value):
+    return value.strip() if isinstance(value, str) else ''
+
+
+def validate_item(item, index):
+    """Return (field values, [chapter_id, ...], errors) for one raw item."""
+    if not isinstance(item, dict):
+        return None, [], ['item must be a JSON object']
+    errors = []
+
+    class_id = index.class_id(item.get('class', item.get('class_id')))
+    if class_id is None:
+        errors.append('unknown class')
+    subject_id = None
+    if class_id is not None:
+        subject_id = index.subject_id(item.get('subject', item.get('subject_id')), class_id)
+        if subject_id is None:
+            errors.append('unknown subject for this class')
+
+    chapters = item.get('chapters') or []
+    if not isinstance(chapters, list):
+        chapters = [chapters]
+    chapter_ids = []
+    if subject_id is not None:
+        for value in chapters:
+            chapter_id = index.chapter_id(value, subject_id)
+            if chapter_id is None:
+                errors.append(f'unknown chapter for this subject: {value!r}')
+            elif chapter_id not in chapter_ids:
+                chapter_ids.append(chapter_id)
+
+    text = _text(item.get('text'))
+    if not text:
+        errors.append('question text is required')
+
+    question_type = normalize_question_type(_text(item.get('question_type')) or 'mcq')
+    if question_type not in QUESTION_TYPES:
+        errors.append(f'unknown question_type: {item.get("question_type")!r}')
+
+    options = item.get('options') if isinstance(item.get('options'), dict) else {}
+    values = {f'option_{k}': _text(options.get(k, item.get(f'option_{k}'))) or None for k in OPTION_KEYS}
+
+    correct = _text(item.get('correct_option', item.get('answer'))).lower()
+    correct = _BN_OPTIONS.get(correct, correct) or None
+    if question_type == 'mcq':
+        if sum(1 for v in values.values() if v) < 2:
+            errors.append('mcq needs at least two options')
+        if correct is not None and (correct not in OPTION_KEYS or not values[f'option_{correct}']):
+            errors.append('correct_option must name one of the given options (a-d / ক-ঘ)')
+    elif correct is not None and len(correct) > 2:
+        errors.append('correct_option is too long')
+
+    category = _text(item.get('category')) or 'sa'
+    if category not in CATEGORIES:
+        errors.append(f'unknown category: {category!r}')
+
+    fields = dict(values, text=text, question_type=question_type, class_name_id=class_id,
+                  subject_id=subject_id, correct_option=correct, category=category)
+    return fields, chapter_ids, errors
+
+
+def create_questions(items, all_or_nothing=False):
+    """Validate `items` in one pass and bulk-insert the valid ones in one transaction.
+
+    Returns per-item results in input order:
+        {'index': i, 'ok': True, 'id': question_id, 'created': bool}   # created=False: same content existed
+        {'index': i, 'ok': False, 'errors': [...]}
+    With all_or_nothing, nothing is written when any item is invalid.
+    """
+    index = TaxonomyIndex()
+    results = []
+    pending = []  # (result, (Question, chapter_ids))
+    for i, item in enumerate(items):
+        fields, chapter_ids, errors = validate_item(item, index)
+        if errors:
+            results.append({'index': i, 'ok': False, 'errors': errors})
+            continue
+        result = {'index': i, 'ok': True}
+        results.append(result)
+        pending.append((result, (Question(**fields), chapter_ids)))
+
+    if all_or_nothing and len(pending) != len(results):
+        for result, _ in pending:
+            result.update(ok=False, errors=['not saved: other items in the batch are invalid'])
+        return results
+
+    if pending:
+        with transaction.atomic():
+            stored = store_questions([entry for _, entry in pending], batch_size=MAX_BATCH_SIZE)
+        for (result, _), (question, created) in zip(pending, stored):
+            result.update(id=question.id, created=created)
+    return results
@@ -0,0 +1,207 @@
+# file: core/availability.py
+"""
+class/subject/chapter/type অনুযায়ী কতগুলো প্রশ্ন আছে তা আগে থেকে গোনা থাকে (QuestionCount)।
+
+সিলেকশন পেজ, পেপার ফর্ম আর ড্যাশবোর্ড প্রতিবার COUNT(*) না চালিয়ে এই টেবিলের
+কয়েকটি সারি পড়ে। chapter=NULL সারিতে থাকে বিষয়ের মোট প্রশ্ন। অধ্যায়ের সারি গোনে
+সেই অধ্যায়ে membership (QuestionChapter) লিংক থাকা প্রশ্ন; একটি প্রশ্ন একাধিক
+অধ্যায়ে থাকলে প্রতিটি অধ্যায়ে একবার করে গোনা হয়। তাই একাধিক অধ্যায়ের নির্বাচনে
+সারিগুলো যোগ না করে লিংক টেবিলে distinct গোনা হয় (`available_count()`)।
+
+সংখ্যাগুলো ধাপে ধাপে বদলায়। Question ও QuestionChapter-এর save/delete signal
+(core.signals) আর bulk ইমপোর্টের `store_questions()` `adjust()` ডাকে। যেসব পথ
+signal ছাড়াই সরাসরি লেখে (merge_duplicate_questions, normalize_question_types,
+seed_benchmark), সেগুলো কাজ শেষে `recount()` চালায়। গরমিল মেরামত করে
+`manage.py recount`। migration-ও `recount()` ব্যবহার করে, তাই ফাংশনটি model class
+আর্গুমেন্ট হিসেবে নেয়।
+"""
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+
+from core.models import QuestionChapter, QuestionCount
+
+SUBJECT_TOTAL = None  # বিষয়ের মোট সারির chapter_id
+
+
+def question_deltas(rows, sign=1):
+    """Counter changes for (class_id, subject_id, question_type, chapter_ids) rows.
+
+    Each row adds `sign` to its subject total and to each listed chapter.
+    """
+    deltas = defaultdict(int)
+    for class_id, subject_id, question_type, chapter_ids in rows:
+        deltas[(class_id, subject_id, SUBJECT_TOTAL, question_type)] += sign
+        for chapter_id in chapter_ids:
+            deltas[(class_id, subject_id, chapter_id, question_type)] += sign
+    return deltas
+
+
+def adjust(deltas, using='default'):
+    """Add {(class_id, subject_id, chapter_id or None, question_type): n} to the counters.
+
+    A few cells are updated one UPDATE each; bigger batches (imports, the
+    authoring API) cost one SELECT, one UPDATE and one INSERT however many
+    cells they touch.
+    """
+    deltas = {key: n for key, n in deltas.items() if n}
+    if len(deltas) <= 2:
+        for key, n in deltas.items():
+            _adjust_one(key, n, using)
+        return
+    for chunk in _chunks(list(deltas.items()), 200):
+        _adjust_many(dict(chunk), using)
+
+
+def _cell(key):
+    class_id, subject_id, chapter_id, question_type = key
+    return {'class_name_id': class_id, 'subject_id': subject_id,
+            'chapter_id': chapter_id, 'question_type': question_type}
+
+
+def _adjust_one(key, n, using):
+    rows = QuestionCount.objects.using(using).filter(**_cell(key))
+    if rows.update(count=F('count') + n) or n < 0:
+        # সারি না থাকলে কমানোর কিছু নেই — cascade delete-এ সারিটি আগেই মুছে যেতে পারে,
+        # তখন নতুন সারি বানালে মুছে যাওয়া subject/chapter-এর FK ঝুলে থাকত
+        return
+    try:
+        with transaction.atomic(using=using):
+            QuestionCount.objects.using(using).create(count=n, **_cell(key))
+    except IntegrityError:
+        # অন্য প্রসেস এইমাত্র একই সারি বানিয়েছে
+        rows.update(count=F('count') + n)
+
+
+def _adjust_many(deltas, using):
+    counts = QuestionCount.objects.using(using)
+    existing = {}
+    for pk, *key in counts.filter(reduce(or_, (Q(**_cell(key)) for key in deltas))).values_list(
+            'id', 'class_name_id', 'subject_id', 'chapter_id', 'question_type'):
+        existing[tuple(key)] = pk
+    if existing:
+        counts.filter(id__in=existing.values()).update(count=F('count') + Case(
+            *[When(id=pk, then=Value(deltas[key])) for key, pk in existing.items()],
+            output_field=IntegerField()))
+    missing = {key: n for key, n in deltas.items() if key not in existing and n > 0}
+    if not missing:
+        return
+    try:
+        with transaction.atomic(using=using):
+            counts.bulk_create([QuestionCount(count=n, **_cell(key)) for key, n in missing.items()])
+    except IntegrityError:
+        for key, n in missing.items():
+            _adjust_one(key, n, using)
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def class_counts(class_id, using=None):
+    """Available questions of one class per subject and per chapter, by type, from one indexed read.
+
+    Returns {'subjects': {subject_id: {type: n, 'total': n}}, 'chapters': {chapter_id: {...}}}.
+    """
+    subjects = defaultdict(lambda: {'total': 0})
+    chapters = defaultdict(lambda: {'total': 0})
+    rows = (QuestionCount.objects.using(using).filter(class_name_id=class_id, count__gt=0)
+            .values_list('subject_id', 'chapter_id', 'question_type', 'count'))
+    for subject_id, chapter_id, question_type, n in rows:
+        target = subjects[subject_id] if chapter_id is SUBJECT_TOTAL else chapters[chapter_id]
+        target[question_type] = n
+        target['total'] += n
+    return {'subjects': dict(subjects), 'chapters': dict(chapters)}
+
+
+def _available(class_id, subject_id, chapter_ids, question_type, using):
+    """(queryset, is_link_query) behind available_count()."""
+    chapter_ids = list(dict.fromkeys(chapter_ids or ()))
+    if len(chapter_ids) > 1:
+        links = QuestionChapter.objects.using(using).filter(
+            chapter_id__in=chapter_ids, question__class_name_id=class_id, question__subject_id=subject_id)
+        if question_type:
+            links = links.filter(question__question_type=question_type)
+        return links.values('question_id').distinct(), True
+    rows = QuestionCount.objects.using(using).filter(class_name_id=class_id, subject_id=subject_id,
+                                                     chapter_id=chapter_ids[0] if chapter_ids else SUBJECT_TOTAL)
+    if question_type:
+        rows = rows.filter(question_type=question_type)
+    return rows, False
+
+
+def available_count(class_id, subject_id, chapter_ids=None, question_type=None, using=None):
+    """Questions available for a selection.
+
+    The subject total or a single chapter is one counter row. Counters cannot
+    tell how many questions sit in two of the chosen chapters at once, so
+    several chapters are counted distinctly over their membership links.
+    """
+    qs, links = _available(class_id, subject_id, chapter_ids, question_type, using)
+    if links:
+        return qs.count()
+    return qs.aggregate(n=Sum('count'))['n'] or 0
+
+
+async def aavailable_count(class_id, subject_id, chapter_ids=None, question_type=None, using=None):
+    """available_count() through the async ORM."""
+    qs, links = _available(class_id, subject_id, chapter_ids, question_type, using)
+    if links:
+        return await qs.acount()
+    return (await qs.aaggregate(n=Sum('count')))['n'] or 0
+
+
+def type_totals(using=None):
+    """{question_type: n} over the whole bank, from the subject-total rows."""
+    rows = (QuestionCount.objects.using(using).filter(chapter__isnull=True).order_by()
+            .values_list('question_type').annotate(n=Sum('count')))
+    return {question_type: n for question_type, n in rows if n}
+
+
+def subject_totals(using=None):
+    """{(class_id, subject_id): n} over all question types, from the subject-total rows."""
+    rows = (QuestionCount.objects.using(using).filter(chapter__isnull=True).order_by()
+            .values_list('class_name_id', 'subject_id').annotate(n=Sum('count')))
+    return {(class_id, subject_id): n for class_id, subject_id, n in rows}
+
+
+def recount(question_model, link_model, count_model, using='default', dry_run=False):
+    """Recompute every counter from Question and QuestionChapter and fix the rows that drifted.
+
+    Returns {'rows', 'created', 'updated', 'deleted'}; with dry_run nothing is written.
+    """
+    fresh = {}
+    totals = (question_model.objects.using(using).order_by()
+              .values_list('class_name_id', 'subject_id', 'question_type').annotate(n=Count('id')))
+    for class_id, subject_id, question_type, n in totals:
+        fresh[(class_id, subject_id, SUBJECT_TOTAL, question_type)] = n
+    linked = (link_model.objects.using(using).order_by()
+              .values_list('question__class_name_id', 'question__subject_id', 'chapter_id',
+                           'question__question_type').annotate(n=Count('id')))
+    for class_id, subject_id, chapter_id, question_type, n in linked:
+        fresh[(class_id, subject_id, chapter_id, question_type)] = n
+
+    current = {}
+    for pk, class_id, subject_id, chapter_id, question_type, n in count_model.objects.using(using).values_list(
+            'id', 'class_name_id', 'subject_id', 'chapter_id', 'question_type', 'count'):
+        current[(class_id, subject_id, chapter_id, question_type)] = (pk, n)
+
+    missing = [key for key in fresh if key not in current]
+    changed = [(current[key][0], n) for key, n in fresh.items() if key in current and current[key][1] != n]
+    stale = [pk for key, (pk, n) in current.items() if key not in fresh and n]
+
+    if not dry_run:
+        with transaction.atomic(using=using):
+            count_model.objects.using(using).filter(id__in=stale).delete()
+            for pk, n in changed:
+                count_model.objects.using(using).filter(id=pk).update(count=n)
+            count_model.objects.using(using).bulk_create([
+                count_model(class_name_id=class_id, subject_id=subject_id, chapter_id=chapter_id,
+                            question_type=question_type, count=fresh[class_id, subject_id, chapter_id, question_type])
+                for class_id, subject_id, chapter_id, question_type in missing
+            ], batch_size=1000)
+    return {'rows': len(fresh), 'created': len(missing), 'updated': len(changed), 'deleted': len(stale)}
@@ -0,0 +1,472 @@
+# file: core/benchmarks.py
+"""
+বাস্তবসম্মত আকারের সিন্থেটিক ডেটা আর বেঞ্চমার্ক রানার।
+
+`manage.py seed_benchmark` ক্লাস × বিষয় × অধ্যায় × প্রশ্ন, ইউজার ও পেপার
+bulk insert দিয়ে তৈরি করে। সব নামের শুরুতে BENCH_PREFIX থাকে, তাই আসল
+ডেটার সাথে মেশে না এবং `--clear` দিয়ে মুছে ফেলা যায়।
+
+`manage.py run_benchmark` Django test client দিয়ে প্রধান view গুলো বারবার
+চালায় এবং প্রতিটির p50/p95/p99 latency ও query সংখ্যা JSON-এ লেখে, যাতে
+রিলিজের আগে-পরে তুলনা করা যায়।
+
+`manage.py benchmark_concurrency` হট read endpoint-গুলোতে একসাথে অনেক request
+পাঠিয়ে WSGI (thread pool) আর ASGI (event loop + async view) পথের throughput
+তুলনা করে। দুই পথেই আসল Django handler ও পুরো middleware চলে।
+"""
+import asyncio
+import csv
+import io
+import random
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections, transaction
+from django.db.backends.signals import connection_created
+from django.urls import reverse
+
+from core import locations, taxonomy
+from core.availability import recount
+from core.membership import question_hash
+from core.models import (ClassName, Subject, Chapter, Question, QuestionChapter, QuestionCount, QuestionPaper,
+                         PaperQuestion, Profile)
+from core.query_budget import QueryRecorder
+from core.search import index_questions
+
+BENCH_PREFIX = 'bench'
+BENCH_PASSWORD = 'bench-password'
+
+_WORDS = (
+    'কোষ', 'শক্তি', 'বল', 'ত্বরণ', 'সমীকরণ', 'ত্রিভুজ', 'বৃত্ত', 'ভগ্নাংশ', 'অণু', 'পরমাণু',
+    'আলো', 'তাপ', 'বিদ্যুৎ', 'চুম্বক', 'জীব', 'উদ্ভিদ', 'প্রাণী', 'নদী', 'পাহাড়', 'ইতিহাস',
+    'ভাষা', 'ব্যাকরণ', 'কবিতা', 'গদ্য', 'সংখ্যা', 'ক্ষেত্রফল', 'আয়তন', 'ঘনত্ব', 'বেগ', 'ভর',
+    'cell', 'energy', 'force', 'ratio', 'angle', 'atom', 'light', 'heat', 'river', 'grammar',
+)
+# বাস্তব প্রশ্ন ব্যাংকের আনুমানিক অনুপাত
+_TYPE_WEIGHTS = (('mcq', 6), ('short', 2), ('creative', 2))
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(_WORDS) for _ in range(words))
+
+
+def _batches(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def clear_dataset(prefix=BENCH_PREFIX):
+    """Delete everything seed_dataset() created with this prefix."""
+    users = User.objects.filter(username__startswith=f'{prefix}_')
+    QuestionPaper.objects.filter(creator__in=users).delete()
+    deleted, _ = ClassName.objects.filter(name__startswith=f'{prefix} ').delete()
+    users.delete()
+    taxonomy.bump_version()
+    return deleted
+
+
+def seed_dataset(classes=5, subjects=6, chapters=10, questions=100000, users=1000, papers=5000,
+                 questions_per_paper=20, batch_size=5000, seed=42, index=True, prefix=BENCH_PREFIX,
+                 progress=None):
+    """Bulk-create a synthetic question bank; returns {model: rows created}."""
+    rng = random.Random(seed)
+    progress = progress or (lambda message: None)
+    created = Counter()
+
+    # ক্লাস -> বিষয় -> অধ্যায়
+    ClassName.objects.bulk_create(
+        [ClassName(name=f'{prefix} ক্লাস {i + 1}') for i in range(classes)], ignore_conflicts=True,
+    )
+    class_objs = list(ClassName.objects.filter(name__startswith=f'{prefix} ').order_by('id'))
+    subject_objs = Subject.objects.bulk_create([
+        Subject(name=f'{prefix} বিষয় {s + 1}', class_name=c) for c in class_objs for s in range(subjects)
+    ])
+    chapter_objs = Chapter.objects.bulk_create([
+        Chapter(name=f'অধ্যায় {ch + 1}', subject=s) for s in subject_objs for ch in range(chapters)
+    ])
+    created.update(classes=len(class_objs), subjects=len(subject_objs), chapters=len(chapter_objs))
+    subject_class = {s.id: s.class_name_id for s in subject_objs}
+    progress(f'taxonomy: {len(class_objs)} classes, {len(subject_objs)} subjects, {len(chapter_objs)} chapters')
+
+    types = [t for t, w in _TYPE_WEIGHTS for _ in range(w)]
+    remaining = questions
+    while remaining > 0:
+        batch = []
+        for _ in range(min(batch_size, remaining)):
+            chapter = rng.choice(chapter_objs)
+            qtype = rng.choice(types)
+            options = [_sentence(rng, 2) for _ in range(4)] if qtype == 'mcq' else [None] * 4
+            batch.append(Question(
+                text=_sentence(rng, rng.randint(6, 18)) + '?',
+                question_type=qtype,
+                class_name_id=subject_class[chapter.subject_id],
+                subject_id=chapter.subject_id,
+                chapter_id=chapter.id,
+                option_a=options[0], option_b=options[1], option_c=options[2], option_d=options[3],
+                correct_option=rng.choice('abcd') if qtype == 'mcq' else None,
+            ))
+        for q in batch:
+            q.content_hash = question_hash(q)
+        with transaction.atomic():
+            Question.objects.bulk_create(batch)
+            QuestionChapter.objects.bulk_create([QuestionChapter(question_id=q.id, chapter_id=q.chapter_id)
+                                                 for q in batch])
+            if index:
+                index_questions(batch)
+        remaining -= len(batch)
+        created['questions'] += len(batch)
+        progress(f'questions: {created["questions"]}/{questions}')
+
+    # ইউজার — একই hash সবার জন্য, প্রতিটির জন্য আলাদা PBKDF2 চালালে ঘণ্টা লাগবে
+    password = make_password(BENCH_PASSWORD)
+    User.objects.bulk_create([
+        User(username=f'{prefix}_user_{i + 1}', password=password) for i in range(users)
+    ], batch_size=batch_size, ignore_conflicts=True)
+    user_ids = list(User.objects.filter(username__startswith=f'{prefix}_').values_list('id', flat=True))
+    Profile.objects.bulk_create([
+        Profile(user_id=uid, division='ঢাকা', district='ঢাকা', thana='সাভার')
+        for uid in user_ids
+    ], batch_size=batch_size, ignore_conflicts=True)
+    created['users'] = len(user_ids)
+    progress(f'users: {len(user_ids)}')
+
+    # পেপার — প্রতিটি ক্লাসের কিছু প্রশ্ন id থেকে
+    ids_by_class = {}
+    for c in class_objs:
+        ids_by_class[c.id] = list(
+            Question.objects.filter(class_name=c).order_by('id').values_list('id', flat=True)[:20000]
+        )
+    subjects_by_class = {}
+    for s in subject_objs:
+        subjects_by_class.setdefault(s.class_name_id, []).append(s.id)
+
+    PaperSubject = QuestionPaper.subjects.through
+    for chunk in _batches(range(papers), max(1, batch_size // max(1, questions_per_paper))):
+        paper_objs = []
+        for i in chunk:
+            c = rng.choice(class_objs)
+            paper_objs.append(QuestionPaper(
+                program_name=f'{prefix} পরীক্ষা {i + 1}',
+                creator_id=rng.choice(user_ids),
+                class_level=c,
+                question_type=rng.choice(('mcq', 'creative', 'combined')),
+                number_of_questions=questions_per_paper,
+            ))
+        with transaction.atomic():
+            QuestionPaper.objects.bulk_create(paper_objs)
+            links, subject_links = [], []
+            for p in paper_objs:
+                pool = ids_by_class[p.class_level_id]
+                for position, qid in enumerate(rng.sample(pool, min(questions_per_paper, len(pool)))):
+                    links.append(PaperQuestion(paper_id=p.id, question_id=qid, position=position))
+                subject_links.append(PaperSubject(questionpaper_id=p.id,
+                                                  subject_id=rng.choice(subjects_by_class[p.class_level_id])))
+            PaperQuestion.objects.bulk_create(links, batch_size=batch_size)
+            PaperSubject.objects.bulk_create(subject_links, batch_size=batch_size)
+        created['papers'] += len(paper_objs)
+        progress(f'papers: {created["papers"]}/{papers}')
+
+    # bulk_create signal পাঠায় না, তাই taxonomy ক্যাশ আর প্রশ্ন গণনা নিজে হালনাগাদ করতে হয়
+    taxonomy.bump_version()
+    recount(Question, QuestionChapter, QuestionCount)
+    return dict(created)
+
+
+def percentile(sorted_samples, pct):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_samples:
+        return None
+    k = (len(sorted_samples) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_samples) - 1)
+    return sorted_samples[lo] + (sorted_samples[hi] - sorted_samples[lo]) * (k - lo)
+
+
+def summarize(timings, query_counts, statuses):
+    ms = sorted(t * 1000 for t in timings)
+    queries = sorted(query_counts)
+    return {
+        'iterations': len(ms),
+        'p50_ms': round(percentile(ms, 50), 3),
+        'p95_ms': round(percentile(ms, 95), 3),
+        'p99_ms': round(percentile(ms, 99), 3),
+        'mean_ms': round(statistics.fmean(ms), 3),
+        'max_ms': round(ms[-1], 3),
+        'queries_p50': percentile(queries, 50),
+        'queries_max': queries[-1],
+        'status_codes': {str(k): v for k, v in sorted(Counter(statuses).items())},
+    }
+
+
+class BenchContext:
+    """Ids the scenarios pick from, loaded once from the seeded dataset."""
+
+    def __init__(self, prefix=BENCH_PREFIX):
+        self.prefix = prefix
+        self.chapters = list(
+            Chapter.objects.filter(subject__class_name__name__startswith=f'{prefix} ')
+            .values_list('subject__class_name_id', 'subject_id', 'id')
+        )
+        if not self.chapters:
+            raise ValueError(f'no benchmark data with prefix {prefix!r}; run `manage.py seed_benchmark` first')
+        paper = (QuestionPaper.objects.filter(creator__username__startswith=f'{prefix}_')
+                 .order_by('-id').values('creator_id').first())
+        self.teacher = User.objects.get(id=paper['creator_id']) if paper else \
+            User.objects.filter(username__startswith=f'{prefix}_').first()
+        self.staff, _ = User.objects.get_or_create(
+            username=f'{prefix}_staff', defaults={'is_staff': True, 'is_superuser': True},
+        )
+        self.paper_ids = list(QuestionPaper.objects.filter(creator=self.teacher).values_list('id', flat=True))
+        class_id = self.chapters[0][0]
+        self.question_ids = list(Question.objects.filter(class_name_id=class_id).values_list('id', flat=True)[:2000])
+        self.class_names = dict(ClassName.objects.filter(name__startswith=f'{prefix} ').values_list('id', 'name'))
+
+
+def csv_upload(context, rng, rows=500):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['class_name', 'subject', 'chapter', 'question_type', 'text',
+                     'option_a', 'option_b', 'option_c', 'option_d', 'correct_option'])
+    class_name = rng.choice(list(context.class_names.values()))
+    for _ in range(rows):
+        writer.writerow([class_name, f'{context.prefix} বিষয় 1', 'অধ্যায় 1', 'mcq', _sentence(rng, 10) + '?',
+                         _sentence(rng, 2), _sentence(rng, 2), _sentence(rng, 2), _sentence(rng, 2), 'a'])
+    return SimpleUploadedFile('bench.csv', buffer.getvalue().encode('utf-8'), content_type='text/csv')
+
+
+def default_scenarios(context):
+    """{name: (user, callable(client, rng) -> response)}."""
+    from core.jobs import run_pending
+
+    def select(client, rng):
+        class_id, subject_id, chapter_id = rng.choice(context.chapters)
+        return client.get(reverse('teacher_select_questions'), {
+            'class_id': class_id, 'subject_id': subject_id, 'chapter_ids': chapter_id,
+            'question_type': 'mcq', 'question_count': 20,
+        })
+
+    def prepare(client, rng):
+        ids = rng.sample(context.question_ids, min(20, len(context.question_ids)))
+        return client.post(reverse('prepare_paper'), {'question_ids': ids, 'school_name': 'bench'})
+
+    def paper_detail(client, rng):
+        return client.get(reverse('paper_detail', args=[rng.choice(context.paper_ids)]))
+
+    def subjects(client, rng):
+        return client.get(reverse('ajax_load_subjects'), {'class_id': rng.choice(context.chapters)[0]})
+
+    def chapters(client, rng):
+        return client.get(reverse('ajax_load_chapters'), {'subject_id': rng.choice(context.chapters)[1]})
+
+    def districts(client, rng):
+        return client.get(reverse('ajax_load_districts'), {'division': rng.choice(locations.divisions())})
+
+    def thanas(client, rng):
+        division = rng.choice(locations.divisions())
+        return client.get(reverse('ajax_load_thanas'), {
+            'division': division, 'district': rng.choice(locations.districts(division)),
+        })
+
+    def admin_upload(client, rng):
+        # আপলোড request + worker-এর ইমপোর্ট, দুটো মিলিয়েই শিক্ষকের অপেক্ষার সময়
+        response = client.post(reverse('admin:questions_upload_csv'), {'csv_file': csv_upload(context, rng)},
+                               HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        run_pending(limit=1)
+        return response
+
+    scenarios = {
+        'teacher_select_questions': (context.teacher, select),
+        'prepare_paper': (context.teacher, prepare),
+        'my_papers_list': (context.teacher, lambda client, rng: client.get(reverse('my_papers_list'))),
+        'ajax_load_subjects': (None, subjects),
+        'ajax_load_chapters': (None, chapters),
+        'ajax_load_districts': (None, districts),
+        'ajax_load_thanas': (None, thanas),
+        'admin_csv_upload': (context.staff, admin_upload),
+    }
+    if context.paper_ids:
+        scenarios['paper_detail'] = (context.teacher, paper_detail)
+    return scenarios
+
+
+def run_scenario(client, fn, iterations, warmup, rng):
+    for _ in range(warmup):
+        fn(client, rng)
+    timings, query_counts, statuses = [], [], []
+    for _ in range(iterations):
+        recorder = QueryRecorder()
+        with recorder.record():
+            start = time.perf_counter()
+            response = fn(client, rng)
+            timings.append(time.perf_counter() - start)
+        query_counts.append(recorder.count)
+        statuses.append(response.status_code)
+    return summarize(timings, query_counts, statuses)
+
+
+def hot_read_requests(context, count, rng):
+    """`count` random (path, query string, needs login) for the endpoints async_views serves."""
+    def subjects():
+        return reverse('ajax_load_subjects'), {'class_id': rng.choice(context.chapters)[0]}, False
+
+    def chapters():
+        return reverse('ajax_load_chapters'), {'subject_id': rng.choice(context.chapters)[1]}, False
+
+    def class_tree():
+        return reverse('ajax_load_class_tree'), {'class_id': rng.choice(context.chapters)[0]}, False
+
+    def districts():
+        return reverse('ajax_load_districts'), {'division': rng.choice(locations.divisions())}, False
+
+    def search():
+        class_id, subject_id, _ = rng.choice(context.chapters)
+        return reverse('teacher_search_questions'), {
+            'q': rng.choice(_WORDS), 'class_id': class_id, 'subject_id': subject_id,
+        }, True
+
+    def papers():
+        return reverse('my_papers_list'), {'format': 'json'}, True
+
+    def select():
+        class_id, subject_id, chapter_id = rng.choice(context.chapters)
+        return reverse('teacher_select_questions'), {
+            'class_id': class_id, 'subject_id': subject_id, 'chapter_ids': chapter_id,
+            'question_type': 'mcq', 'question_count': 20, 'format': 'json',
+        }, True
+
+    makers = (subjects, chapters, class_tree, districts, search, search, papers, papers, select, select)
+    requests = []
+    for _ in range(count):
+        path, params, login = rng.choice(makers)()
+        requests.append((path, urlencode(params), login))
+    return requests
+
+
+class SimulatedLatency:
+    """Sleep before every query, like a database across the network (installed per connection)."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        time.sleep(self.seconds)
+        return execute(sql, params, many, context)
+
+    def install(self, sender=None, connection=None, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def __enter__(self):
+        if self.seconds > 0:
+            connection_created.connect(self.install)
+            for alias in connections:
+                self.install(connection=connections[alias])
+        return self
+
+    def __exit__(self, *exc):
+        connection_created.disconnect(self.install)
+        for alias in connections:
+            if self in connections[alias].execute_wrappers:
+                connections[alias].execute_wrappers.remove(self)
+
+
+def _concurrency_report(mode, concurrency, elapsed, timings, statuses):
+    ms = sorted(t * 1000 for t in timings)
+    return {
+        'mode': mode,
+        'concurrency': concurrency,
+        'requests': len(ms),
+        'seconds': round(elapsed, 3),
+        'requests_per_sec': round(len(ms) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(percentile(ms, 50), 3),
+        'p95_ms': round(percentile(ms, 95), 3),
+        'p99_ms': round(percentile(ms, 99), 3),
+        'status_codes': {str(k): v for k, v in sorted(Counter(statuses).items())},
+    }
+
+
+def run_wsgi_concurrent(requests, cookie, concurrency):
+    """Send `requests` through the WSGI handler from `concurrency` threads (like a threaded gunicorn worker)."""
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+    host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'
+
+    def one(item):
+        path, query, login = item
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+            'SERVER_NAME': host, 'SERVER_PORT': '80', 'HTTP_HOST': host, 'SERVER_PROTOCOL': 'HTTP/1.1',
+            'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(), 'wsgi.errors': io.StringIO(),
+        }
+        if login:
+            environ['HTTP_COOKIE'] = cookie
+        status = []
+        start = time.perf_counter()
+        response = handler(environ, lambda s, headers, exc_info=None: status.append(s))
+        try:
+            b''.join(response)
+        finally:
+            response.close()  # request_finished -> connection বন্ধ
+        return time.perf_counter() - start, int(status[0].split()[0])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, requests))
+    elapsed = time.perf_counter() - start
+    return _concurrency_report('wsgi', concurrency, elapsed, [r[0] for r in results], [r[1] for r in results])
+
+
+def run_asgi_concurrent(requests, cookie, concurrency):
+    """Send `requests` through the ASGI handler with at most `concurrency` in flight on one event loop."""
+    from django.core.handlers.asgi import ASGIHandler
+
+    handler = ASGIHandler()
+    host = (settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost').encode()
+
+    async def one(item, gate):
+        path, query, login = item
+        headers = [(b'host', host)]
+        if login:
+            headers.append((b'cookie', cookie.encode()))
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': path, 'raw_path': path.encode(), 'query_string': query.encode(), 'root_path': '',
+            'headers': headers, 'server': (host.decode(), 80), 'client': ('127.0.0.1', 0),
+        }
+        disconnect = asyncio.Event()
+        messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+        status = []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+
+        async with gate:
+            start = time.perf_counter()
+            await handler(scope, receive, send)
+            elapsed = time.perf_counter() - start
+        disconnect.set()
+        return elapsed, status[0]
+
+    async def main():
+        gate = asyncio.Semaphore(concurrency)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(one(item, gate) for item in requests))
+        return time.perf_counter() - start, results
+
+    elapsed, results = asyncio.run(main())
+    return _concurrency_report('asgi', concurrency, elapsed, [r[0] for r in results], [r[1] for r in results])
@@ -0,0 +1,100 @@
+# file: core/changelist.py
+"""
+লাখ লাখ সারির admin changelist-এর জন্য সরঞ্জাম (QuestionAdmin ব্যবহার করে)।
+
+- `EstimatedCountPaginator`: COUNT(*) চালায় না। PostgreSQL-এ planner-এর হিসাব
+  নেয় — ফিল্টার ছাড়া pg_class.reltuples, ফিল্টারসহ EXPLAIN-এর row estimate;
+  হিসাব ESTIMATE_THRESHOLD-এর কম হলে আসল COUNT সস্তা, তাই সেটিই চলে। SQLite-এ
+  planner হিসাব দেয় না, তাই আসল COUNT একই SQL-এর জন্য COUNT_CACHE_SECONDS
+  ক্যাশে থাকে।
+- `AutocompleteListFilter`: sidebar-এ সব subject/chapter লোড না করে admin-এর
+  autocomplete view (select2) দিয়ে খোঁজা ফিল্টার।
+"""
+import hashlib
+import json
+
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.urls import reverse
+from django.utils.functional import cached_property
+
+ESTIMATE_THRESHOLD = 10000
+COUNT_CACHE_SECONDS = 60
+
+
+def _plan_rows(queryset):
+    connection = connections[queryset.db]
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                           [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+            return row[0] if row else None
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']['Plan Rows']
+
+
+def estimated_count(queryset):
+    """Row count of `queryset`: planner estimate for big results, exact (or cached exact) otherwise."""
+    if connections[queryset.db].vendor == 'postgresql':
+        estimate = _plan_rows(queryset)
+        # reltuples -1/0 = কখনো ANALYZE হয়নি
+        if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+            return int(estimate)
+        return queryset.count()
+    sql, params = queryset.query.sql_with_params()
+    key = 'changelist-count:' + hashlib.sha1(f'{queryset.db}|{sql}|{params!r}'.encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_CACHE_SECONDS)
+    return count
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator whose count comes from estimated_count() instead of COUNT(*)."""
+
+    @cached_property
+    def count(self):
+        return estimated_count(self.object_list)
+
+
+class AutocompleteListFilter(admin.FieldListFilter):
+    """Sidebar filter for a FK/M2M field backed by the admin autocomplete view.
+
+    The related model's admin needs search_fields (same rule as autocomplete_fields).
+    """
+    template = 'admin/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f'{field_path}__{field.target_field.name}__exact'
+        self.lookup_val = params.get(self.lookup_kwarg)
+        super().__init__(field, request, params, model, model_admin, field_path)
+        self.source_model = model
+        self.selected = None
+        value = self.lookup_val[-1] if isinstance(self.lookup_val, list) else self.lookup_val
+        if value:
+            self.selected = field.related_model._default_manager.filter(pk=value).first()
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+
+    def choices(self, changelist):
+        # টেমপ্লেট একটি select বানায়; JS নির্বাচিত id দিয়ে param বসিয়ে পেজ লোড করে
+        yield {
+            'selected': self.selected is not None,
+            'query_string': changelist.get_query_string(remove=[self.lookup_kwarg]),
+            'display': str(self.selected) if self.selected is not None else '',
+            'value': self.selected.pk if self.selected is not None else '',
+            'autocomplete_url': reverse('admin:autocomplete'),
+            'app_label': self.source_model._meta.app_label,
+            'model_name': self.source_model._meta.model_name,
+            'field_name': self.field_path,
+            'param': self.lookup_kwarg,
+        }
@@ -0,0 +1,129 @@
+# file: core/dashboard_stats.py
+"""
+ড্যাশবোর্ডের পরিসংখ্যান — আগে থেকে হিসাব করা রোলআপ থেকে।
+
+- ক্লাস ও বিষয়ভিত্তিক প্রশ্নের মোট: QuestionCount (core.availability) থেকে,
+  যেটি প্রশ্ন save/delete/ইমপোর্টের সাথেই হালনাগাদ থাকে।
+- সপ্তাহপ্রতি নতুন পেপার: PaperWeekCount।
+- প্রতি শিক্ষকের সবচেয়ে বেশি ব্যবহৃত অধ্যায়: TeacherChapterUsage। পেপারে রাখা
+  প্রশ্নের প্রধান অধ্যায় দিয়ে গোনা হয়, আর rank আগেই বসানো থাকে, তাই প্রথম n-টি
+  পড়া একটি indexed query।
+
+শেষ দুটি `manage.py refresh_dashboard_stats` দিয়ে cron-এ হালনাগাদ হয়। সাধারণ
+চালানো incremental: টেবিলের শেষ সপ্তাহ থেকে তৈরি পেপারগুলোর সপ্তাহ, আর সেই
+পেপারের শিক্ষকদের অধ্যায় ব্যবহার নতুন করে হিসাব হয়। পুরনো পেপার মুছলে বা এডিট
+করলে তা ধরা পড়ে `--full` চালালে (যেমন রাতে একবার)।
+"""
+from collections import defaultdict
+from datetime import datetime, time
+
+from django.db import transaction
+from django.db.models import Count, DateField, Max
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+
+from core import taxonomy
+from core.availability import subject_totals
+from core.models import PaperQuestion, PaperWeekCount, QuestionPaper, TeacherChapterUsage
+
+DEFAULT_WEEKS = 12
+DEFAULT_TOP_CHAPTERS = 5
+
+
+def _week_start(week):
+    return timezone.make_aware(datetime.combine(week, time.min))
+
+
+def refresh(full=False, using='default'):
+    """Recompute the paper rollups; incremental unless `full` (or the tables are still empty).
+
+    Returns {'since': first recomputed week or None, 'weeks': rows written, 'teachers': teachers refreshed}.
+    """
+    since = None if full else PaperWeekCount.objects.using(using).aggregate(week=Max('week'))['week']
+    papers = QuestionPaper.objects.using(using).order_by()
+    if since is not None:
+        papers = papers.filter(created_at__gte=_week_start(since))
+
+    weeks = (papers.annotate(week=TruncWeek('created_at', output_field=DateField()))
+             .values_list('week').annotate(n=Count('id')))
+    week_rows = [PaperWeekCount(week=week, papers=n) for week, n in weeks]
+
+    usage = PaperQuestion.objects.using(using).filter(question__chapter__isnull=False).order_by()
+    if since is not None:
+        usage = usage.filter(paper__creator_id__in=papers.values('creator_id'))
+    per_teacher = defaultdict(list)
+    for teacher_id, chapter_id, questions, paper_count in (
+            usage.values_list('paper__creator_id', 'question__chapter_id')
+            .annotate(questions=Count('id'), papers=Count('paper_id', distinct=True))):
+        per_teacher[teacher_id].append(TeacherChapterUsage(
+            teacher_id=teacher_id, chapter_id=chapter_id, questions=questions, papers=paper_count))
+    usage_rows = []
+    for rows in per_teacher.values():
+        rows.sort(key=lambda row: (-row.questions, -row.papers, row.chapter_id))
+        for rank, row in enumerate(rows, start=1):
+            row.rank = rank
+        usage_rows.extend(rows)
+
+    with transaction.atomic(using=using):
+        stale_weeks = PaperWeekCount.objects.using(using).all()
+        stale_usage = TeacherChapterUsage.objects.using(using).all()
+        if since is not None:
+            stale_weeks = stale_weeks.filter(week__gte=since)
+            stale_usage = stale_usage.filter(teacher_id__in=papers.values('creator_id'))
+        stale_weeks.delete()
+        stale_usage.delete()
+        PaperWeekCount.objects.using(using).bulk_create(week_rows)
+        TeacherChapterUsage.objects.using(using).bulk_create(usage_rows, batch_size=1000)
+    return {'since': since, 'weeks': len(week_rows), 'teachers': len(per_teacher)}
+
+
+def question_totals(tree=None):
+    """Classes with their question totals and per-subject totals, in taxonomy order."""
+    tree = tree or taxonomy.get_tree()
+    totals = subject_totals()
+    classes = []
+    for cls in tree['classes']:
+        subjects = [{'id': s['id'], 'name': s['name'], 'questions': totals.get((cls['id'], s['id']), 0)}
+                    for s in tree['subjects_by_class'].get(cls['id'], [])]
+        classes.append({'id': cls['id'], 'name': cls['name'],
+                        'questions': sum(s['questions'] for s in subjects), 'subjects': subjects})
+    return classes
+
+
+def papers_per_week(weeks=DEFAULT_WEEKS):
+    """The last `weeks` weeks that have papers, oldest first."""
+    rows = PaperWeekCount.objects.order_by('-week').values_list('week', 'papers')[:weeks]
+    return [{'week': week.isoformat(), 'papers': n} for week, n in reversed(rows)]
+
+
+def top_chapters(teacher_ids=None, limit=DEFAULT_TOP_CHAPTERS, tree=None):
+    """{teacher_id: {'username', 'chapters': [...]}} with each teacher's `limit` most used chapters.
+
+    teacher_ids=None returns every teacher.
+    """
+    tree = tree or taxonomy.get_tree()
+    rows = TeacherChapterUsage.objects.filter(rank__lte=limit)
+    if teacher_ids is not None:
+        rows = rows.filter(teacher_id__in=teacher_ids)
+    teachers = {}
+    for teacher_id, username, chapter_id, questions, paper_count in (
+            rows.order_by('teacher_id', 'rank')
+            .values_list('teacher_id', 'teacher__username', 'chapter_id', 'questions', 'papers')):
+        chapter = taxonomy.get_chapter(chapter_id, tree) or {}
+        subject = taxonomy.get_subject(chapter.get('subject_id'), tree) or {}
+        teachers.setdefault(teacher_id, {'username': username, 'chapters': []})['chapters'].append({
+            'id': chapter_id, 'name': chapter.get('name', ''), 'subject': subject.get('name', ''),
+            'questions': questions, 'papers': paper_count,
+        })
+    return teachers
+
+
+def dashboard_stats(user, weeks=DEFAULT_WEEKS, limit=DEFAULT_TOP_CHAPTERS):
+    """Everything the dashboard shows; staff see every teacher's chapters, others only their own."""
+    tree = taxonomy.get_tree()
+    teachers = top_chapters(None if user.is_staff else [user.id], limit=limit, tree=tree)
+    return {
+        'classes': question_totals(tree),
+        'papers_per_week': papers_per_week(weeks),
+        'teachers': [{'id': teacher_id, **data} for teacher_id, data in teachers.items()],
+    }
@@ -0,0 +1,130 @@
+# file: core/exporters.py
+"""
+প্রশ্ন ব্যাংক CSV/JSONL হিসেবে ফেরত দেওয়া — ইমপোর্টের হুবহু কলাম দিয়ে।
+
+কলামগুলো admin upload_csv / `manage.py import_questions` যা পড়ে ঠিক তাই
+(EXPORT_COLUMNS), তাই এক্সপোর্ট করা ফাইল সরাসরি আবার ইমপোর্ট করা যায়।
+Question `.iterator(chunk_size=...)` দিয়ে হাঁটা হয় (PostgreSQL-এ server-side
+cursor), class/subject/chapter `select_related`-এ একই query-তে আসে, আর আউটপুট
+কয়েকশো সারির টুকরো করে yield হয় — ব্যাংক যত বড়ই হোক মেমরি স্থির থাকে।
+ডিফল্টে (`all_chapters`) প্রশ্নটি যত অধ্যায়ে আছে (membership) প্রতিটির জন্য একটি সারি হয়;
+ইমপোর্ট একই কনটেন্টের সারিগুলো আবার একটি প্রশ্নে মিলিয়ে দেয়, তাই এক্সপোর্ট-ইমপোর্টে
+অধ্যায়ের লিংক হারায় না। all_chapters=False দিলে শুধু প্রধান অধ্যায়ের একটি সারি।
+"""
+import csv
+import io
+import json
+import zlib
+
+from django.db.models import Prefetch
+
+from core.membership import filter_chapters
+from core.models import Chapter, Question
+from core.question_types import normalize_question_type
+
+EXPORT_COLUMNS = ('class_name', 'subject', 'chapter', 'question_type', 'text',
+                  'option_a', 'option_b', 'option_c', 'option_d', 'correct_option')
+FORMATS = ('csv', 'jsonl')
+DEFAULT_CHUNK_SIZE = 2000
+_FLUSH_ROWS = 500
+CONTENT_TYPES = {'csv': 'text/csv; charset=utf-8', 'jsonl': 'application/x-ndjson; charset=utf-8'}
+
+
+def export_queryset(class_id=None, subject_id=None, chapter_ids=None, question_type=None, all_chapters=True):
+    """Filtered Questions to export, oldest first.
+
+    With all_chapters the linked chapters are prefetched per iterator chunk
+    (only the requested ones when chapter_ids is given).
+    """
+    qs = Question.objects.all()
+    if class_id:
+        qs = qs.filter(class_name_id=class_id)
+    if subject_id:
+        qs = qs.filter(subject_id=subject_id)
+    if chapter_ids:
+        qs = filter_chapters(qs, chapter_ids)
+    if question_type:
+        qs = qs.filter(question_type=normalize_question_type(question_type))
+    qs = qs.select_related('class_name', 'subject', 'chapter').order_by('id')
+    if all_chapters:
+        chapters = Chapter.objects.only('id', 'name').order_by('id')
+        if chapter_ids:
+            chapters = chapters.filter(id__in=chapter_ids)
+        qs = qs.prefetch_related(Prefetch('chapters', queryset=chapters, to_attr='export_chapters'))
+    return qs
+
+
+def _chapter_names(question):
+    linked = getattr(question, 'export_chapters', None)
+    if not linked:
+        return [question.chapter.name if question.chapter else '']
+    # প্রধান অধ্যায় আগে, যাতে আবার ইমপোর্টে সেটিই প্রশ্নের chapter হয়
+    names = [ch.name for ch in linked if ch.id == question.chapter_id]
+    return names + [ch.name for ch in linked if ch.id != question.chapter_id]
+
+
+def iter_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield dicts with exactly EXPORT_COLUMNS (one per linked chapter with all_chapters)."""
+    for question in queryset.iterator(chunk_size=chunk_size):
+        row = {
+            'class_name': question.class_name.name,
+            'subject': question.subject.name,
+            'question_type': question.question_type,
+            'text': question.text,
+            'option_a': question.option_a or '',
+            'option_b': question.option_b or '',
+            'option_c': question.option_c or '',
+            'option_d': question.option_d or '',
+            'correct_option': question.correct_option or '',
+        }
+        for chapter in _chapter_names(question):
+            yield {column: chapter if column == 'chapter' else row[column] for column in EXPORT_COLUMNS}
+
+
+def iter_csv(rows):
+    """CSV text in chunks; the BOM lets Excel show Bangla, and the importer skips it."""
+    buffer = io.StringIO()
+    buffer.write('\ufeff')
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for i, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if i % _FLUSH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_jsonl(rows):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row, ensure_ascii=False))
+        if len(lines) >= _FLUSH_ROWS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def gzip_chunks(chunks, level=6):
+    """Gzip a stream of bytes chunks without holding the whole output."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip header
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(queryset, fmt='csv', compress=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Bytes chunks of the export, ready for StreamingHttpResponse or a file."""
+    if fmt not in FORMATS:
+        raise ValueError(f'unsupported export format: {fmt!r} (use csv or jsonl)')
+    text = (iter_csv if fmt == 'csv' else iter_jsonl)(iter_rows(queryset, chunk_size))
+    chunks = (part.encode('utf-8') for part in text)
+    return gzip_chunks(chunks) if compress else chunks
+
+
+def export_filename(fmt, compress=False):
+    return f'questions.{fmt}' + ('.gz' if compress else '')
@@ -0,0 +1,60 @@
+# file: core/http_cache.py
+"""
+JSON lookup endpoint-গুলোর জন্য conditional GET (ETag / Last-Modified)।
+
+ভ্যালিডেটর তৈরি হয় ডেটার একটি content version থেকে — taxonomy-র ক্ষেত্রে
+শেয়ার্ড ক্যাশের ভার্সন নম্বর, লোকেশন ডেটার ক্ষেত্রে ডেটাসেটের fingerprint — তাই
+ক্লায়েন্টের কাছে আগের কপি থাকলে view বা ORM না ছুঁয়েই 304 ফেরত যায়।
+"""
+import functools
+import os
+from datetime import datetime, timezone
+
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+# লোকেশন ডেটা শুধু deploy-এ বদলায়: সেশন জুড়ে রাখা যায়, তারপর revalidate
+LOCATION_CACHE_CONTROL = {'public': True, 'max_age': 24 * 60 * 60}
+# taxonomy অ্যাডমিন থেকে বদলাতে পারে: অল্প সময় রাখো, তারপর 304 দিয়ে যাচাই
+TAXONOMY_CACHE_CONTROL = {'private': True, 'max_age': 5 * 60, 'must_revalidate': True}
+
+
+def conditional_json(etag_func, last_modified_func=None, **cache_options):
+    """Answer If-None-Match / If-Modified-Since with 304 before calling the view.
+
+    `etag_func` and `last_modified_func` take no arguments — the validators
+    describe the whole dataset, not one URL, so they must stay cheap.
+    """
+    def decorator(view):
+        conditional = condition(
+            etag_func=lambda request, *args, **kwargs: etag_func(),
+            last_modified_func=(lambda request, *args, **kwargs: last_modified_func()) if last_modified_func else None,
+        )(view)
+        return functools.wraps(view)(cache_control(**cache_options)(conditional))
+    return decorator
+
+
+def taxonomy_etag():
+    from core import taxonomy
+    return f'tx-{taxonomy.get_version()}'
+
+
+def taxonomy_last_modified():
+    from core import taxonomy
+    return datetime.fromtimestamp(taxonomy.get_version() / 1e9, tz=timezone.utc)
+
+
+def location_etag():
+    from core import locations
+    return 'loc-' + locations.get_data().fingerprint
+
+
+@functools.lru_cache(maxsize=None)
+def location_last_modified():
+    # সব worker একই prebuilt ফাইল দেখে, তাই mtime সবার জন্য এক
+    from core import locations
+    return datetime.fromtimestamp(os.path.getmtime(locations.COMPACT_FILE), tz=timezone.utc)
+
+
+location_conditional = conditional_json(location_etag, location_last_modified, **LOCATION_CACHE_CONTROL)
+taxonomy_conditional = conditional_json(taxonomy_etag, taxonomy_last_modified, **TAXONOMY_CACHE_CONTROL)
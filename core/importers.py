@@ -0,0 +1,368 @@
+# file: core/importers.py
+"""
+প্রশ্ন ইমপোর্টের জন্য শেয়ার্ড পাইপলাইন।
+
+Admin CSV upload এবং অন্যান্য bulk loader একই নিয়মে class/subject/chapter
+resolve করে এবং batch আকারে `bulk_create` দিয়ে প্রশ্ন লেখে। একই কনটেন্টের
+প্রশ্ন আগে থেকে থাকলে (অন্য অধ্যায়ের সারি) নতুন সারি হয় না, শুধু অধ্যায়ের
+লিংক যোগ হয় (core.membership)। সামান্য বদলানো (space, অঙ্ক, যতিচিহ্ন) প্রায়-একই
+প্রশ্ন LSH ইনডেক্স দিয়ে ধরা পড়ে (core.near_duplicates) — `near_duplicates`
+'flag' হলে সারিটি ইমপোর্ট হয় কিন্তু তালিকায় ওঠে, 'skip' হলে বাদ পড়ে।
+"""
+import codecs
+import csv
+import json
+import os
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from core.membership import BODY_HASH_FIELDS, bind_content_hash, content_body, store_questions
+from core.models import ClassName, Subject, Chapter, Question
+from core.near_duplicates import NearDuplicateChecker, signature
+from core.question_types import normalize_question_type
+from core.search import SEARCH_TEXT_FIELDS
+
+DEFAULT_BATCH_SIZE = getattr(settings, 'QUESTION_IMPORT_BATCH_SIZE', 1000)
+DEFAULT_NEAR_DUPLICATES = getattr(settings, 'NEAR_DUPLICATE_MODE', 'flag')
+
+# class_name না থাকলে এবং subject দিয়ে খুঁজে পাওয়া না গেলে এই ক্লাসে রাখা হয়
+FALLBACK_CLASS_NAME = 'Unspecified'
+
+
+def iter_csv_rows(fileobj, encoding='utf-8-sig'):
+    """Decode an uploaded file line by line and yield (row_num, row_dict).
+
+    The file is never read into memory as a whole; row numbers match the
+    line numbers a spreadsheet shows (header is row 1).
+    """
+    reader = csv.DictReader(codecs.iterdecode(fileobj, encoding))
+    for row_num, row in enumerate(reader, start=2):
+        yield row_num, row
+
+
+def _as_text(value):
+    if value is None:
+        return ''
+    return value if isinstance(value, str) else str(value)
+
+
+def iter_jsonl_rows(fileobj, encoding='utf-8-sig'):
+    """Yield (line_num, row_dict) from a JSON-lines file; blank lines are skipped."""
+    for line_num, line in enumerate(codecs.iterdecode(fileobj, encoding), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError as e:
+            obj = {'__error__': f'invalid JSON: {e}'}
+        if not isinstance(obj, dict):
+            obj = {'__error__': 'each line must be a JSON object'}
+        yield line_num, {k: _as_text(v) for k, v in obj.items()}
+
+
+def iter_xlsx_rows(path):
+    """Yield (row_num, row_dict) from the first sheet using openpyxl's read-only (streaming) mode."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError('XLSX import requires openpyxl (pip install openpyxl)')
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = [_as_text(h).strip() for h in next(rows, ())]
+        for row_num, values in enumerate(rows, start=2):
+            if not any(v not in (None, '') for v in values):
+                continue
+            yield row_num, {h: _as_text(v) for h, v in zip(header, values) if h}
+    finally:
+        wb.close()
+
+
+def iter_file_rows(path, fmt=None):
+    """Yield (row_num, row_dict) from a CSV, JSONL or XLSX file, picking the reader by extension."""
+    fmt = (fmt or os.path.splitext(path)[1].lstrip('.')).lower()
+    if fmt == 'xlsx':
+        yield from iter_xlsx_rows(path)
+        return
+    readers = {'csv': iter_csv_rows, 'jsonl': iter_jsonl_rows, 'ndjson': iter_jsonl_rows}
+    if fmt not in readers:
+        raise ValueError(f'unsupported file format: {fmt!r} (use csv, jsonl or xlsx)')
+    with open(path, 'rb') as f:
+        yield from readers[fmt](f)
+
+
+def parse_row(row):
+    """Validate one raw row and return plain, picklable field values.
+
+    Raises ValueError with a short message for rows that cannot be imported.
+    """
+    if row.get('__error__'):
+        raise ValueError(row['__error__'])
+    # Try common column names for class
+    class_name = (row.get('class_name') or row.get('class') or row.get('class_id') or '').strip()
+    subject_name = (row.get('subject') or '').strip()
+    if not subject_name:
+        raise ValueError('missing subject')
+
+    text = (row.get('text') or row.get('question') or '').strip()
+    if not text:
+        raise ValueError('missing question text')
+
+    return {
+        'class_name': class_name,
+        'subject': subject_name,
+        'chapter': (row.get('chapter') or '').strip(),
+        'text': text,
+        'question_type': normalize_question_type(row.get('question_type') or 'mcq'),
+        'option_a': row.get('option_a') or None,
+        'option_b': row.get('option_b') or None,
+        'option_c': row.get('option_c') or None,
+        'option_d': row.get('option_d') or None,
+        'correct_option': (row.get('correct_option') or '').strip() or None,
+    }
+
+
+def prepare_row(row, signatures=True):
+    """parse_row() plus the per-row hashing that needs no database.
+
+    Adds 'content_body' (the content part of content_hash) and, with
+    signatures, the MinHash signature as 'minhash'. Import worker processes
+    call this, so the parent only binds the hash to the resolved taxonomy ids.
+    """
+    data = parse_row(row)
+    values = {'category': Question._meta.get_field('category').get_default(), **data}
+    data['content_body'] = content_body(values[f] for f in BODY_HASH_FIELDS)
+    if signatures:
+        data['minhash'] = signature(data[f] for f in SEARCH_TEXT_FIELDS)
+    return data
+
+
+class TaxonomyResolver:
+    """In-memory lookup for ClassName/Subject/Chapter that fills itself as rows arrive.
+
+    Each distinct name hits the database once (get_or_create); every later row
+    with the same name is resolved from the dicts below.
+    """
+
+    def __init__(self):
+        self.classes = {}            # name -> ClassName
+        self.subjects = {}           # (class_id, name) -> Subject
+        self.subjects_by_name = {}   # name.lower() -> Subject | None (class inference)
+        self.chapters = {}           # (subject_id, name) -> Chapter
+
+    def get_class(self, name):
+        obj = self.classes.get(name)
+        if obj is None:
+            obj, _ = ClassName.objects.get_or_create(name=name)
+            self.classes[name] = obj
+        return obj
+
+    def get_subject(self, name, class_obj):
+        key = (class_obj.id, name)
+        obj = self.subjects.get(key)
+        if obj is None:
+            obj, _ = Subject.objects.get_or_create(name=name, class_name=class_obj)
+            self.subjects[key] = obj
+        return obj
+
+    def find_subject(self, name):
+        """Existing subject with this name (case-insensitive), used to infer the class."""
+        key = name.lower()
+        if key not in self.subjects_by_name:
+            self.subjects_by_name[key] = (
+                Subject.objects.filter(name__iexact=name).select_related('class_name').first()
+            )
+        return self.subjects_by_name[key]
+
+    def get_chapter(self, name, subject_obj):
+        key = (subject_obj.id, name)
+        obj = self.chapters.get(key)
+        if obj is None:
+            obj, _ = Chapter.objects.get_or_create(name=name, subject=subject_obj)
+            self.chapters[key] = obj
+        return obj
+
+    def resolve(self, data, row_num=None, notes=None):
+        """Return (class_obj, subject_obj, chapter_obj) for a parsed row."""
+        class_obj = None
+        subject_obj = None
+        if data['class_name']:
+            class_obj = self.get_class(data['class_name'])
+
+        # If class wasn't provided but a matching subject exists in DB, infer class from it
+        if not class_obj:
+            subj_match = self.find_subject(data['subject'])
+            if subj_match:
+                subject_obj = subj_match
+                class_obj = subj_match.class_name
+            else:
+                # Fallback: create/use an 'Unspecified' class so rows without class_name are still imported.
+                class_obj = self.get_class(FALLBACK_CLASS_NAME)
+                if notes is not None:
+                    notes.append(f"Row {row_num}: class_name missing; assigned fallback class "
+                                 f"'{FALLBACK_CLASS_NAME}' for subject '{data['subject']}'")
+
+        if not subject_obj:
+            subject_obj = self.get_subject(data['subject'], class_obj)
+
+        chapter_obj = self.get_chapter(data['chapter'], subject_obj) if data['chapter'] else None
+        return class_obj, subject_obj, chapter_obj
+
+
+class QuestionImporter:
+    """Collects parsed rows and writes them with bulk_create, one transaction per batch.
+
+    Usage:
+        importer = QuestionImporter(batch_size=500)
+        for row_num, row in iter_csv_rows(f):
+            importer.add_row(row_num, row)
+        importer.finish()
+        importer.created, importer.errors, importer.rows_per_sec
+    """
+
+    def __init__(self, batch_size=None, resolver=None, on_batch=None, near_duplicates=None):
+        self.batch_size = max(1, int(batch_size or DEFAULT_BATCH_SIZE))
+        self.resolver = resolver or TaxonomyResolver()
+        self.on_batch = on_batch  # callable(importer), called after every flushed batch
+        # 'flag' | 'skip' | 'off'; 'off' হলে signature-ও লেখা হয় না (পরে find_duplicates তৈরি করে)
+        self.near_duplicates = near_duplicates or DEFAULT_NEAR_DUPLICATES
+        self.checker = NearDuplicateChecker() if self.near_duplicates != 'off' else None
+        self.created = 0
+        self.merged = 0  # সারি যেগুলো আগের কোনো প্রশ্নের সাথে মিলে শুধু অধ্যায়-লিংক হয়েছে
+        self.duplicates = []  # [(row_num, match, similarity)] — near-duplicate সারি (flag বা skip)
+        self.skipped = 0
+        self.processed = 0
+        self.errors = []
+        self.rejected = []  # [(row_num, message)] — same rows as `errors`, for reject files
+        self.notes = []
+        self._batch = []  # [(row_num, Question)]
+        self._started = time.monotonic()
+        self.elapsed = 0.0
+
+    def add_row(self, row_num, row):
+        """Parse, resolve and queue one raw row. Errors are recorded per row."""
+        try:
+            data = prepare_row(row, signatures=self.checker is not None)
+        except ValueError as e:
+            self.add_error(row_num, e)
+            return
+        self.add_parsed(row_num, data)
+
+    def add_parsed(self, row_num, data):
+        """Queue a row that was already validated by parse_row() or prepare_row()."""
+        try:
+            question = self.build_question(row_num, data)
+        except Exception as e:
+            self.add_error(row_num, e)
+            return
+        self._batch.append((row_num, question))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def add_error(self, row_num, exc):
+        self.processed += 1
+        self._reject(row_num, exc)
+
+    def _reject(self, row_num, exc):
+        self.errors.append(f'Row {row_num}: {exc}')
+        self.rejected.append((row_num, str(exc)))
+
+    def build_question(self, row_num, data):
+        class_obj, subject_obj, chapter_obj = self.resolver.resolve(data, row_num, self.notes)
+        question = Question(
+            text=data['text'],
+            question_type=data['question_type'],
+            class_name=class_obj,
+            subject=subject_obj,
+            chapter=chapter_obj,
+            option_a=data['option_a'],
+            option_b=data['option_b'],
+            option_c=data['option_c'],
+            option_d=data['option_d'],
+            correct_option=data['correct_option'],
+        )
+        if 'content_body' in data:
+            question.content_hash = bind_content_hash(class_obj.id, subject_obj.id, data['content_body'])
+        if data.get('minhash'):
+            question._minhash = tuple(data['minhash'])
+        return question
+
+    def flush(self):
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        self.processed += len(batch)
+        if self.checker is not None:
+            batch = self._check_near_duplicates(batch)
+        try:
+            with transaction.atomic():
+                stored = store_questions([self._entry(q) for _, q in batch], batch_size=self.batch_size,
+                                         signatures=self.checker is not None)
+            self._count(stored)
+        except Exception:
+            # কোন সারিতে সমস্যা তা বের করতে batch-টি এক এক করে আবার চেষ্টা করা হয়
+            for row_num, question in batch:
+                question.pk = None
+                try:
+                    with transaction.atomic():
+                        self._count(store_questions([self._entry(question)], signatures=self.checker is not None))
+                except Exception as e:
+                    self._reject(row_num, e)
+        self.elapsed = time.monotonic() - self._started
+        if self.on_batch:
+            self.on_batch(self)
+
+    def _check_near_duplicates(self, batch):
+        """Record near-duplicate rows; in 'skip' mode drop them from the batch."""
+        matches = self.checker.check([q for _, q in batch], labels=[f'row {row_num}' for row_num, _ in batch])
+        keep = []
+        for (row_num, question), match in zip(batch, matches):
+            if match is None:
+                keep.append((row_num, question))
+                continue
+            self.duplicates.append((row_num, *match))
+            if self.near_duplicates == 'skip':
+                self.skipped += 1
+                self.rejected.append((row_num, f'near-duplicate of {match[0]} ({match[1]:.2f})'))
+            else:
+                keep.append((row_num, question))
+        return keep
+
+    def duplicate_notes(self):
+        action = 'skipped' if self.near_duplicates == 'skip' else 'imported'
+        return [f'Row {row_num}: near-duplicate of {match} ({score:.2f}), {action}'
+                for row_num, match, score in self.duplicates]
+
+    @staticmethod
+    def _entry(question):
+        return question, [question.chapter_id] if question.chapter_id else []
+
+    def _count(self, stored):
+        created = sum(1 for _, was_created in stored if was_created)
+        self.created += created
+        self.merged += len(stored) - created
+
+    def finish(self):
+        self.flush()
+        self.elapsed = time.monotonic() - self._started
+        return self
+
+    @property
+    def rows_per_sec(self):
+        return self.processed / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self):
+        near = f' {len(self.duplicates)} near-duplicates ({self.skipped} skipped).' if self.duplicates else ''
+        return (f'Created {self.created} questions, {self.merged} linked to existing ones.{near} '
+                f'{len(self.errors)} rows failed. ({self.rows_per_sec:.0f} rows/sec)')
+
+
+def import_csv(fileobj, batch_size=None, on_batch=None, near_duplicates=None):
+    """Stream a CSV upload through QuestionImporter and return the finished importer."""
+    importer = QuestionImporter(batch_size=batch_size, on_batch=on_batch, near_duplicates=near_duplicates)
+    for row_num, row in iter_csv_rows(fileobj):
+        importer.add_row(row_num, row)
+    return importer.finish()
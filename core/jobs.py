@@ -0,0 +1,273 @@
+# file: core/jobs.py
+"""
+ডাটাবেস-ভিত্তিক ছোট job runner।
+
+HTTP request থেকে `enqueue()` দিয়ে কাজ জমা হয়, `manage.py run_workers`
+এর worker process গুলো `claim_next()` দিয়ে একটি করে কাজ নিয়ে চালায়।
+নতুন ধরনের কাজের জন্য `@job_handler('kind')` দিয়ে একটি ফাংশন রেজিস্টার করুন;
+ফাংশনটি (job, progress) আর্গুমেন্ট পায়।
+
+worker প্রতিটি progress আপডেটে job-এর heartbeat_at নতুন করে। worker মারা গেলে
+(deploy, OOM) JOB_STALE_SECONDS পরে পরের `claim_next()` job-টি আবার queue-তে
+ফেরায়; JOB_MAX_ATTEMPTS বার দাবি হওয়ার পর সেটি ব্যর্থ হিসেবে থামে। প্রতিটি দাবির
+নিজস্ব attempts নম্বর থাকে, তাই ধীর কিন্তু বেঁচে থাকা পুরনো worker নতুন দাবির
+সারিতে আর লিখতে পারে না।
+"""
+import codecs
+import csv
+import logging
+import os
+import socket
+import tempfile
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.models import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {}
+
+# job.errors-এ সর্বোচ্চ কয়টি সারির ত্রুটি রাখা হবে
+MAX_STORED_ERRORS = getattr(settings, 'JOB_MAX_STORED_ERRORS', 200)
+STALE_SECONDS = getattr(settings, 'JOB_STALE_SECONDS', 600)
+MAX_ATTEMPTS = getattr(settings, 'JOB_MAX_ATTEMPTS', 3)
+# progress ছাড়া দীর্ঘ কাজ (এক্সপোর্ট) এত সেকেন্ড পরপর heartbeat দেয়
+HEARTBEAT_INTERVAL = 30
+
+
+class JobLost(Exception):
+    """The job was re-queued (or failed) by another worker while this one still ran it."""
+
+
+def job_handler(kind):
+    """Register a function as the handler for jobs of the given kind."""
+    def decorator(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(kind, payload=None, upload=None, user=None):
+    """Create a queued Job. `upload` (an UploadedFile) is stored for the worker to read."""
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f'unknown job kind: {kind}')
+    job = Job(kind=kind, payload=payload or {})
+    if user is not None and user.is_authenticated:
+        job.created_by = user
+    if upload is not None:
+        job.file.save(os.path.basename(upload.name), upload, save=False)
+    job.save()
+    return job
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def requeue_stale(now=None):
+    """Re-queue running jobs whose heartbeat is older than JOB_STALE_SECONDS.
+
+    Jobs that were already claimed JOB_MAX_ATTEMPTS times are failed instead.
+    Returns (requeued, failed).
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=STALE_SECONDS)
+    stale = Job.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status=Job.STATUS_RUNNING,
+    )
+    failed = stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status=Job.STATUS_FAILED, finished_at=now,
+        message=f'worker stopped responding ({MAX_ATTEMPTS} attempts)',
+    )
+    requeued = stale.filter(attempts__lt=MAX_ATTEMPTS).update(
+        status=Job.STATUS_QUEUED, worker='', heartbeat_at=None,
+        processed=0, succeeded=0, failed=0, message='re-queued: worker stopped responding',
+    )
+    if requeued or failed:
+        logger.warning('Stale jobs: %d re-queued, %d failed', requeued, failed)
+    return requeued, failed
+
+
+def claim_next(name=None):
+    """Atomically move the oldest queued job to running and return it (None if idle).
+
+    The conditional UPDATE works the same on PostgreSQL and SQLite: when two
+    workers race for one row, only one of them sees an update count of 1.
+    Stale running jobs are re-queued first.
+    """
+    name = name or worker_name()
+    requeue_stale()
+    candidates = (Job.objects.filter(status=Job.STATUS_QUEUED)
+                  .order_by('created_at', 'id').values_list('id', flat=True)[:5])
+    for job_id in candidates:
+        now = timezone.now()
+        claimed = Job.objects.filter(id=job_id, status=Job.STATUS_QUEUED).update(
+            status=Job.STATUS_RUNNING, worker=name, started_at=now, heartbeat_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(id=job_id)
+    return None
+
+
+class JobProgress:
+    """Writes progress counters to the Job row; callers report once per batch, not per row.
+
+    Every update is also a heartbeat. It only touches the row while this claim
+    still owns it, and raises JobLost once the job was re-queued.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.beat_at = time.monotonic()
+
+    def update(self, **fields):
+        for key, value in fields.items():
+            setattr(self.job, key, value)
+        owned = Job.objects.filter(id=self.job.id, status=Job.STATUS_RUNNING, attempts=self.job.attempts)
+        if not owned.update(heartbeat_at=timezone.now(), **fields):
+            raise JobLost(f'job {self.job.id} is no longer owned by this worker')
+        self.beat_at = time.monotonic()
+
+    def heartbeat(self):
+        """Refresh heartbeat_at if the last write is older than HEARTBEAT_INTERVAL."""
+        if time.monotonic() - self.beat_at >= HEARTBEAT_INTERVAL:
+            self.update()
+
+
+def run_job(job):
+    """Run one claimed job to completion and record the outcome."""
+    handler = JOB_HANDLERS.get(job.kind)
+    progress = JobProgress(job)
+    try:
+        if handler is None:
+            raise ValueError(f'no handler registered for {job.kind!r}')
+        handler(job, progress)
+    except JobLost:
+        logger.warning('Job %s (%s) was taken over while running; dropping this attempt', job.id, job.kind)
+        return job
+    except Exception as e:
+        logger.exception('Job %s (%s) failed', job.id, job.kind)
+        try:
+            progress.update(
+                status=Job.STATUS_FAILED,
+                message=str(e)[:255],
+                errors=(job.errors or []) + [traceback.format_exc(limit=5)],
+                finished_at=timezone.now(),
+            )
+        except JobLost:
+            pass
+        return job
+    try:
+        progress.update(status=Job.STATUS_DONE, finished_at=timezone.now())
+    except JobLost:
+        logger.warning('Job %s (%s) finished after it was taken over', job.id, job.kind)
+    return job
+
+
+def run_pending(name=None, limit=None):
+    """Run queued jobs in this process until the queue is empty (or `limit` jobs ran)."""
+    ran = 0
+    while limit is None or ran < limit:
+        job = claim_next(name)
+        if job is None:
+            break
+        run_job(job)
+        ran += 1
+    return ran
+
+
+def count_csv_records(fileobj, encoding='utf-8-sig'):
+    """Count data rows in a CSV file by streaming it once (header excluded)."""
+    count = sum(1 for _ in csv.reader(codecs.iterdecode(fileobj, encoding))) - 1
+    fileobj.seek(0)
+    return max(count, 0)
+
+
+# ---------------------------------
+# --- Job handlers ---
+# ---------------------------------
+
+@job_handler('import_questions_csv')
+def import_questions_csv(job, progress):
+    from core.importers import import_csv
+
+    def on_batch(importer):
+        progress.update(
+            processed=importer.processed,
+            succeeded=importer.created + importer.merged,
+            failed=len(importer.errors),
+            message=f'{importer.rows_per_sec:.0f} rows/sec',
+        )
+
+    with job.file.open('rb') as f:
+        progress.update(total=count_csv_records(f))
+        importer = import_csv(f, batch_size=job.payload.get('batch_size'), on_batch=on_batch,
+                              near_duplicates=job.payload.get('near_duplicates'))
+
+    progress.update(
+        processed=importer.processed,
+        succeeded=importer.created + importer.merged,
+        failed=len(importer.errors),
+        message=importer.summary(),
+        errors=(importer.errors + importer.duplicate_notes())[:MAX_STORED_ERRORS],
+    )
+
+
+@job_handler('render_papers_pdf')
+def render_papers_pdf(job, progress):
+    from django.core.files import File
+
+    from core.models import QuestionPaper
+    from core.pdf import render_batch
+
+    ids = job.payload.get('paper_ids') or []
+    papers = QuestionPaper.objects.in_bulk(ids)
+    # পেপারগুলো অনুরোধের ক্রমেই ছাপা হয়
+    ordered = [papers[i] for i in ids if i in papers]
+    progress.update(total=len(ordered))
+
+    def on_paper(done, rendered):
+        progress.update(processed=done, succeeded=done, message=f'{rendered} rendered, {done - rendered} from cache')
+
+    with tempfile.TemporaryFile() as f:
+        files, rendered = render_batch(ordered, f, include_omr=job.payload.get('include_omr', False), progress=on_paper)
+        f.seek(0)
+        job.output.save(f'papers-{job.id}.zip', File(f), save=False)
+    progress.update(output=job.output.name,
+                    message=f'{files} papers ({rendered} rendered, {files - rendered} from cache)')
+
+
+@job_handler('export_questions')
+def export_questions(job, progress):
+    """Write a filtered export (payload: format, gzip and the export_queryset filters) to job.output."""
+    from django.core.files import File
+
+    from core import exporters
+
+    payload = job.payload
+    fmt = payload.get('format') or 'csv'
+    compress = bool(payload.get('gzip'))
+    queryset = exporters.export_queryset(
+        class_id=payload.get('class_id'),
+        subject_id=payload.get('subject_id'),
+        chapter_ids=payload.get('chapter_ids') or [],
+        question_type=payload.get('question_type'),
+        all_chapters=payload.get('all_chapters', True),
+    )
+    size = 0
+    with tempfile.TemporaryFile() as f:
+        for chunk in exporters.stream_export(queryset, fmt, compress=compress):
+            f.write(chunk)
+            size += len(chunk)
+            progress.heartbeat()
+        f.seek(0)
+        job.output.save(f'questions-{job.id}.{fmt}' + ('.gz' if compress else ''), File(f), save=False)
+    progress.update(output=job.output.name, message=f'{size / 1024:.0f} KiB')
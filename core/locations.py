@@ -0,0 +1,115 @@
+# file: core/locations.py
+"""
+বিভাগ -> জেলা -> থানা ডেটাসেট।
+
+সম্পাদনযোগ্য উৎস `core/data/bd_locations.json`; `manage.py build_locations`
+থেকে দুটি ফাইল তৈরি হয়:
+  - `core/data/bd_locations.min.json`: compact array ফরম্যাট, সার্ভার এটিই পড়ে
+  - `static/locations/bd_locations.<fingerprint>.json`: একই bytes, signup পেজ
+    একবার fetch করে এবং ব্রাউজার চিরকাল ক্যাশ রাখতে পারে
+
+ফাইলটি প্রথম ব্যবহারের সময় একবার পড়া হয় (import-এ নয়), আর ভ্যালিডেশন ও
+choice লিস্টের জন্য O(1) lookup map তৈরি থাকে, তাই প্রতি request-এ কিছু
+নতুন করে বানাতে হয় না।
+"""
+import functools
+import hashlib
+import json
+from pathlib import Path
+
+DATA_DIR = Path(__file__).resolve().parent / 'data'
+SOURCE_FILE = DATA_DIR / 'bd_locations.json'
+COMPACT_FILE = DATA_DIR / 'bd_locations.min.json'
+STATIC_PREFIX = 'locations/bd_locations'
+
+DIVISION_PLACEHOLDER = ('', '----- বিভাগ নির্বাচন করুন -----')
+DISTRICT_PLACEHOLDER = ('', '----- জেলা নির্বাচন করুন -----')
+THANA_PLACEHOLDER = ('', '----- থানা নির্বাচন করুন -----')
+
+
+def compact(nested):
+    """{division: {district: [thana]}} -> [[division, [[district, [thana]]]]] (order kept)."""
+    return [[division, [[district, list(thanas)] for district, thanas in districts.items()]]
+            for division, districts in nested.items()]
+
+
+def compact_bytes(nested):
+    return json.dumps(compact(nested), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def fingerprint_of(raw):
+    return hashlib.sha1(raw).hexdigest()[:12]
+
+
+class LocationData:
+    def __init__(self, raw):
+        self.raw = raw
+        self.fingerprint = fingerprint_of(raw)
+        self.divisions = []
+        self.districts = {}         # division -> [district]
+        self.thanas = {}            # (division, district) -> [thana]
+        self.thana_sets = {}        # (division, district) -> {thana}
+        for division, districts in json.loads(raw):
+            self.divisions.append(division)
+            self.districts[division] = [d for d, _ in districts]
+            for district, thanas in districts:
+                self.thanas[(division, district)] = thanas
+                self.thana_sets[(division, district)] = frozenset(thanas)
+
+        self.division_choices = [DIVISION_PLACEHOLDER] + [(d, d) for d in self.divisions]
+        self.district_choices = {
+            division: [DISTRICT_PLACEHOLDER] + [(d, d) for d in districts]
+            for division, districts in self.districts.items()
+        }
+        self.thana_choices = {
+            key: [THANA_PLACEHOLDER] + [(t, t) for t in thanas] for key, thanas in self.thanas.items()
+        }
+
+    @property
+    def static_path(self):
+        return f'{STATIC_PREFIX}.{self.fingerprint}.json'
+
+    def as_dict(self):
+        return {
+            division: {district: list(self.thanas[(division, district)]) for district in districts}
+            for division, districts in self.districts.items()
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def get_data():
+    return LocationData(COMPACT_FILE.read_bytes())
+
+
+def divisions():
+    return get_data().divisions
+
+
+def districts(division):
+    return get_data().districts.get(division, [])
+
+
+def thanas(division, district):
+    return get_data().thanas.get((division, district), [])
+
+
+def is_valid(division, district, thana):
+    return thana in get_data().thana_sets.get((division, district), ())
+
+
+def division_choices():
+    return get_data().division_choices
+
+
+def district_choices(division):
+    return get_data().district_choices.get(division, [DISTRICT_PLACEHOLDER])
+
+
+def thana_choices(division, district):
+    return get_data().thana_choices.get((division, district), [THANA_PLACEHOLDER])
+
+
+def static_url():
+    """URL of the fingerprinted JSON the signup page downloads once."""
+    from django.templatetags.static import static
+    return static(get_data().static_path)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core.models import QuestionPaper
+from core.snapshots import backfill_snapshots
+
+
+class Command(BaseCommand):
+    help = "Write frozen question snapshots for papers that do not have one yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Papers per transaction')
+        parser.add_argument('--force', action='store_true',
+                            help='Rebuild existing snapshots from the current questions (changes old papers!)')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the papers that would be frozen')
+
+    def handle(self, *args, **options):
+        papers = QuestionPaper.objects.all()
+        if options['dry_run']:
+            pending = papers.count() if options['force'] else papers.filter(snapshot__isnull=True).count()
+            self.stdout.write(self.style.WARNING(f"Dry run: {pending} papers would be frozen."))
+            return
+        written = backfill_snapshots(papers, chunk_size=max(1, options['chunk_size']), force=options['force'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} paper snapshots."))
@@ -0,0 +1,70 @@
+import json
+import random
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+
+from core.benchmarks import (BENCH_PREFIX, BenchContext, SimulatedLatency, hot_read_requests,
+                             run_asgi_concurrent, run_wsgi_concurrent)
+
+
+class Command(BaseCommand):
+    help = ("Compare concurrent-request throughput of the hot read endpoints on the WSGI path "
+            "(sync views, thread pool) and the ASGI path (async views, one event loop)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400, help='Requests per run')
+        parser.add_argument('--concurrency', type=int, action='append',
+                            help='Requests in flight (repeatable; default 1, 8 and 32)')
+        parser.add_argument('--mode', choices=['wsgi', 'asgi', 'both'], default='both')
+        parser.add_argument('--db-latency', type=float, default=0.0,
+                            help='Milliseconds slept before every query, to mimic a database over the network')
+        parser.add_argument('--output', default='benchmark-concurrency.json')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--prefix', default=BENCH_PREFIX)
+
+    def handle(self, *args, **options):
+        try:
+            context = BenchContext(options['prefix'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        # দুই পথেই একই request তালিকা, যাতে তুলনা ন্যায্য হয়
+        requests = hot_read_requests(context, max(1, options['requests']), random.Random(options['seed']))
+        levels = options['concurrency'] or [1, 8, 32]
+        modes = ['wsgi', 'asgi'] if options['mode'] == 'both' else [options['mode']]
+        # ASGI পথ question_bank.settings_asgi-এর URLconf দিয়ে async view-এ যায়
+        urlconfs = {'wsgi': settings.ROOT_URLCONF, 'asgi': 'question_bank.urls_asgi'}
+        runners = {'wsgi': run_wsgi_concurrent, 'asgi': run_asgi_concurrent}
+
+        client = Client()
+        client.force_login(context.teacher)
+        cookie = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+
+        results = []
+        with override_settings(ALLOWED_HOSTS=['localhost', *settings.ALLOWED_HOSTS], QUERY_BUDGET_STRICT=False), \
+                SimulatedLatency(options['db_latency'] / 1000):
+            for mode in modes:
+                with override_settings(ROOT_URLCONF=urlconfs[mode]):
+                    # প্রথম request-এ URLconf, taxonomy ট্রি ও সার্চ backend লোড হয় — মাপের বাইরে রাখা হয়
+                    runners[mode](requests[:8], cookie, 1)
+                    for level in levels:
+                        r = runners[mode](requests, cookie, max(1, level))
+                        results.append(r)
+                        self.stdout.write(f"{mode:5} x{r['concurrency']:<4} {r['requests_per_sec']:8.1f} req/s  "
+                                          f"p50 {r['p50_ms']:8.2f} ms  p95 {r['p95_ms']:8.2f} ms  "
+                                          f"status {r['status_codes']}")
+
+        report = {
+            'meta': {
+                'database': connection.vendor,
+                'db_latency_ms': options['db_latency'],
+                'requests': len(requests),
+                'seed': options['seed'],
+            },
+            'runs': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
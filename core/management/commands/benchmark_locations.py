@@ -0,0 +1,79 @@
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import locations
+from core.forms import SignUpForm
+
+
+def timed(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6  # µs
+
+
+class Command(BaseCommand):
+    help = "Benchmark the location dataset: module import, first load and per-request signup form work"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+        parser.add_argument('--import-runs', type=int, default=5,
+                            help='Fresh interpreters used to time `import core.forms`')
+
+    def handle(self, *args, **options):
+        iterations = max(1, options['iterations'])
+        data = locations.get_data()
+        nested = data.as_dict()
+        division = data.divisions[0]
+        district = data.districts[division][0]
+        post = {'division': division, 'district': district, 'thana': data.thanas[(division, district)][0]}
+
+        # আগের কোড: forms.py ইমপোর্টে পুরো dict literal তৈরি হত
+        literal = compile('D = ' + repr(nested), '<literal>', 'exec')
+
+        def legacy_request():
+            # আগের signup_view প্রতি POST-এ এভাবে choice লিস্ট বানাত
+            choices = [('', '')] + [(d, d) for d in nested.keys()]
+            districts = nested.get(division, {}).keys()
+            choices += [('', '')] + [(d, d) for d in districts]
+            thanas = nested.get(division, {}).get(district, [])
+            choices += [('', '')] + [(t, t) for t in thanas]
+            return choices
+
+        def cold_load():
+            locations.get_data.cache_clear()
+            locations.get_data()
+
+        rows = [
+            ('build dataset at import (old literal)', timed(lambda: exec(literal, {}), iterations // 10 or 1)),
+            ('first load of compact file (new)', timed(cold_load, iterations // 10 or 1)),
+            ('choice lists per signup POST (old)', timed(legacy_request, iterations)),
+            ('choice lists per signup POST (new)',
+             timed(lambda: (locations.division_choices(), locations.district_choices(division),
+                            locations.thana_choices(division, district)), iterations)),
+            ('SignUpForm(data) construction (new)', timed(lambda: SignUpForm(post), iterations)),
+        ]
+        self.stdout.write(f"{'case':45} {'median µs':>12}")
+        for name, value in rows:
+            self.stdout.write(f"{name:45} {value:12.1f}")
+
+        runs = max(0, options['import_runs'])
+        if runs:
+            code = (
+                "import os, time, django;"
+                f"os.environ['DJANGO_SETTINGS_MODULE'] = {settings.SETTINGS_MODULE!r};"
+                "django.setup(); t = time.perf_counter(); import core.forms;"
+                "print(time.perf_counter() - t)"
+            )
+            samples = [float(subprocess.check_output([sys.executable, '-c', code], cwd=settings.BASE_DIR))
+                       for _ in range(runs)]
+            self.stdout.write(f"{'import core.forms (fresh process)':45} {statistics.median(samples) * 1e6:12.1f}")
+        self.stdout.write(f"compact file: {locations.COMPACT_FILE.stat().st_size} bytes, "
+                          f"static: {data.static_path}")
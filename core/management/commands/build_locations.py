@@ -0,0 +1,42 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import locations
+
+
+class Command(BaseCommand):
+    help = "Build the compact location dataset and its fingerprinted static JSON from core/data/bd_locations.json"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--static-dir', default=None,
+                            help='Where to write locations/bd_locations.<hash>.json (default: first STATICFILES_DIRS entry)')
+        parser.add_argument('--check', action='store_true',
+                            help='Only verify the built files are up to date; exit with an error if not')
+
+    def handle(self, *args, **options):
+        with open(locations.SOURCE_FILE, encoding='utf-8') as f:
+            raw = locations.compact_bytes(json.load(f))
+        static_dir = Path(options['static_dir'] or settings.STATICFILES_DIRS[0])
+        target = static_dir / f'{locations.STATIC_PREFIX}.{locations.fingerprint_of(raw)}.json'
+
+        current = locations.COMPACT_FILE.read_bytes() if locations.COMPACT_FILE.exists() else None
+        if options['check']:
+            if current != raw or not target.exists():
+                raise CommandError("Location data is stale; run `manage.py build_locations`.")
+            self.stdout.write(self.style.SUCCESS("Location data is up to date."))
+            return
+
+        locations.COMPACT_FILE.write_bytes(raw)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(raw)
+        # পুরনো fingerprint-এর ফাইল মুছে ফেলা হয়, যাতে static-এ একটিই কপি থাকে
+        for old in target.parent.glob(f'{Path(locations.STATIC_PREFIX).name}.*.json'):
+            if old != target:
+                old.unlink()
+        locations.get_data.cache_clear()
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {locations.COMPACT_FILE.name} and {target.relative_to(static_dir)} ({len(raw)} bytes)."
+        ))
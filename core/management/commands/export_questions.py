@@ -0,0 +1,50 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.exporters import DEFAULT_CHUNK_SIZE, FORMATS, export_queryset, stream_export
+
+
+class Command(BaseCommand):
+    help = "Stream questions to CSV or JSONL with the same columns import_questions reads"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--output', default='-', help='Output file (default: stdout)')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+        parser.add_argument('--class-id', type=int)
+        parser.add_argument('--subject-id', type=int)
+        parser.add_argument('--chapter-ids', default='', help='Comma separated chapter ids')
+        parser.add_argument('--question-type')
+        parser.add_argument('--primary-chapter-only', dest='all_chapters', action='store_false',
+                            help='One row per question with only its primary chapter '
+                                 '(default: one row per linked chapter, which re-import merges back)')
+        parser.add_argument('--all-chapters', dest='all_chapters', action='store_true',
+                            help='One row per linked chapter (the default; kept for existing scripts)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows fetched per query')
+
+    def handle(self, *args, **options):
+        queryset = export_queryset(
+            class_id=options['class_id'],
+            subject_id=options['subject_id'],
+            chapter_ids=[int(x) for x in options['chapter_ids'].split(',') if x.strip().isdigit()],
+            question_type=options['question_type'],
+            all_chapters=options['all_chapters'],
+        )
+        chunks = stream_export(queryset, options['format'], compress=options['gzip'],
+                               chunk_size=max(1, options['chunk_size']))
+        start = time.perf_counter()
+        size = 0
+        out = sys.stdout.buffer if options['output'] == '-' else open(options['output'], 'wb')
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+                size += len(chunk)
+        except OSError as e:
+            raise CommandError(str(e))
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+        self.stderr.write(self.style.SUCCESS(
+            f'Wrote {size / 1024:.0f} KiB in {time.perf_counter() - start:.1f}s'))
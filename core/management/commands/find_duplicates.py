@@ -0,0 +1,44 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Question
+from core.near_duplicates import backfill_signatures, find_clusters
+
+
+class Command(BaseCommand):
+    help = "List clusters of near-duplicate questions (MinHash/LSH); indexes questions without a signature first"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, help='Minimum estimated similarity (default: NEAR_DUPLICATE_THRESHOLD)')
+        parser.add_argument('--rebuild', action='store_true', help='Recompute every signature before searching')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--limit', type=int, default=50, help='Clusters to print (0 = all)')
+        parser.add_argument('--json', help='Also write all clusters to this file')
+
+    def handle(self, *args, **options):
+        threshold = options['threshold']
+        if threshold is not None and not 0 < threshold <= 1:
+            raise CommandError('--threshold must be between 0 and 1')
+
+        started = time.monotonic()
+        indexed = backfill_signatures(rebuild=options['rebuild'], chunk_size=max(1, options['chunk_size']),
+                                      progress=lambda n: self.stdout.write(f'  indexed {n} questions'))
+        if indexed:
+            self.stdout.write(f'Indexed {indexed} questions in {time.monotonic() - started:.1f}s.')
+
+        clusters = find_clusters(threshold, progress=lambda msg: self.stdout.write(f'  {msg}'))
+        shown = clusters if not options['limit'] else clusters[:options['limit']]
+        texts = dict(Question.objects.filter(id__in=[qid for c in shown for qid in c['ids']])
+                     .values_list('id', 'text'))
+        for cluster in shown:
+            self.stdout.write(f"{len(cluster['ids'])} questions, similarity >= {cluster['similarity']:.2f}")
+            for qid in cluster['ids']:
+                self.stdout.write(f"  Q#{qid}: {(texts.get(qid) or '')[:70]}")
+
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as f:
+                json.dump(clusters, f, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(clusters)} near-duplicate clusters found in {time.monotonic() - started:.1f}s.'))
@@ -0,0 +1,134 @@
+import csv
+import functools
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importers import DEFAULT_BATCH_SIZE, DEFAULT_NEAR_DUPLICATES, QuestionImporter, iter_file_rows, prepare_row
+from core.near_duplicates import MODES
+
+
+def parse_chunk(chunk, signatures=True):
+    """Validate and hash a chunk of (row_num, raw_row) in a worker process.
+
+    Returns a list of (row_num, prepared_dict, error) so the parent can keep file order.
+    Only plain dicts/strings/tuples cross the process boundary — no ORM objects.
+    """
+    out = []
+    for row_num, row in chunk:
+        try:
+            out.append((row_num, prepare_row(row, signatures), None))
+        except ValueError as e:
+            out.append((row_num, None, str(e)))
+    return out
+
+
+def chunked(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = "Bulk-load questions from CSV, JSONL or XLSX files (same columns as the admin CSV upload)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='+', help='One or more .csv, .jsonl or .xlsx files')
+        parser.add_argument('--format', choices=['csv', 'jsonl', 'xlsx'],
+                            help='Override the format detected from the file extension')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help='Questions per bulk_create/transaction')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Parser processes (1 = parse in this process)')
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help='Rows sent to a parser process at a time')
+        parser.add_argument('--rejects', help='Where to write rejected rows (default: <file>.rejected.csv)')
+        parser.add_argument('--near-duplicates', choices=MODES, default=DEFAULT_NEAR_DUPLICATES,
+                            help='Rows that nearly match an existing question: flag (import and list), '
+                                 'skip (write to the rejects file) or off')
+
+    def handle(self, *args, **options):
+        for path in options['files']:
+            if not os.path.exists(path):
+                raise CommandError(f'File not found: {path}')
+
+        for path in options['files']:
+            self.import_file(path, options)
+
+    def import_file(self, path, options):
+        self.stdout.write(f'Importing {path} ...')
+
+        def on_batch(importer):
+            self.stdout.write(f'  {importer.processed} rows, {importer.created} created, {importer.merged} merged, '
+                              f'{len(importer.errors)} rejected ({importer.rows_per_sec:.0f} rows/sec)')
+
+        importer = QuestionImporter(batch_size=options['batch_size'], on_batch=on_batch,
+                                    near_duplicates=options['near_duplicates'])
+        chunks = chunked(iter_file_rows(path, options['format']), max(1, options['chunk_size']))
+        workers = max(1, options['workers'])
+        # content hash আর MinHash signature worker-এই তৈরি হয়; parent শুধু DB-র কাজ করে
+        parse = functools.partial(parse_chunk, signatures=importer.checker is not None)
+
+        try:
+            if workers == 1:
+                for chunk in chunks:
+                    self.consume(importer, parse(chunk))
+            else:
+                # django.setup() লাগে spawn start method-এ (Windows), fork-এ এটি no-op
+                with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+                    # একসাথে সীমিত সংখ্যক chunk চালু রাখা হয় যাতে মেমরি ফাইলের আকারের উপর নির্ভর না করে
+                    window = workers * 2
+                    pending = [pool.submit(parse, c) for c in itertools.islice(chunks, window)]
+                    while pending:
+                        results = pending.pop(0).result()
+                        next_chunk = next(chunks, None)
+                        if next_chunk is not None:
+                            pending.append(pool.submit(parse, next_chunk))
+                        self.consume(importer, results)
+        except (ValueError, ImportError) as e:
+            raise CommandError(str(e))
+        importer.finish()
+
+        self.stdout.write(self.style.SUCCESS(f'{path}: {importer.summary()} in {importer.elapsed:.1f}s'))
+        for note in importer.notes[:10]:
+            self.stdout.write(f'  note: {note}')
+        for note in importer.duplicate_notes()[:10]:
+            self.stdout.write(f'  near-duplicate: {note}')
+        if importer.rejected:
+            rejects = options['rejects'] or f'{path}.rejected.csv'
+            if len(options['files']) > 1 and options['rejects']:
+                rejects = f"{options['rejects']}.{os.path.basename(path)}.csv"
+            self.write_rejects(rejects, iter_file_rows(path, options['format']), importer.rejected)
+            self.stdout.write(self.style.WARNING(f'  {len(importer.rejected)} rejected rows written to {rejects}'))
+
+    @staticmethod
+    def consume(importer, results):
+        for row_num, data, error in results:
+            if error is not None:
+                importer.add_error(row_num, error)
+            else:
+                importer.add_parsed(row_num, data)
+
+    @staticmethod
+    def write_rejects(path, rows, rejected):
+        """Write the rejected rows with their original columns plus `error`, ready to fix and re-import.
+
+        The source is streamed a second time and only the rejected rows are kept.
+        """
+        errors = {}
+        for row_num, message in rejected:
+            errors.setdefault(row_num, message)
+        kept = [(row, errors[row_num]) for row_num, row in rows if row_num in errors]
+        # CSV-র header ক্রম; JSONL-এ সারিভেদে কলাম আলাদা হতে পারে, তাই প্রথম দেখা ক্রমে সব কলাম
+        columns = list(dict.fromkeys(key for row, _ in kept for key in row if key and key != '__error__'))
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=columns + ['error'], extrasaction='ignore')
+            writer.writeheader()
+            for row, message in kept:
+                writer.writerow({**row, 'error': message})
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core.availability import recount
+from core.membership import merge_duplicates
+from core.models import PaperQuestion, Question, QuestionChapter, QuestionCount
+
+
+class Command(BaseCommand):
+    help = "Merge questions with identical content into one row linked to all their chapters"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only count the copies that would be merged')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows per batch')
+
+    def handle(self, *args, **options):
+        stats = merge_duplicates(Question, QuestionChapter, PaperQuestion,
+                                 chunk_size=max(1, options['chunk_size']), dry_run=options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(
+                f"Dry run: {stats['duplicates']} of {stats['questions']} questions would be merged."))
+        else:
+            # মেলানো সরাসরি SQL-এ হয় (signal ছাড়া), তাই প্রশ্ন গণনা নতুন করে
+            recount(Question, QuestionChapter, QuestionCount)
+            self.stdout.write(self.style.SUCCESS(
+                f"Merged {stats['duplicates']} of {stats['questions']} questions; {stats['links']} chapter links; "
+                f"{stats['papers']} papers held two copies and now list one."))
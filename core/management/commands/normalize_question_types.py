@@ -1,34 +1,33 @@
 from django.core.management.base import BaseCommand
-from core.models import Question
+from core.availability import recount
+from core.models import Question, QuestionChapter, QuestionCount
+from core.question_types import normalize_question_types
+
 
 class Command(BaseCommand):
     help = "Normalize question_type values to canonical keys: mcq, short, creative"
 
-    MAPPING = {
-        'mcq': ['mcq', 'multiple', 'multiple choice', 'multiple-choice', 'multiplechoice', 'বহু', 'বহুনির্বাচনী', 'বহু-নির্বাচনী', 'বহু নির্বাচনি', 'multiple choice', 'multiple choice '],
-        'short': ['short', 'সংক্ষিপ্ত', 'সংক্ষেপ', 'short answer', 'short-answer'],
-        'creative': ['creative', 'সৃজন', 'সৃজনশীল'],
-    }
-
-    def normalize(self, val):
-        if not val:
-            return ''
-        v = val.strip().lower()
-        for key, variants in self.MAPPING.items():
-            for variant in variants:
-                if variant in v:
-                    return key
-        return v  # fallback: leave lowercased original (will require manual review)
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report which raw values would change and how many rows')
+        parser.add_argument('--chunk-size', type=int, default=50000,
+                            help='Rows per UPDATE (id range)')
 
     def handle(self, *args, **options):
-        total = 0
-        changed = 0
-        for q in Question.objects.all():
-            total += 1
-            old = (q.question_type or '').strip()
-            new = self.normalize(old)
-            if new and new != old:
-                q.question_type = new
-                q.save(update_fields=['question_type'])
-                changed += 1
-        self.stdout.write(self.style.SUCCESS(f"Processed {total} questions, updated {changed}."))
\ No newline at end of file
+        plan, updated = normalize_question_types(
+            Question, chunk_size=max(1, options['chunk_size']), dry_run=options['dry_run'],
+        )
+        if not plan:
+            self.stdout.write(self.style.SUCCESS("All question_type values are already canonical."))
+            return
+
+        for key, raws in plan.items():
+            for raw, n in raws:
+                self.stdout.write(f"  {raw!r:40} -> {key!r:12} {n} rows")
+
+        pending = sum(n for raws in plan.values() for _, n in raws)
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"Dry run: {pending} questions would be updated."))
+        else:
+            recount(Question, QuestionChapter, QuestionCount)  # .update() signal পাঠায় না
+            self.stdout.write(self.style.SUCCESS(f"Updated {updated} questions ({len(plan)} canonical keys)."))
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.search import get_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the question full-text search index (tsvector on PostgreSQL, FTS5 on SQLite)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        backend = get_backend(options['database'])
+        started = time.monotonic()
+        total = rebuild_index(chunk_size=max(1, options['chunk_size']), alias=options['database'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {total} questions with {type(backend).__name__} in {time.monotonic() - started:.1f}s."
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core.availability import recount
+from core.models import Question, QuestionChapter, QuestionCount
+
+
+class Command(BaseCommand):
+    help = "Recompute the question availability counters (QuestionCount) and repair any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many counters are off')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        stats = recount(Question, QuestionChapter, QuestionCount,
+                        using=options['database'], dry_run=options['dry_run'])
+        drift = stats['created'] + stats['updated'] + stats['deleted']
+        summary = (f"{stats['rows']} counters: {stats['created']} missing, "
+                   f"{stats['updated']} wrong, {stats['deleted']} stale.")
+        if not drift:
+            self.stdout.write(self.style.SUCCESS(f"{stats['rows']} counters, all correct."))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"Dry run: {summary}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Repaired {summary}"))
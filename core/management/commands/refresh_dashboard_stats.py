@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.dashboard_stats import refresh
+
+
+class Command(BaseCommand):
+    help = "Refresh the dashboard rollups (papers per week, teachers' most used chapters); run from cron"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Recompute everything (catches deleted or edited older papers)')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        stats = refresh(full=options['full'], using=options['database'])
+        scope = f"since week of {stats['since']}" if stats['since'] else 'all papers'
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {stats['weeks']} weeks and {stats['teachers']} teachers ({scope}) "
+            f"in {time.monotonic() - started:.1f}s."
+        ))
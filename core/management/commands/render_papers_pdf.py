@@ -0,0 +1,44 @@
+import sys
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import QuestionPaper
+from core.pdf import render_batch
+
+
+class Command(BaseCommand):
+    help = "Render papers into a zip of per-paper PDFs for a print run (cached papers are not re-rendered)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', default='', help='Comma separated paper ids, printed in this order')
+        parser.add_argument('--creator', help='Username; print all of this teacher\'s papers')
+        parser.add_argument('--omr', action='store_true', help='Add an OMR answer sheet after each paper')
+        parser.add_argument('--output', default='-', help='Output zip file (default: stdout)')
+
+    def handle(self, *args, **options):
+        ids = [int(x) for x in options['ids'].split(',') if x.strip().isdigit()]
+        if ids:
+            by_id = QuestionPaper.objects.in_bulk(ids)
+            papers = [by_id[i] for i in ids if i in by_id]
+        elif options['creator']:
+            papers = list(QuestionPaper.objects.filter(creator__username=options['creator']).order_by('id'))
+        else:
+            raise CommandError('Pass --ids or --creator')
+        if not papers:
+            raise CommandError('No papers found')
+
+        start = time.perf_counter()
+        try:
+            if options['output'] == '-':
+                files, rendered = render_batch(papers, sys.stdout.buffer, include_omr=options['omr'])
+            else:
+                with open(options['output'], 'wb') as f:
+                    files, rendered = render_batch(papers, f, include_omr=options['omr'])
+        except (ImportError, ImproperlyConfigured) as e:
+            raise CommandError(str(e))
+        self.stderr.write(self.style.SUCCESS(
+            f"{files} papers zipped in {time.perf_counter() - start:.1f}s "
+            f"({rendered} rendered, {files - rendered} from cache)"
+        ))
@@ -0,0 +1,91 @@
+import json
+import platform
+import random
+import subprocess
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+
+from core.benchmarks import BENCH_PREFIX, BenchContext, default_scenarios, run_scenario
+from core.models import Question, QuestionPaper
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = "Drive the main views through the test client and write p50/p95/p99 latency and query counts as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Timed requests per scenario')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per scenario')
+        parser.add_argument('--upload-iterations', type=int, default=3,
+                            help='Iterations for admin_csv_upload (each imports 500 rows)')
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            help='Run only this scenario (repeatable)')
+        parser.add_argument('--output', default='benchmark-results.json')
+        parser.add_argument('--compare', help='Earlier results file; prints the p95 change per scenario')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--prefix', default=BENCH_PREFIX)
+
+    def handle(self, *args, **options):
+        try:
+            context = BenchContext(options['prefix'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        scenarios = default_scenarios(context)
+        if options['scenarios']:
+            unknown = set(options['scenarios']) - set(scenarios)
+            if unknown:
+                raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}. "
+                                   f"Available: {', '.join(scenarios)}")
+            scenarios = {name: scenarios[name] for name in options['scenarios']}
+
+        results = {}
+        # বেঞ্চমার্কে বাজেট ছাড়ালেও থামবে না; query সংখ্যা ফলাফলেই থাকে
+        with override_settings(ALLOWED_HOSTS=['testserver', *settings.ALLOWED_HOSTS], QUERY_BUDGET_STRICT=False):
+            for name, (user, fn) in scenarios.items():
+                client = Client()
+                if user is not None:
+                    client.force_login(user)
+                iterations = options['upload_iterations'] if name == 'admin_csv_upload' else options['iterations']
+                warmup = 0 if name == 'admin_csv_upload' else options['warmup']
+                results[name] = run_scenario(client, fn, max(1, iterations), warmup,
+                                             random.Random(options['seed']))
+                r = results[name]
+                self.stdout.write(f"{name:28} p50 {r['p50_ms']:8.2f} ms  p95 {r['p95_ms']:8.2f} ms  "
+                                  f"p99 {r['p99_ms']:8.2f} ms  queries {r['queries_p50']:g}")
+
+        report = {
+            'meta': {
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'git_revision': git_revision(),
+                'python': platform.python_version(),
+                'database': connection.vendor,
+                'questions': Question.objects.count(),
+                'papers': QuestionPaper.objects.count(),
+                'iterations': options['iterations'],
+                'seed': options['seed'],
+            },
+            'scenarios': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as f:
+                before = json.load(f)['scenarios']
+            for name, r in results.items():
+                if name in before and before[name]['p95_ms']:
+                    change = (r['p95_ms'] - before[name]['p95_ms']) / before[name]['p95_ms'] * 100
+                    self.stdout.write(f"{name:28} p95 {before[name]['p95_ms']:8.2f} -> {r['p95_ms']:8.2f} ms "
+                                      f"({change:+.1f}%)")
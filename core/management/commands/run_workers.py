@@ -0,0 +1,73 @@
+import multiprocessing
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+def worker_loop(poll_interval, once):
+    """Entry point of one worker process: claim and run jobs until stopped."""
+    import django
+    from django.apps import apps
+    if not apps.ready:  # spawn start method (Windows/macOS) — child has to set Django up
+        django.setup()
+
+    from django.db import close_old_connections
+    from core.jobs import claim_next, run_job, worker_name
+
+    name = worker_name()
+    while True:
+        close_old_connections()
+        job = claim_next(name)
+        if job is not None:
+            run_job(job)
+            continue
+        if once:
+            return
+        time.sleep(poll_interval)
+
+
+class Command(BaseCommand):
+    help = "Run background job workers (CSV imports, exports) from the Job table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=getattr(settings, 'JOB_WORKERS', 2),
+                            help='Number of worker processes')
+        parser.add_argument('--poll-interval', type=float, default=getattr(settings, 'JOB_POLL_INTERVAL', 2.0),
+                            help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty instead of polling forever')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        poll_interval = options['poll_interval']
+        once = options['once']
+
+        if workers == 1:
+            self.stdout.write('Starting 1 worker (in-process)')
+            try:
+                worker_loop(poll_interval, once)
+            except KeyboardInterrupt:
+                pass
+            return
+
+        # child process যেন parent-এর DB connection শেয়ার না করে
+        from django.db import connections
+        connections.close_all()
+
+        procs = [
+            multiprocessing.Process(target=worker_loop, args=(poll_interval, once), name=f'qb-worker-{i}')
+            for i in range(workers)
+        ]
+        for p in procs:
+            p.start()
+        self.stdout.write(f'Started {workers} workers: ' + ', '.join(str(p.pid) for p in procs))
+        try:
+            for p in procs:
+                p.join()
+        except KeyboardInterrupt:
+            for p in procs:
+                p.terminate()
+            for p in procs:
+                p.join()
+        self.stdout.write(self.style.SUCCESS('Workers stopped.'))
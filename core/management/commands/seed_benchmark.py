@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import BENCH_PREFIX, clear_dataset, seed_dataset
+from core.models import ClassName
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic question bank (bulk inserts) for benchmarking"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--classes', type=int, default=5)
+        parser.add_argument('--subjects', type=int, default=6, help='Subjects per class')
+        parser.add_argument('--chapters', type=int, default=10, help='Chapters per subject')
+        parser.add_argument('--questions', type=int, default=100000, help='Total questions')
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--papers', type=int, default=5000)
+        parser.add_argument('--questions-per-paper', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk_create')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (same seed = same dataset)')
+        parser.add_argument('--no-index', action='store_true',
+                            help='Skip the search index (run rebuild_search_index later)')
+        parser.add_argument('--prefix', default=BENCH_PREFIX, help='Name prefix that marks benchmark rows')
+        parser.add_argument('--clear', action='store_true', help='Delete an existing benchmark dataset first')
+        parser.add_argument('--clear-only', action='store_true', help='Only delete the benchmark dataset')
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if options['clear'] or options['clear_only']:
+            deleted = clear_dataset(prefix)
+            self.stdout.write(f"Deleted {deleted} benchmark rows.")
+            if options['clear_only']:
+                return
+        elif ClassName.objects.filter(name__startswith=f'{prefix} ').exists():
+            raise CommandError(f"A dataset with prefix {prefix!r} already exists; use --clear to replace it.")
+
+        start = time.perf_counter()
+        created = seed_dataset(
+            classes=options['classes'], subjects=options['subjects'], chapters=options['chapters'],
+            questions=options['questions'], users=options['users'], papers=options['papers'],
+            questions_per_paper=options['questions_per_paper'], batch_size=max(1, options['batch_size']),
+            seed=options['seed'], index=not options['no_index'], prefix=prefix,
+            progress=lambda message: self.stdout.write(f'  {message}'),
+        )
+        elapsed = time.perf_counter() - start
+        summary = ', '.join(f'{n} {name}' for name, n in created.items())
+        self.stdout.write(self.style.SUCCESS(f"Created {summary} in {elapsed:.1f}s."))
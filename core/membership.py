@@ -0,0 +1,228 @@
+# file: core/membership.py
+"""
+একটি প্রশ্ন একবারই সংরক্ষিত হয়; অধ্যায়ের সাথে সম্পর্ক QuestionChapter টেবিলে।
+
+আগে প্রতিটি subject × chapter কম্বিনেশনের জন্য পুরো লেখা ও অপশন সহ আলাদা সারি
+তৈরি হত। এখন প্রশ্নের কনটেন্ট (class, subject, type, category, লেখা, অপশন,
+উত্তর) থেকে একটি `content_hash` বের করা হয়; একই hash-এর প্রশ্ন আগে থেকে থাকলে
+নতুন সারি না লিখে শুধু অধ্যায়ের লিংক যোগ হয়। `Question.chapter` প্রশ্নের
+প্রধান অধ্যায় হিসেবে থেকে যায়, কিন্তু অধ্যায় দিয়ে ফিল্টার সবসময়
+`filter_chapters()` (membership ইনডেক্স) দিয়ে হয়।
+
+`merge_duplicates()` পুরনো কপিগুলো একটিতে মেলায় — migration ও
+`manage.py merge_duplicate_questions` দুটোই এটি ব্যবহার করে, তাই ফাংশনটি
+model class আর্গুমেন্ট হিসেবে নেয়।
+"""
+import hashlib
+import unicodedata
+
+from django.db import connections
+from django.db.models import Count
+
+from core.near_duplicates import index_signatures
+from core.search import index_questions, remove_questions
+
+HASH_FIELDS = ('class_name_id', 'subject_id', 'question_type', 'category',
+               'text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_option')
+# ইমপোর্ট worker process-এ DB ছাড়াই শুধু কনটেন্টের অংশটুকু normalize হয় (content_body),
+# parent class/subject id পেয়ে bind_content_hash() দিয়ে hash শেষ করে
+BODY_HASH_FIELDS = HASH_FIELDS[2:]
+# SQLite-এর query parameter সীমার নিচে থাকতে IN (...) তালিকা এই আকারে ভাগ হয়
+LOOKUP_CHUNK = 500
+
+
+def _normalize(value):
+    if value is None:
+        return ''
+    return ' '.join(unicodedata.normalize('NFC', str(value)).split())
+
+
+def content_body(values):
+    """Normalized, joined values — the string content_hash() hashes."""
+    return '\x1f'.join(_normalize(v) for v in values)
+
+
+def content_hash(values):
+    """Hash of the HASH_FIELDS values (in that order); whitespace/Unicode form do not matter."""
+    return hashlib.sha1(content_body(values).encode('utf-8')).hexdigest()
+
+
+def bind_content_hash(class_id, subject_id, body):
+    """content_hash() from the taxonomy ids and a content_body() of the BODY_HASH_FIELDS values."""
+    raw = content_body((class_id, subject_id)) + '\x1f' + body
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def question_hash(question):
+    return content_hash(getattr(question, f) for f in HASH_FIELDS)
+
+
+def _chunks(items, size=LOOKUP_CHUNK):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _update_column(model, column, pairs, using):
+    """UPDATE one column from (id, value) pairs with executemany (bulk_update's CASE is slow for big batches)."""
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.executemany(f'UPDATE {table} SET {connection.ops.quote_name(column)} = %s WHERE id = %s',
+                           [(value, pk) for pk, value in pairs])
+
+
+def filter_chapters(queryset, chapter_ids):
+    """Questions linked to any of `chapter_ids` (semi-join on the membership index, no duplicates)."""
+    from core.models import QuestionChapter
+
+    return queryset.filter(id__in=QuestionChapter.objects.filter(chapter_id__in=chapter_ids).values('question_id'))
+
+
+def store_questions(entries, batch_size=None, signatures=True):
+    """Save (Question, [chapter_id, ...]) pairs, reusing stored questions with the same content.
+
+    New questions are written with one bulk_create and indexed for search and
+    (unless signatures=False) near-duplicate lookup;
+    chapter links for new and reused questions are added with one more bulk
+    insert, and the availability counters move by what was actually added.
+    Returns [(stored_question, created)] in input order. Call inside a
+    transaction.
+    """
+    from core.availability import adjust, question_deltas
+    from core.models import Question, QuestionChapter
+
+    for question, chapter_ids in entries:
+        if question.chapter_id is None and chapter_ids:
+            question.chapter_id = chapter_ids[0]
+        if not question.content_hash:  # ইমপোর্ট আগে থেকেই বসিয়ে রাখতে পারে
+            question.content_hash = question_hash(question)
+
+    stored = {}
+    for chunk in _chunks({q.content_hash for q, _ in entries}):
+        for existing in (Question.objects.filter(content_hash__in=chunk)
+                         .only('id', 'content_hash', 'class_name', 'subject', 'chapter', 'question_type').order_by('-id')):
+            stored[existing.content_hash] = existing   # একাধিক থাকলে সবচেয়ে পুরনোটি
+
+    results = []
+    new = []
+    for question, _ in entries:
+        existing = stored.get(question.content_hash)
+        if existing is None:
+            stored[question.content_hash] = existing = question
+            new.append(question)
+        results.append((existing, existing is question))
+
+    if new:
+        Question.objects.bulk_create(new, batch_size=batch_size)
+        # bulk_create post_save signal পাঠায় না, তাই সার্চ ও near-duplicate ইনডেক্স এখানে হালনাগাদ করা হয়
+        index_questions(new, replace=False)
+        if signatures:
+            index_signatures(new, replace=False)
+    links = {(q.id, chapter_id) for (q, _), (_, chapter_ids) in zip(results, entries)
+             for chapter_id in [*chapter_ids, q.chapter_id] if chapter_id}
+    for chunk in _chunks({q.id for q, created in results if not created}):
+        links -= set(QuestionChapter.objects.filter(question_id__in=chunk).values_list('question_id', 'chapter_id'))
+    QuestionChapter.objects.bulk_create([QuestionChapter(question_id=qid, chapter_id=cid) for qid, cid in links],
+                                        batch_size=batch_size, ignore_conflicts=True)
+
+    # গণনার টেবিলও একই কারণে এখানে: নতুন প্রশ্ন বিষয়ের মোটে, নতুন লিংক অধ্যায়ের ঘরে
+    deltas = question_deltas((q.class_name_id, q.subject_id, q.question_type, ()) for q in new)
+    by_id = {q.id: q for q, _ in results}
+    for qid, chapter_id in links:
+        q = by_id[qid]
+        deltas[(q.class_name_id, q.subject_id, chapter_id, q.question_type)] += 1
+    adjust(deltas)
+    return results
+
+
+def merge_duplicates(question_model, link_model, paper_link_model, chunk_size=2000, dry_run=False,
+                     using='default'):
+    """Fold every question into the oldest one with the same content.
+
+    Fills content_hash, links each survivor to the chapters of all its copies,
+    points paper links at the survivor and deletes the copies. A paper that
+    held two copies keeps one, and its number_of_questions is lowered to match.
+    Returns {'questions': rows scanned, 'duplicates': rows merged,
+    'links': chapter links, 'papers': papers that lost a copy}.
+    """
+    questions = question_model._default_manager.using(using)
+    links = link_model._default_manager.using(using)
+    paper_links = paper_link_model._default_manager.using(using)
+
+    survivors = {}   # hash -> id
+    merged_into = {}  # duplicate id -> survivor id
+    pending_links = set()
+    pending_hashes = []
+    shrunk = set()   # যেসব পেপারে একই প্রশ্নের দুই কপি ছিল
+    stats = {'questions': 0, 'duplicates': 0, 'links': 0, 'papers': 0}
+
+    def flush_links():
+        # dry run-এ সেটটি জমতে থাকে, শেষে তার আকারই লিংক সংখ্যা
+        if pending_links and not dry_run:
+            links.bulk_create([link_model(question_id=q, chapter_id=c) for q, c in pending_links],
+                              batch_size=chunk_size, ignore_conflicts=True)
+            pending_links.clear()
+
+    def flush_hashes():
+        if pending_hashes and not dry_run:
+            _update_column(question_model, 'content_hash', pending_hashes, using)
+        pending_hashes.clear()
+
+    rows = questions.order_by('id').values_list('id', 'chapter_id', 'content_hash', *HASH_FIELDS)
+    for row in rows.iterator(chunk_size=chunk_size):
+        qid, chapter_id, old_hash = row[:3]
+        digest = content_hash(row[3:])
+        keep = survivors.setdefault(digest, qid)
+        stats['questions'] += 1
+        if keep != qid:
+            merged_into[qid] = keep
+        elif digest != old_hash:
+            pending_hashes.append((qid, digest))
+        if chapter_id:
+            pending_links.add((keep, chapter_id))
+        if len(pending_links) >= chunk_size:
+            flush_links()
+        if len(pending_hashes) >= chunk_size:
+            flush_hashes()
+    flush_hashes()
+    flush_links()
+    stats['duplicates'] = len(merged_into)
+    if dry_run:
+        stats['links'] = len(pending_links)
+        return stats
+
+    for chunk in _chunks(merged_into, chunk_size):
+        # কপির অধ্যায়-লিংক survivor-এ
+        for question_id, chapter_id in links.filter(question_id__in=chunk).values_list('question_id', 'chapter_id'):
+            pending_links.add((merged_into[question_id], chapter_id))
+        flush_links()
+
+        # পেপারের লিংক survivor-এ; একই পেপারে survivor আগে থেকেই থাকলে কপির লিংকটি বাদ
+        moved = list(paper_links.filter(question_id__in=chunk).values_list('id', 'paper_id', 'question_id'))
+        taken = set(paper_links.filter(
+            paper_id__in={paper_id for _, paper_id, _ in moved},
+            question_id__in={merged_into[q] for _, _, q in moved},
+        ).values_list('paper_id', 'question_id'))
+        updates, drop = [], []
+        for link_id, paper_id, question_id in moved:
+            target = (paper_id, merged_into[question_id])
+            if target in taken:
+                drop.append(link_id)
+                shrunk.add(paper_id)
+            else:
+                taken.add(target)
+                updates.append((link_id, target[1]))
+        paper_links.filter(id__in=drop).delete()
+        _update_column(paper_link_model, 'question_id', updates, using)
+
+        questions.filter(id__in=chunk).delete()
+        remove_questions(chunk, alias=using)
+
+    paper_model = paper_link_model._meta.get_field('paper').related_model
+    for chunk in _chunks(shrunk, chunk_size):
+        sizes = paper_links.filter(paper_id__in=chunk).order_by().values_list('paper_id').annotate(n=Count('id'))
+        _update_column(paper_model, 'number_of_questions', list(sizes), using)
+    stats['papers'] = len(shrunk)
+    stats['links'] = links.count()
+    return stats
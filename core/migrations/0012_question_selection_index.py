@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:12
+
+from django.db import migrations, models
+
+from core.question_types import normalize_question_types
+
+
+def normalize_existing(apps, schema_editor):
+    Question = apps.get_model('core', 'Question')
+    normalize_question_types(Question, using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_job'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_existing, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['class_name', 'subject', 'chapter', 'question_type', 'created_at'], name='core_q_selection_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:20
+
+import core.search
+import django.contrib.postgres.search
+from django.db import migrations
+
+from core.search import rebuild_index
+
+
+def create_search_index(apps, schema_editor):
+    # PostgreSQL-এ কলাম ও GIN ইনডেক্স উপরের AddField/AddIndex বানায়; SQLite-এ আলাদা FTS5 টেবিল
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS core_question_fts "
+            "USING fts5(document, tokenize='unicode61 remove_diacritics 0')"
+        )
+    elif vendor != 'postgresql':
+        return
+    rebuild_index(alias=schema_editor.connection.alias, model=apps.get_model('core', 'Question'))
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS core_question_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_question_selection_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=core.search.SearchVectorIndex(fields=['search_vector'], name='core_question_search_gin'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
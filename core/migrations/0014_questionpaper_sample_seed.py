@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:16
+
+import core.models
+from django.db import migrations, models
+from django.db.models import F
+from django.db.models.functions import Mod
+
+
+def spread_keys(apps, schema_editor):
+    # AddField সব পুরনো সারিতে একই key বসায়; id-এর multiplicative hash দিয়ে ছড়িয়ে দেওয়া
+    # (নতুন সারি random_sample_key() পায়)
+    apps.get_model('core', 'Question').objects.using(schema_editor.connection.alias).update(
+        sample_key=Mod(F('id') * 2654435761, core.models.SAMPLE_KEY_SPACE))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_question_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionpaper',
+            name='sample_seed',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='sample_key',
+            field=models.IntegerField(default=core.models.random_sample_key, editable=False),
+        ),
+        migrations.RunPython(spread_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['class_name', 'subject', 'sample_key'], name='core_q_sample_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_questionpaper_sample_seed'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='questionpaper',
+            index=models.Index(fields=['creator', 'created_at', 'id'], name='core_paper_creator_created_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def number_positions(apps, schema_editor):
+    # প্রতিটি পেপারে আগের ক্রম (link id অনুযায়ী) 0,1,2,... হিসেবে position-এ লেখা হয় — একটি set-based UPDATE
+    schema_editor.execute(
+        'UPDATE core_questionpaper_questions SET position = ('
+        ' SELECT COUNT(*) FROM core_questionpaper_questions AS prev'
+        ' WHERE prev.questionpaper_id = core_questionpaper_questions.questionpaper_id'
+        ' AND prev.id < core_questionpaper_questions.id)'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_questionpaper_snapshot'),
+    ]
+
+    operations = [
+        # আগের auto-created M2M টেবিলটিকেই through মডেল হিসেবে নেওয়া হয় — ডাটাবেসে কিছু বদলায় না
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='PaperQuestion',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('paper', models.ForeignKey(db_column='questionpaper_id', on_delete=django.db.models.deletion.CASCADE, related_name='question_links', to='core.questionpaper')),
+                        ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='paper_links', to='core.question')),
+                    ],
+                    options={
+                        'db_table': 'core_questionpaper_questions',
+                        'unique_together': {('paper', 'question')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='questionpaper',
+                    name='questions',
+                    field=models.ManyToManyField(blank=True, through='core.PaperQuestion', to='core.question'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='paperquestion',
+            name='position',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(number_positions, migrations.RunPython.noop),
+        migrations.AlterModelOptions(
+            name='paperquestion',
+            options={'ordering': ['position', 'id']},
+        ),
+        migrations.AddIndex(
+            model_name='paperquestion',
+            index=models.Index(fields=['paper', 'position'], name='core_paperq_position_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:35
+
+import core.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+from core.membership import merge_duplicates
+
+
+def merge_copies(apps, schema_editor):
+    # প্রতিটি subject × chapter কপি একটি প্রশ্নে মেলে; কপিগুলোর অধ্যায় membership লিংক হয়ে যায়
+    merge_duplicates(
+        apps.get_model('core', 'Question'),
+        apps.get_model('core', 'QuestionChapter'),
+        apps.get_model('core', 'PaperQuestion'),
+        using=schema_editor.connection.alias,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_paperquestion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=40),
+        ),
+        migrations.CreateModel(
+            name='QuestionChapter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chapter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_links', to='core.chapter')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chapter_links', to='core.question')),
+                ('sample_key', models.IntegerField(default=core.models.random_sample_key, editable=False)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='chapters',
+            field=models.ManyToManyField(blank=True, related_name='linked_questions', through='core.QuestionChapter', to='core.chapter', verbose_name='অধ্যায়সমূহ'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['class_name', 'subject', 'question_type', 'created_at'], name='core_q_subject_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questionchapter',
+            index=models.Index(fields=['chapter', 'question'], name='core_qchapter_chapter_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questionchapter',
+            index=models.Index(fields=['chapter', 'sample_key'], name='core_qchapter_sample_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='questionchapter',
+            unique_together={('question', 'chapter')},
+        ),
+        migrations.RunPython(merge_copies, migrations.RunPython.noop),
+    ]
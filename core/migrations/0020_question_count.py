@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from core.availability import recount
+
+
+def count_existing(apps, schema_editor):
+    recount(
+        apps.get_model('core', 'Question'),
+        apps.get_model('core', 'QuestionChapter'),
+        apps.get_model('core', 'QuestionCount'),
+        using=schema_editor.connection.alias,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_near_duplicate_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_type', models.CharField(blank=True, max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('chapter', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='question_counts', to='core.chapter')),
+                ('class_name', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_counts', to='core.classname')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_counts', to='core.subject')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('chapter__isnull', False)), fields=('class_name', 'subject', 'chapter', 'question_type'), name='core_qcount_chapter_uniq'), models.UniqueConstraint(condition=models.Q(('chapter__isnull', True)), fields=('class_name', 'subject', 'question_type'), name='core_qcount_subject_uniq')],
+            },
+        ),
+        migrations.RunPython(count_existing, migrations.RunPython.noop),
+    ]
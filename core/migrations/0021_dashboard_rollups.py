@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_question_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaperWeekCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.DateField(unique=True)),
+                ('papers', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TeacherChapterUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('questions', models.PositiveIntegerField(default=0)),
+                ('papers', models.PositiveIntegerField(default=0)),
+                ('rank', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='questionpaper',
+            index=models.Index(fields=['created_at'], name='core_paper_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='teacherchapterusage',
+            name='chapter',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='teacher_usage', to='core.chapter'),
+        ),
+        migrations.AddField(
+            model_name='teacherchapterusage',
+            name='teacher',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chapter_usage', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='teacherchapterusage',
+            index=models.Index(fields=['rank', 'teacher'], name='core_usage_rank_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='teacherchapterusage',
+            unique_together={('teacher', 'chapter')},
+        ),
+    ]
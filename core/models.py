@@ -1,9 +1,39 @@
 # file: core/models.py
+import random
 
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
 from django.db import models
+from django.urls import reverse
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 from smart_selects.db_fields import ChainedForeignKey, ChainedManyToManyField
 
+from core import taxonomy
+from core.membership import question_hash
+from core.question_types import normalize_question_type
+from core.search import SearchVectorIndex
+
+
+def _taxonomy_name(instance, field, lookup):
+    """Name of a taxonomy FK for __str__ without a lazy query.
+
+    Uses the already-loaded related object when select_related fetched it,
+    otherwise the shared taxonomy cache.
+    """
+    if instance._meta.get_field(field).is_cached(instance):
+        return getattr(instance, field).name
+    item = lookup(getattr(instance, f'{field}_id'))
+    return item['name'] if item else ''
+
+
+SAMPLE_KEY_SPACE = 2 ** 31
+
+
+def random_sample_key():
+    # core.sampling এই key-এর র‍্যান্ডম পরিসর পড়ে স্তর থেকে sample নেয়
+    return random.randrange(SAMPLE_KEY_SPACE)
+
 
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
@@ -33,7 +63,7 @@ class Subject(models.Model):
     class_name = models.ForeignKey(ClassName, on_delete=models.CASCADE, related_name='subjects', verbose_name="ক্লাস")
 
     def __str__(self):
-        return f"{self.name} - {self.class_name.name}"
+        return f"{self.name} - {_taxonomy_name(self, 'class_name', taxonomy.get_class)}"
 
     class Meta:
         verbose_name = "বিষয়"
@@ -45,7 +75,7 @@ class Chapter(models.Model):
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='chapters', verbose_name="বিষয়")
 
     def __str__(self):
-        return f"{self.name} ({self.subject.name})"
+        return f"{self.name} ({_taxonomy_name(self, 'subject', taxonomy.get_subject)})"
 
     class Meta:
         verbose_name = "অধ্যায়"
@@ -71,7 +101,8 @@ class QuestionPaper(models.Model):
         chained_model_field="subject",  # Chapter মডেলের subject ফিল্ডের সাথে মিলবে
         horizontal=True,
     )
-    questions = models.ManyToManyField('Question', blank=True)
+    # ক্রমসহ প্রশ্ন — PaperQuestion.position; পুরনো auto M2M টেবিলটিই ব্যবহার হয়
+    questions = models.ManyToManyField('Question', blank=True, through='PaperQuestion')
 
     QUESTION_TYPES = [
         ('mcq', 'বহু নির্বাচনি'),
@@ -80,11 +111,73 @@ class QuestionPaper(models.Model):
     ]
     question_type = models.CharField(max_length=50, choices=QUESTION_TYPES)
     number_of_questions = models.IntegerField()
+    # র‍্যান্ডম নির্বাচনের seed — একই seed দিলে একই প্রশ্নগুলো আবার পাওয়া যায়
+    sample_seed = models.BigIntegerField(null=True, blank=True)
+    # চূড়ান্ত হওয়ার মুহূর্তের প্রশ্নগুলোর compact কপি (core.snapshots); পরে প্রশ্ন এডিট হলেও পেপার বদলায় না
+    snapshot = models.JSONField(null=True, blank=True, editable=False)
+    finalized_at = models.DateTimeField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return self.program_name
 
+    def ordered_questions(self):
+        """Questions in paper order, with class/subject/chapter, in one query."""
+        return [
+            link.question for link in
+            self.question_links.select_related('question__class_name', 'question__subject', 'question__chapter')
+        ]
+
+    def set_questions(self, questions):
+        """Replace the paper's questions (Question objects or ids) keeping the given order.
+
+        One DELETE and one bulk INSERT, whatever the paper size.
+        """
+        ids = list(dict.fromkeys(getattr(q, 'pk', q) for q in questions))
+        self.question_links.all().delete()
+        PaperQuestion.objects.bulk_create([
+            PaperQuestion(paper=self, question_id=qid, position=position)
+            for position, qid in enumerate(ids)
+        ])
+
+    def reorder_questions(self, question_ids):
+        """Move the listed questions to the front in that order; the rest keep their relative order.
+
+        One SELECT and one bulk UPDATE.
+        """
+        links = list(self.question_links.all())
+        rank = {qid: i for i, qid in enumerate(dict.fromkeys(question_ids))}
+        links.sort(key=lambda link: (rank.get(link.question_id, len(rank)), link.position))
+        for position, link in enumerate(links):
+            link.position = position
+        PaperQuestion.objects.bulk_update(links, ['position'])
+
+    def duplicate(self, creator=None, **overrides):
+        """Copy the paper with its subjects, chapters and ordered questions (bulk inserts)."""
+        fields = {
+            'program_name': self.program_name, 'creator': creator or self.creator,
+            'class_level_id': self.class_level_id, 'question_type': self.question_type,
+            'number_of_questions': self.number_of_questions, 'sample_seed': self.sample_seed,
+            'snapshot': self.snapshot, 'finalized_at': self.finalized_at,
+        }
+        fields.update(overrides)
+        copy = QuestionPaper.objects.create(**fields)
+        copy.subjects.set(self.subjects.all())
+        copy.chapters.set(self.chapters.all())
+        PaperQuestion.objects.bulk_create([
+            PaperQuestion(paper=copy, question_id=link.question_id, position=link.position)
+            for link in self.question_links.all()
+        ])
+        return copy
+
+    class Meta:
+        indexes = [
+            # my_papers_list: creator-এর পেপার, (created_at, id) keyset pagination
+            models.Index(fields=['creator', 'created_at', 'id'], name='core_paper_creator_created_idx'),
+            # ড্যাশবোর্ড রোলআপের incremental refresh: সাম্প্রতিক সপ্তাহের পেপার
+            models.Index(fields=['created_at'], name='core_paper_created_idx'),
+        ]
+
 
 class Question(models.Model):
     # ... আগের ফিল্ডগুলো ...
@@ -95,6 +188,12 @@ class Question(models.Model):
         ('creative', 'Creative'),
     ]
     question_type = models.CharField(max_length=20, choices=QUESTION_TYPE_CHOICES, blank=True)
+    CATEGORY_CHOICES = [
+        ('sa', 'সাধারন প্রশ্ন'),
+        ('tp', 'টেস্ট পেপার প্রশ্ন'),
+        ('bd', 'বোর্ড প্রশ্ন'),
+    ]
+    category = models.CharField(max_length=2, choices=CATEGORY_CHOICES, default='sa', verbose_name='ক্যাটাগরি')
 
     class_name = models.ForeignKey(ClassName, on_delete=models.CASCADE, related_name='questions')
 
@@ -130,11 +229,222 @@ class Question(models.Model):
     option_d = models.CharField(max_length=1000, null=True, blank=True)
     correct_option = models.CharField(max_length=2, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # একই কনটেন্টের প্রশ্ন একবারই থাকে; অন্য অধ্যায়ে যোগ হয় `chapters` লিংক দিয়ে (core.membership)
+    content_hash = models.CharField(max_length=40, blank=True, default='', db_index=True, editable=False)
+    sample_key = models.IntegerField(default=random_sample_key, editable=False)
+    # PostgreSQL full-text ইনডেক্স (core.search লেখে); অন্য ডাটাবেসে NULL থাকে
+    search_vector = SearchVectorField(null=True, editable=False)
+    chapters = models.ManyToManyField(Chapter, through='QuestionChapter', related_name='linked_questions',
+                                      blank=True, verbose_name='অধ্যায়সমূহ')
 
     def __str__(self):
         short = self.text[:75].replace('\n', ' ')
-        return f"Q({self.id}) [{self.subject.name}] {short}"
+        return f"Q({self.id}) [{_taxonomy_name(self, 'subject', taxonomy.get_subject)}] {short}"
+
+    def as_dict(self):
+        return {
+            'id': self.id,
+            'text': self.text,
+            'question_type': self.question_type,
+            'option_a': self.option_a,
+            'option_b': self.option_b,
+            'option_c': self.option_c,
+            'option_d': self.option_d,
+            'correct_option': self.correct_option,
+            'class_id': self.class_name_id,
+            'subject_id': self.subject_id,
+            'chapter_id': self.chapter_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+
+    def save(self, *args, **kwargs):
+        # সব write path-এ (admin, modal, ইমপোর্ট) ক্যানোনিকাল key সংরক্ষণ করা হয়
+        self.question_type = normalize_question_type(self.question_type)
+        self.content_hash = question_hash(self)
+        super().save(*args, **kwargs)
 
     class Meta:
         verbose_name = 'প্রশ্ন'
         verbose_name_plural = 'প্রশ্ন সমূহ'
+        indexes = [
+            # teacher_question_select: class/subject/chapter/type equality + newest first
+            models.Index(fields=['class_name', 'subject', 'chapter', 'question_type', 'created_at'],
+                         name='core_q_selection_idx'),
+            # অধ্যায় membership দিয়ে ফিল্টার করার পর class/subject/type + newest first
+            models.Index(fields=['class_name', 'subject', 'question_type', 'created_at'],
+                         name='core_q_subject_type_idx'),
+            # অধ্যায় ছাড়া র‍্যান্ডম নির্বাচন: class/subject-এর ভিতরে sample_key পরিসর
+            models.Index(fields=['class_name', 'subject', 'sample_key'], name='core_q_sample_idx'),
+            SearchVectorIndex(fields=['search_vector'], name='core_question_search_gin'),
+        ]
+
+
+class QuestionChapter(models.Model):
+    """A question's membership in one chapter (a question can sit in many chapters)."""
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='chapter_links')
+    chapter = models.ForeignKey(Chapter, on_delete=models.CASCADE, related_name='question_links')
+    sample_key = models.IntegerField(default=random_sample_key, editable=False)
+
+    class Meta:
+        unique_together = [('question', 'chapter')]
+        indexes = [
+            # অধ্যায় -> প্রশ্ন lookup (filter_chapters, sampling)
+            models.Index(fields=['chapter', 'question'], name='core_qchapter_chapter_idx'),
+            # বড় অধ্যায় থেকে র‍্যান্ডম নির্বাচন: অধ্যায়ের ভিতরে sample_key পরিসর
+            models.Index(fields=['chapter', 'sample_key'], name='core_qchapter_sample_idx'),
+        ]
+
+
+class QuestionSignature(models.Model):
+    """MinHash signature of a question's normalized text + options (core.near_duplicates)."""
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, primary_key=True,
+                                    related_name='minhash_signature')
+    signature = models.BinaryField()
+
+
+class QuestionBucket(models.Model):
+    """One LSH band of a question's signature; questions sharing a bucket are near-duplicate candidates."""
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='lsh_buckets')
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['bucket', 'question'], name='core_qbucket_bucket_idx'),
+        ]
+
+
+class QuestionCount(models.Model):
+    """How many questions exist per class/subject/chapter/type (core.availability keeps it current).
+
+    chapter=NULL holds the subject total; a chapter row counts the questions linked to that chapter.
+    """
+    class_name = models.ForeignKey(ClassName, on_delete=models.CASCADE, related_name='question_counts')
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='question_counts')
+    chapter = models.ForeignKey(Chapter, on_delete=models.CASCADE, null=True, blank=True,
+                                related_name='question_counts')
+    question_type = models.CharField(max_length=20, blank=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # NULL unique-এ গোনা হয় না, তাই বিষয়ের মোট সারির জন্য আলাদা partial constraint
+            models.UniqueConstraint(fields=['class_name', 'subject', 'chapter', 'question_type'],
+                                    condition=models.Q(chapter__isnull=False), name='core_qcount_chapter_uniq'),
+            models.UniqueConstraint(fields=['class_name', 'subject', 'question_type'],
+                                    condition=models.Q(chapter__isnull=True), name='core_qcount_subject_uniq'),
+        ]
+
+
+class PaperWeekCount(models.Model):
+    """Papers created in the week starting `week` (Monday); core.dashboard_stats refreshes it."""
+    week = models.DateField(unique=True)
+    papers = models.PositiveIntegerField(default=0)
+
+
+class TeacherChapterUsage(models.Model):
+    """How many questions of a chapter a teacher has put on papers; rank 1 = most used (core.dashboard_stats)."""
+    teacher = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chapter_usage')
+    chapter = models.ForeignKey(Chapter, on_delete=models.CASCADE, related_name='teacher_usage')
+    questions = models.PositiveIntegerField(default=0)
+    papers = models.PositiveIntegerField(default=0)
+    rank = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = [('teacher', 'chapter')]
+        indexes = [
+            # ড্যাশবোর্ড: প্রতি শিক্ষকের প্রথম কয়েকটি অধ্যায় (rank <= n)
+            models.Index(fields=['rank', 'teacher'], name='core_usage_rank_idx'),
+        ]
+
+
+class PaperQuestion(models.Model):
+    """One question on a paper, at `position` (0-based)."""
+    paper = models.ForeignKey(QuestionPaper, on_delete=models.CASCADE, related_name='question_links',
+                              db_column='questionpaper_id')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='paper_links')
+    position = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'core_questionpaper_questions'
+        ordering = ['position', 'id']
+        unique_together = [('paper', 'question')]
+        indexes = [
+            models.Index(fields=['paper', 'position'], name='core_paperq_position_idx'),
+        ]
+
+
+def job_storage():
+    """Job uploads and outputs live outside MEDIA_ROOT; only the job_output view serves them."""
+    return FileSystemStorage(location=settings.PRIVATE_MEDIA_ROOT, base_url=None)
+
+
+class Job(models.Model):
+    """ব্যাকগ্রাউন্ড কাজ (CSV ইমপোর্ট, এক্সপোর্ট) — `manage.py run_workers` এগুলো চালায়।"""
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'অপেক্ষমান'),
+        (STATUS_RUNNING, 'চলমান'),
+        (STATUS_DONE, 'সম্পন্ন'),
+        (STATUS_FAILED, 'ব্যর্থ'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    payload = models.JSONField(default=dict, blank=True)
+    file = models.FileField(upload_to='jobs/input/', storage=job_storage, null=True, blank=True)
+    output = models.FileField(upload_to='jobs/output/', storage=job_storage, null=True, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+
+    # progress — worker প্রতি batch শেষে একবার আপডেট করে
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    succeeded = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    message = models.CharField(max_length=255, blank=True)
+    errors = models.JSONField(default=list, blank=True)
+
+    worker = models.CharField(max_length=100, blank=True)
+    # চলমান job-এর worker প্রতিটি progress আপডেটে এটি নতুন করে; পুরনো হলে worker মারা গেছে ধরা হয়
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Job({self.id}) {self.kind} [{self.status}]"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+    def as_dict(self):
+        percent = round(100 * self.processed / self.total, 1) if self.total else None
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'status_display': self.get_status_display(),
+            'finished': self.is_finished,
+            'total': self.total,
+            'processed': self.processed,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'percent': 100.0 if self.status == self.STATUS_DONE else percent,
+            'message': self.message,
+            'errors': self.errors[:10],
+            'output_url': reverse('job_output', args=[self.id]) if self.output else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    class Meta:
+        verbose_name = 'ব্যাকগ্রাউন্ড কাজ'
+        verbose_name_plural = 'ব্যাকগ্রাউন্ড কাজ সমূহ'
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='core_job_status_created_idx'),
+        ]
@@ -0,0 +1,252 @@
+# file: core/near_duplicates.py
+"""
+প্রায়-একই (near-duplicate) প্রশ্ন খোঁজার MinHash/LSH ইনডেক্স।
+
+প্রশ্নের লেখা ও অপশন search-এর `normalize_text()` দিয়ে নরমালাইজ করা হয় (বাংলা
+অঙ্ক -> ASCII, zero-width বাদ, ছোট হাতের), যতিচিহ্ন বাদ দিয়ে ৪-অক্ষরের
+shingle বানানো হয়, আর তা থেকে ৬৪টি MinHash মানের একটি signature (২৫৬ বাইট)
+QuestionSignature-এ রাখা হয়। প্রতিটি shingle-এর একটি SHAKE-128 digest-ই ৬৪টি
+স্বাধীন ৩২-বিট hash দেয়, আর প্রতি অবস্থানের minimum `zip`/`min` দিয়ে C-তে বের
+হয় — ৬৪টি permutation আলাদা করে Python লুপে হিসাব হয় না। signature ১৬টি band-এ
+ভাগ হয়; প্রতিটি band-এর hash একটি QuestionBucket সারি। নতুন প্রশ্নের সাথে মেলে এমন প্রশ্ন খুঁজতে শুধু
+তার ১৬টি bucket ইনডেক্স দিয়ে দেখা হয় — পুরো টেবিলের সাথে তুলনা নয়। bucket
+মিললে signature থেকে আনুমানিক Jaccard মিল বের করে NEAR_DUPLICATE_THRESHOLD
+(ডিফল্ট 0.8) এর সাথে মেলানো হয়।
+
+store_questions() ও Question-এর post_save signature হালনাগাদ রাখে (ইমপোর্ট
+`--near-duplicates off` হলে রাখে না); যেসব প্রশ্নের signature নেই সেগুলোর
+signature `manage.py find_duplicates` চালালে তৈরি হয়।
+"""
+import hashlib
+import operator
+import struct
+
+from django.conf import settings
+from django.db import transaction
+
+from core.search import SEARCH_TEXT_FIELDS, query_tokens
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 4
+DEFAULT_THRESHOLD = 0.8
+MODES = ('flag', 'skip', 'off')
+
+_MASK32 = (1 << 32) - 1
+# hash পদ্ধতি বদলালে সব signature আবার বানাতে হবে (find_duplicates --rebuild)
+_PACK = struct.Struct(f'<{NUM_PERM}I')
+_CHUNK = 500
+
+
+def threshold():
+    return getattr(settings, 'NEAR_DUPLICATE_THRESHOLD', DEFAULT_THRESHOLD)
+
+
+def shingles(values):
+    """Character shingles of the normalized, punctuation-free text."""
+    text = ' '.join(query_tokens(' '.join(v for v in values if v)))
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def signature(values):
+    """MinHash signature (tuple of NUM_PERM 32-bit ints) of text + options."""
+    rows = [_PACK.unpack(hashlib.shake_128(s.encode('utf-8')).digest(_PACK.size)) for s in shingles(values)]
+    if not rows:
+        return (_MASK32,) * NUM_PERM
+    return tuple(map(min, zip(*rows)))
+
+
+def question_signature(question):
+    # importer আগে থেকেই হিসাব করে রাখলে আবার করা হয় না
+    sig = getattr(question, '_minhash', None)
+    if sig is None:
+        sig = question._minhash = signature(getattr(question, f) for f in SEARCH_TEXT_FIELDS)
+    return sig
+
+
+def pack(sig):
+    return _PACK.pack(*sig)
+
+
+def unpack(raw):
+    return _PACK.unpack(bytes(raw))
+
+
+def band_keys(sig):
+    """One signed 64-bit key per LSH band (the band index is part of the key)."""
+    return [int.from_bytes(hashlib.blake2b(struct.pack(f'<B{ROWS}I', band, *sig[band * ROWS:(band + 1) * ROWS]),
+                                           digest_size=8).digest(), 'little', signed=True)
+            for band in range(BANDS)]
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of the two shingle sets."""
+    return sum(map(operator.eq, sig_a, sig_b)) / NUM_PERM
+
+
+def _chunks(items, size=_CHUNK):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def index_signatures(questions, replace=True, using='default'):
+    """Store signatures and LSH buckets for saved questions."""
+    from core.models import QuestionBucket, QuestionSignature
+
+    questions = [q for q in questions if q.pk is not None]
+    if not questions:
+        return
+    with transaction.atomic(using=using, savepoint=False):
+        if replace:
+            ids = [q.pk for q in questions]
+            for chunk in _chunks(ids):
+                QuestionSignature.objects.using(using).filter(question_id__in=chunk).delete()
+                QuestionBucket.objects.using(using).filter(question_id__in=chunk).delete()
+        signatures, buckets = [], []
+        for q in questions:
+            sig = question_signature(q)
+            signatures.append(QuestionSignature(question_id=q.pk, signature=pack(sig)))
+            buckets.extend(QuestionBucket(question_id=q.pk, bucket=key) for key in band_keys(sig))
+        QuestionSignature.objects.using(using).bulk_create(signatures, batch_size=_CHUNK)
+        QuestionBucket.objects.using(using).bulk_create(buckets, batch_size=_CHUNK * BANDS)
+
+
+def backfill_signatures(rebuild=False, chunk_size=2000, progress=None):
+    """Index questions that have no signature yet (all of them with rebuild). Returns the count."""
+    from core.models import Question, QuestionBucket, QuestionSignature
+
+    if rebuild:
+        QuestionBucket.objects.all().delete()
+        QuestionSignature.objects.all().delete()
+    fields = ['id', 'content_hash', *SEARCH_TEXT_FIELDS]
+    total, last_id = 0, 0
+    while True:
+        # id ধরে এগোনো হয় — নতুন signature লেখার পরেও missing-filter ঠিক থাকে
+        chunk = list(Question.objects.filter(id__gt=last_id, minhash_signature__isnull=True)
+                     .order_by('id').only(*fields)[:chunk_size])
+        if not chunk:
+            return total
+        index_signatures(chunk, replace=False)
+        total += len(chunk)
+        last_id = chunk[-1].id
+        if progress:
+            progress(total)
+
+
+class NearDuplicateChecker:
+    """Finds the closest stored (or earlier checked) question for each new one via LSH buckets.
+
+    Every check() call costs two indexed queries for the whole batch, no
+    matter how big the bank is.
+    """
+
+    def __init__(self, min_similarity=None):
+        self.min_similarity = threshold() if min_similarity is None else min_similarity
+        self._seen = {}   # bucket -> [(label, sig, content_hash)] for rows checked in this run
+
+    def check(self, questions, labels=None):
+        """Return [(match label, similarity) or None] aligned with `questions`.
+
+        A stored match is labelled `Q#<id>`; a row seen earlier in this run is
+        labelled with its entry in `labels`. Exact copies (same content_hash)
+        are not reported; store_questions() merges those.
+        """
+        from core.membership import question_hash
+        from core.models import QuestionBucket, QuestionSignature
+
+        sigs = [question_signature(q) for q in questions]
+        keys = [band_keys(sig) for sig in sigs]
+        hashes = [q.content_hash or question_hash(q) for q in questions]
+
+        members = {}
+        for chunk in _chunks({k for ks in keys for k in ks}):
+            for bucket, qid in QuestionBucket.objects.filter(bucket__in=chunk).values_list('bucket', 'question_id'):
+                members.setdefault(bucket, set()).add(qid)
+        stored = {}
+        for chunk in _chunks({qid for ids in members.values() for qid in ids}):
+            rows = QuestionSignature.objects.filter(question_id__in=chunk).values_list(
+                'question_id', 'signature', 'question__content_hash')
+            stored.update((qid, (unpack(raw), content_hash)) for qid, raw, content_hash in rows)
+
+        results = []
+        for i, (sig, ks, content_hash) in enumerate(zip(sigs, keys, hashes)):
+            best = None
+            candidates = {(f'Q#{qid}', *stored[qid]) for k in ks for qid in members.get(k, ()) if qid in stored}
+            candidates.update(entry for k in ks for entry in self._seen.get(k, ()))
+            for label, other, other_hash in candidates:
+                if other_hash == content_hash:
+                    continue
+                score = similarity(sig, other)
+                if score >= self.min_similarity and (best is None or score > best[1]):
+                    best = (label, score)
+            results.append(best)
+            label = labels[i] if labels else f'#{i}'
+            for k in ks:
+                self._seen.setdefault(k, []).append((label, sig, content_hash))
+        return results
+
+
+def find_clusters(min_similarity=None, max_bucket=200, progress=None):
+    """Group stored questions into near-duplicate clusters.
+
+    Candidate pairs come from shared LSH buckets only (buckets bigger than
+    `max_bucket` are truncated); each pair is checked against the signatures.
+    Returns [{'ids': [...], 'similarity': min pair score}] biggest first.
+    """
+    from core.models import QuestionBucket, QuestionSignature
+
+    min_similarity = threshold() if min_similarity is None else min_similarity
+    pairs = set()
+    current, group = None, []
+
+    def close_group():
+        ids = sorted(group)[:max_bucket]
+        pairs.update((a, b) for i, a in enumerate(ids) for b in ids[i + 1:])
+
+    rows = QuestionBucket.objects.order_by('bucket', 'question_id').values_list('bucket', 'question_id')
+    for bucket, qid in rows.iterator(chunk_size=10000):
+        if bucket != current:
+            if len(group) > 1:
+                close_group()
+            current, group = bucket, []
+        group.append(qid)
+    if len(group) > 1:
+        close_group()
+    if progress:
+        progress(f'{len(pairs)} candidate pairs')
+
+    sigs = {}
+    for chunk in _chunks({qid for pair in pairs for qid in pair}, 2000):
+        sigs.update((qid, unpack(raw)) for qid, raw in
+                    QuestionSignature.objects.filter(question_id__in=chunk).values_list('question_id', 'signature'))
+
+    parent = {}
+
+    def root(x):
+        while parent.get(x, x) != x:
+            parent[x] = parent.get(parent[x], parent[x])
+            x = parent[x]
+        return x
+
+    scores = {}
+    for a, b in pairs:
+        if a in sigs and b in sigs:
+            score = similarity(sigs[a], sigs[b])
+            if score >= min_similarity:
+                ra, rb = root(a), root(b)
+                if ra != rb:
+                    parent[max(ra, rb)] = min(ra, rb)
+                scores[(a, b)] = score
+
+    clusters = {}
+    for (a, b), score in scores.items():
+        cluster = clusters.setdefault(root(a), {'ids': set(), 'similarity': 1.0})
+        cluster['ids'].update((a, b))
+        cluster['similarity'] = min(cluster['similarity'], score)
+    result = [{'ids': sorted(c['ids']), 'similarity': c['similarity']} for c in clusters.values()]
+    result.sort(key=lambda c: (-len(c['ids']), c['ids'][0]))
+    return result
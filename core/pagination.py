@@ -0,0 +1,92 @@
+# file: core/pagination.py
+"""
+(created_at, id) এর উপর keyset / cursor pagination।
+
+Paginator প্রতি পেজে COUNT(*) আর OFFSET চালায়, তাই গভীর পেজ ধীর হয়।
+এখানে শেষ সারির (created_at, id) একটি cursor-এ রাখা হয় এবং পরের পেজ
+`WHERE (created_at, id) < cursor ORDER BY created_at DESC, id DESC LIMIT n+1`
+দিয়ে আসে — যেকোনো পেজের খরচ প্রথম পেজের সমান।
+"""
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+
+def encode_cursor(obj):
+    raw = f'{obj.created_at.isoformat()}|{obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (created_at, pk) or None for a missing/garbled cursor."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def parse_per_page(raw, default=DEFAULT_PER_PAGE):
+    try:
+        return min(max(int(raw), 1), MAX_PER_PAGE)
+    except (TypeError, ValueError):
+        return default
+
+
+def parse_start(raw):
+    """1-based row number of the first item on a page (only used for display)."""
+    try:
+        return max(int(raw), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+class KeysetPage:
+    """One page of newest-first results. Iterable like a Paginator page."""
+
+    def __init__(self, items, has_next, per_page, start_index=1):
+        self.items = items
+        self.has_next = has_next
+        self.per_page = per_page
+        self.start_index = start_index  # 1-based position of the first item (for row numbers)
+        self.next_cursor = encode_cursor(items[-1]) if has_next and items else None
+
+    @property
+    def next_start_index(self):
+        return self.start_index + len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+
+def _page_queryset(queryset, cursor, per_page):
+    position = decode_cursor(cursor)
+    if position is not None:
+        created_at, pk = position
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+    return queryset.order_by('-created_at', '-pk')[:per_page + 1]
+
+
+def keyset_page(queryset, cursor=None, per_page=DEFAULT_PER_PAGE, start_index=1):
+    """Fetch the page after `cursor` (newest first by created_at, id)."""
+    rows = list(_page_queryset(queryset, cursor, per_page))
+    return KeysetPage(rows[:per_page], len(rows) > per_page, per_page, start_index)
+
+
+async def akeyset_page(queryset, cursor=None, per_page=DEFAULT_PER_PAGE, start_index=1):
+    """keyset_page() through the async ORM (prefetch_related included)."""
+    rows = [row async for row in _page_queryset(queryset, cursor, per_page)]
+    return KeysetPage(rows[:per_page], len(rows) > per_page, per_page, start_index)
@@ -0,0 +1,155 @@
+# file: core/pdf.py
+"""
+সার্ভারে প্রশ্নপত্রের PDF তৈরি, ডিস্ক ক্যাশ আর ব্যাচ প্রিন্ট।
+
+PDF তৈরি হয় পেপারের frozen snapshot (core.snapshots) থেকে, তাই একই পেপারের
+কনটেন্ট কখনো বদলায় না। ফাইলের নাম পেপারের কনটেন্ট hash — ক্যাশে থাকলে
+কোনো রেন্ডারিং ছাড়াই সরাসরি ফাইলটি পাঠানো হয়।
+
+বাংলা যুক্তাক্ষর ঠিকমতো দেখাতে HarfBuzz shaping লাগে, তাই রেন্ডারার
+WeasyPrint (pip install weasyprint)। ফন্ট নেওয়া হয় PAPER_PDF_FONT_DIR
+(ডিফল্ট static/fonts) থেকে — সেখানে HindSiliguri-*.ttf (Google Fonts, OFL)
+রাখতে হবে। ফন্ট না থাকলে রেন্ডার ImproperlyConfigured তোলে, আর `manage.py
+check` সতর্ক করে; সিস্টেমের যেকোনো ফন্টে চুপচাপ ভাঙা বাংলা ছাপা হয় না।
+ব্যাচ প্রিন্টে প্রতিটি পেপারের ক্যাশ করা PDF একটি zip-এ একে একে কপি হয়, তাই
+পেপার যত বেশিই হোক মেমরিতে একবারে একটির বেশি থাকে না।
+"""
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+from django.template.loader import render_to_string
+
+from core.snapshots import freeze_paper, snapshot_questions
+
+# টেমপ্লেট/লেআউট বদলালে বাড়ান — পুরনো ক্যাশ ফাইল তখন আর মিলবে না
+PDF_LAYOUT_VERSION = 1
+FONT_FAMILY = 'Hind Siliguri'
+_FONT_WEIGHTS = {'Light': 300, 'Regular': 400, 'Medium': 500, 'SemiBold': 600, 'Bold': 700}
+OMR_OPTIONS = ('ক', 'খ', 'গ', 'ঘ')
+_BN_DIGITS = str.maketrans('0123456789', '০১২৩৪৫৬৭৮৯')
+
+
+def font_dir():
+    return Path(getattr(settings, 'PAPER_PDF_FONT_DIR', settings.BASE_DIR / 'static' / 'fonts'))
+
+
+def cache_dir():
+    return Path(getattr(settings, 'PAPER_PDF_CACHE_DIR', Path(settings.MEDIA_ROOT) / 'pdf_cache'))
+
+
+def font_faces():
+    """[(weight, file URI)] for the Hind Siliguri files found in the font dir."""
+    faces = []
+    for path in sorted(font_dir().glob('HindSiliguri-*.ttf')):
+        weight = _FONT_WEIGHTS.get(path.stem.split('-', 1)[1])
+        if weight:
+            faces.append((weight, path.resolve().as_uri()))
+    return faces
+
+
+def check_fonts(app_configs=None, **kwargs):
+    """Deploy check (`manage.py check --deploy`): warn when PAPER_PDF_FONT_DIR has no PDF fonts."""
+    if font_faces():
+        return []
+    return [checks.Warning(
+        f'No HindSiliguri-*.ttf in {font_dir()}; server-side paper PDFs will fail.',
+        hint='Download Hind Siliguri from Google Fonts into PAPER_PDF_FONT_DIR.',
+        id='core.W001',
+    )]
+
+
+def paper_hash(paper, include_omr=False):
+    """Content hash of everything that ends up in the PDF."""
+    if paper.snapshot is None:
+        freeze_paper(paper)
+    content = {
+        'layout': PDF_LAYOUT_VERSION,
+        'omr': bool(include_omr),
+        'name': paper.program_name,
+        'type': paper.question_type,
+        'date': paper.created_at.date().isoformat() if paper.created_at else None,
+        'snapshot': paper.snapshot,
+        'fonts': [uri.rsplit('/', 1)[-1] for _, uri in font_faces()],
+    }
+    raw = json.dumps(content, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def cache_path(digest):
+    return cache_dir() / digest[:2] / f'{digest}.pdf'
+
+
+def render_paper_html(paper, include_omr=False):
+    questions = snapshot_questions(paper.snapshot)
+    return render_to_string('core/paper_pdf.html', {
+        'paper': paper,
+        'class_name': paper.snapshot['class'],
+        'subject_names': paper.snapshot['subjects'],
+        'questions': [dict(q, number=str(i).translate(_BN_DIGITS)) for i, q in enumerate(questions, start=1)],
+        'include_omr': include_omr,
+        'omr_rows': [str(i).translate(_BN_DIGITS) for i in range(1, len(questions) + 1)],
+        'omr_options': OMR_OPTIONS,
+        'font_family': FONT_FAMILY,
+        'font_faces': font_faces(),
+    })
+
+
+def html_to_pdf(html):
+    if not font_faces():
+        raise ImproperlyConfigured(f'Server-side PDF needs HindSiliguri-*.ttf in {font_dir()} (PAPER_PDF_FONT_DIR)')
+    try:
+        from weasyprint import HTML
+        from weasyprint.text.fonts import FontConfiguration
+    except ImportError:
+        raise ImportError('Server-side PDF requires WeasyPrint (pip install weasyprint)')
+    return HTML(string=html, base_url=str(settings.BASE_DIR)).write_pdf(font_config=FontConfiguration())
+
+
+def _write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # একসাথে দুই worker একই পেপার রেন্ডার করলেও অর্ধেক-লেখা ফাইল কেউ দেখে না
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def get_paper_pdf(paper, include_omr=False):
+    """Path of the paper's PDF, rendering it only on a cache miss. Returns (path, digest, was_cached)."""
+    digest = paper_hash(paper, include_omr)
+    path = cache_path(digest)
+    if path.exists():
+        return path, digest, True
+    _write_atomic(path, html_to_pdf(render_paper_html(paper, include_omr)))
+    return path, digest, False
+
+
+def render_batch(papers, fileobj, include_omr=False, progress=None):
+    """Write the PDFs of `papers` into `fileobj` as a zip, one numbered file per paper in order.
+
+    Every paper goes through the per-paper cache, so a re-run only renders new
+    or changed papers, and each cached file is copied into the zip on its own.
+    Returns (files, rendered) — rendered = cache misses.
+    """
+    rendered = 0
+    # PDF আগে থেকেই সংকুচিত, আবার deflate করে লাভ নেই
+    with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for done, paper in enumerate(papers, start=1):
+            path, _, cached = get_paper_pdf(paper, include_omr)
+            rendered += not cached
+            archive.write(path, f"{done:03d}-paper-{paper.id}{'-omr' if include_omr else ''}.pdf")
+            if progress:
+                progress(done, rendered)
+    return len(papers), rendered
@@ -0,0 +1,128 @@
+# file: core/query_budget.py
+"""
+প্রতি request-এর query সংখ্যা, duplicate SQL আর DB সময় মাপা।
+
+`QueryBudgetMiddleware` সব ডাটাবেস connection-এ একটি execute_wrapper বসায়।
+URL name অনুযায়ী বাজেট `QUERY_BUDGETS` সেটিং থেকে আসে (না থাকলে
+`QUERY_BUDGET_DEFAULT`)। বাজেট ছাড়ালে production-এ warning লগ হয়; টেস্টে
+(`QUERY_BUDGET_STRICT = True`, যা core.testing-এর runner চালু করে)
+`QueryBudgetExceeded` ওঠে এবং টেস্ট ফেল করে।
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET = 30
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryRecorder:
+    """execute_wrapper that records every query run while it is installed."""
+
+    def __init__(self):
+        self.queries = []   # (alias, sql, params, seconds)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            alias = context['connection'].alias
+            self.queries.append((alias, sql, params, time.perf_counter() - start))
+
+    def record(self):
+        """Install on every configured connection; use as a context manager."""
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(self))
+        return stack
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def db_time(self):
+        return sum(q[3] for q in self.queries)
+
+    def duplicates(self):
+        """{sql: times} for identical SQL + params run more than once (usually an N+1)."""
+        counts = Counter((sql, repr(params)) for _, sql, params, _ in self.queries)
+        return {sql: n for (sql, _), n in counts.items() if n > 1}
+
+    def summary(self):
+        return f"{self.count} queries, {self.db_time * 1000:.1f} ms DB, {sum(self.duplicates().values())} duplicate"
+
+
+def budget_for(url_name):
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    if url_name in budgets:
+        return budgets[url_name]
+    return getattr(settings, 'QUERY_BUDGET_DEFAULT', DEFAULT_BUDGET)
+
+
+def check_budget(recorder, budget, label, strict=None):
+    """Log (or raise in strict mode) when `recorder` went over `budget`."""
+    if budget is None or recorder.count <= budget:
+        return
+    duplicates = recorder.duplicates()
+    message = f"{label}: {recorder.summary()} (budget {budget})"
+    if duplicates:
+        worst_sql, times = max(duplicates.items(), key=lambda item: item[1])
+        message += f"; most repeated ({times}x): {worst_sql[:200]}"
+    if strict is None:
+        strict = getattr(settings, 'QUERY_BUDGET_STRICT', False)
+    if strict:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+class QueryBudgetMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        with recorder.record():
+            response = self.get_response(request)
+        return self.finish(request, response, recorder)
+
+    async def __acall__(self, request):
+        # connection thread-local; async ORM এই request-এর সব query একই thread-sensitive
+        # thread-এ চালায়, তাই wrapper-ও সেখানেই বসাতে ও সরাতে হয়
+        recorder = QueryRecorder()
+        stack = await sync_to_async(recorder.record)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, recorder)
+
+    def finish(self, request, response, recorder):
+        # streaming রেসপন্সের query বডি পড়ার সময় চলে, সেগুলো এখানে ধরা পড়ে না
+        request.query_recorder = recorder
+
+        match = getattr(request, 'resolver_match', None)
+        url_name = match.view_name if match else None
+        if settings.DEBUG:
+            response['Server-Timing'] = f'db;dur={recorder.db_time * 1000:.1f};desc="{recorder.count} queries"'
+        if url_name:
+            check_budget(recorder, budget_for(url_name), f"{request.method} {url_name}")
+        return response
@@ -0,0 +1,72 @@
+# file: core/question_types.py
+"""
+question_type-এর ক্যানোনিকাল key (mcq, short, creative) ও নরমালাইজেশন।
+
+`normalize_question_type()` একটি raw মান (ইংরেজি/বাংলা লেবেল) থেকে key বের করে।
+`normalize_question_types()` পুরো টেবিল set-based ভাবে ঠিক করে: distinct raw মান
+প্রতি একবার নরমালাইজ করে, তারপর প্রতি key-এর জন্য chunk আকারে একটি `.update()`।
+ফাংশনটি model class আর্গুমেন্ট হিসেবে নেয়, তাই data migration থেকেও চালানো যায়।
+"""
+from django.db.models import Count, Max, Min
+
+MAPPING = {
+    'mcq': ['mcq', 'multiple', 'multiple choice', 'multiple-choice', 'multiplechoice', 'বহু', 'বহুনির্বাচনী', 'বহু-নির্বাচনী', 'বহু নির্বাচনি'],
+    'short': ['short', 'সংক্ষিপ্ত', 'সংক্ষেপ', 'short answer', 'short-answer'],
+    'creative': ['creative', 'সৃজন', 'সৃজনশীল'],
+}
+
+
+def normalize_question_type(val):
+    """Return the canonical key for a raw question_type label.
+
+    Unknown labels are returned stripped and lowercased (they need manual review).
+    """
+    if not val:
+        return ''
+    v = val.strip().lower()
+    for key, variants in MAPPING.items():
+        for variant in variants:
+            if variant in v:
+                return key
+    return v
+
+
+def plan_question_type_updates(model, using='default'):
+    """Group distinct raw values by their canonical key.
+
+    Returns {key: [(raw_value, row_count), ...]} for values that need to change.
+    """
+    plan = {}
+    rows = (model._default_manager.using(using)
+            .values('question_type').annotate(n=Count('id')).order_by())
+    for row in rows:
+        raw = row['question_type']
+        new = normalize_question_type(raw)
+        if new and new != raw:
+            plan.setdefault(new, []).append((raw, row['n']))
+    return plan
+
+
+def normalize_question_types(model, chunk_size=50000, dry_run=False, using='default'):
+    """Rewrite every non-canonical question_type with one UPDATE per key and id-range chunk.
+
+    Returns the plan from plan_question_type_updates() and the number of rows updated.
+    """
+    plan = plan_question_type_updates(model, using=using)
+    if dry_run or not plan:
+        return plan, 0
+
+    manager = model._default_manager.using(using)
+    bounds = manager.aggregate(lo=Min('id'), hi=Max('id'))
+    updated = 0
+    for key, raws in plan.items():
+        raw_values = [raw for raw, _ in raws]
+        # id-range chunk, যাতে একটি UPDATE পুরো টেবিল একসাথে লক না করে
+        start = bounds['lo']
+        while start is not None and start <= bounds['hi']:
+            end = start + chunk_size
+            updated += manager.filter(
+                id__gte=start, id__lt=end, question_type__in=raw_values,
+            ).update(question_type=key)
+            start = end
+    return plan, updated
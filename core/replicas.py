@@ -0,0 +1,136 @@
+# file: core/replicas.py
+"""
+Read replica-তে read query পাঠানোর database router।
+
+`DATABASE_REPLICAS` সেটিং-এ replica alias-গুলোর নাম থাকে (DATABASES-এ সংজ্ঞায়িত)।
+`ReplicaMiddleware` প্রতিটি request-এর জন্য একটি replica বেছে নেয়; সেই request-এর
+সব read সেখানে যায়, সব write `default` (primary)-তে।
+
+read-your-writes: request-এ কোনো write হলেই (db_for_write ডাকা মানেই) বাকি
+request primary থেকে পড়ে, আর রেসপন্সে একটি কুকি বসে যাতে পরের
+`REPLICA_PIN_SECONDS` সেকেন্ড ওই ব্যবহারকারীর সব request primary-তে যায় —
+replica পিছিয়ে থাকলেও নিজের বানানো পেপার বা লগইন সেশন হারায় না। POST ইত্যাদি
+unsafe request আর transaction-এর ভিতরের read-ও primary-তে যায়।
+
+request-এর বাইরে (management command, job worker) সব query primary-তে যায়।
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = 'qb_primary'
+DEFAULT_PIN_SECONDS = 5
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_state = ContextVar('replica_state', default=None)
+
+
+def replicas():
+    return [alias for alias in getattr(settings, 'DATABASE_REPLICAS', ()) if alias in settings.DATABASES]
+
+
+def pin_seconds():
+    return getattr(settings, 'REPLICA_PIN_SECONDS', DEFAULT_PIN_SECONDS)
+
+
+class RoutingState:
+    """Per-request routing: the chosen replica, or None once the request is pinned to the primary."""
+
+    def __init__(self, replica):
+        self.replica = replica
+        self.wrote = False
+
+    def pin(self):
+        self.replica = None
+
+
+def pin_primary():
+    """Send the rest of this request's reads to the primary."""
+    state = _state.get()
+    if state is not None:
+        state.pin()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.replica is None:
+            return DEFAULT_DB_ALIAS
+        # transaction-এর ভিতরে নিজের অসমাপ্ত write দেখতে হবে
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+            state.pin()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replica primary-র কপি, তাই যেকোনো alias-এর অবজেক্টের মধ্যে সম্পর্ক বৈধ
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replica-র স্কিমা ডাটাবেস replication থেকে আসে
+        if db in getattr(settings, 'DATABASE_REPLICAS', ()):
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    """Pick a replica per request and keep recent writers on the primary (pin cookie)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(request, response, state)
+
+    async def __acall__(self, request):
+        state, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(request, response, state)
+
+    @staticmethod
+    def start(request):
+        aliases = replicas()
+        replica = random.choice(aliases) if aliases else None
+        if request.method not in SAFE_METHODS or _pinned_until(request) > time.time():
+            replica = None
+        state = RoutingState(replica)
+        return state, _state.set(state)
+
+    @staticmethod
+    def finish(request, response, state):
+        if state.wrote and replicas():
+            window = pin_seconds()
+            response.set_cookie(PIN_COOKIE, f'{time.time() + window:.3f}', max_age=window,
+                                httponly=True, samesite='Lax', secure=request.is_secure())
+        return response
+
+
+def _pinned_until(request):
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0))
+    except ValueError:
+        return 0.0
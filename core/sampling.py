@@ -0,0 +1,209 @@
+# file: core/sampling.py
+"""
+পেপার তৈরির জন্য র‍্যান্ডম / স্তরভিত্তিক (chapter quota) প্রশ্ন নির্বাচন।
+
+`ORDER BY RANDOM()` পুরো মিলে যাওয়া সেট sort করে, তাই টেবিল বড় হলে ধীর হয়।
+প্রতিটি স্তরের (class, subject, chapter, type) আকার আগে availability গণনা থেকে
+জানা হয়। ছোট স্তরের (FULL_SCAN_LIMIT পর্যন্ত) শুধু id গুলো ইনডেক্স দিয়ে পড়ে
+Python-এ seed সহ sample নেওয়া হয়। বড় স্তরে প্রতিটি প্রশ্ন ও অধ্যায়-লিংকের একটি
+র‍্যান্ডম `sample_key` আছে; seed থেকে বানানো কয়েকটি র‍্যান্ডম key পরিসর
+(chapter, sample_key) ইনডেক্স দিয়ে পড়া হয়, যা চাওয়া সংখ্যার মোটামুটি দ্বিগুণ
+প্রশ্ন দেয় — প্রতিটি প্রশ্নের আসার সম্ভাবনা সমান, কিন্তু পুরো স্তর পড়তে হয় না।
+কম পেলে (বাদ দেওয়া প্রশ্ন ইত্যাদি) পরিসর বড় করে আবার পড়া হয়। শেষে বাছাই করা
+id দিয়ে সারিগুলো একবারে আনা হয়। একাধিক অধ্যায়ে থাকা প্রশ্ন একটি পেপারে একবারই আসে।
+"""
+import random
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q, Sum
+
+from core import taxonomy
+from core.models import SAMPLE_KEY_SPACE, Question, QuestionChapter, QuestionCount
+from core.question_types import normalize_question_type
+
+# এই মানগুলো কোনো নির্দিষ্ট টাইপ নয় — টাইপ দিয়ে ফিল্টার হবে না
+ANY_QUESTION_TYPE = ('', 'combined', 'any', 'all')
+# এর চেয়ে বড় স্তর পুরোটা না পড়ে sample_key পরিসর দিয়ে পড়া হয়
+FULL_SCAN_LIMIT = 2000
+OVERSAMPLE = 2
+KEY_WINDOWS = 8
+
+
+class SampleResult:
+    def __init__(self, questions, seed, requested, shortfall):
+        self.questions = questions    # list[Question], draw order
+        self.seed = seed              # use the same seed to get the same paper again
+        self.requested = requested
+        self.shortfall = shortfall    # {chapter_id or None: missing count}
+
+    @property
+    def ids(self):
+        return [q.id for q in self.questions]
+
+    def as_dict(self):
+        return {
+            'seed': self.seed,
+            'requested': self.requested,
+            'count': len(self.questions),
+            'shortfall': {str(k): v for k, v in self.shortfall.items()},
+            'questions': [q.as_dict() for q in self.questions],
+        }
+
+
+def _question_type(question_type):
+    qtype = normalize_question_type(question_type or '')
+    return None if qtype in ANY_QUESTION_TYPE else qtype
+
+
+def stratum_sizes(class_id, subject_ids=None, chapter_ids=None, question_type=None):
+    """Stratum sizes from the availability counters: {chapter_id: n}, or {None: n} without chapters.
+
+    Excluded ids are not taken off, so these are upper bounds.
+    """
+    rows = QuestionCount.objects.filter(class_name_id=class_id)
+    if subject_ids:
+        rows = rows.filter(subject_id__in=subject_ids)
+    qtype = _question_type(question_type)
+    if qtype:
+        rows = rows.filter(question_type=qtype)
+    rows = rows.filter(chapter_id__in=chapter_ids) if chapter_ids else rows.filter(chapter__isnull=True)
+    sizes = dict(rows.order_by().values_list('chapter_id').annotate(n=Sum('count')))
+    return sizes if chapter_ids else {None: sum(sizes.values())}
+
+
+def _key_windows(rng, share, **scope):
+    """KEY_WINDOWS random sample_key ranges that together cover `share` of the key space.
+
+    `scope` is repeated in every range so each one is an index range scan on
+    its own (SQLite's OR optimisation needs that; PostgreSQL ORs the bitmaps).
+    """
+    width = max(1, int(SAMPLE_KEY_SPACE * share / KEY_WINDOWS))
+    windows = []
+    for _ in range(KEY_WINDOWS):
+        start = rng.randrange(SAMPLE_KEY_SPACE)
+        end = start + width
+        windows.append(Q(sample_key__gte=start, sample_key__lt=min(end, SAMPLE_KEY_SPACE), **scope))
+        if end > SAMPLE_KEY_SPACE:  # key space-এর শেষ পেরোলে শুরু থেকে
+            windows.append(Q(sample_key__lt=end - SAMPLE_KEY_SPACE, **scope))
+    return reduce(or_, windows)
+
+
+def candidate_ids(class_id, subject_ids=None, chapter_ids=None, question_type=None, exclude=None,
+                  share=None, rng=None):
+    """Ids per chapter for one stratum set: {chapter_id: [ids sorted]}.
+
+    With `share` (< 1) and `rng` only the questions whose sample_key falls in
+    random windows covering that share of the key space are read, so every
+    question is equally likely to come back; otherwise every id is read.
+    """
+    if chapter_ids:
+        # অধ্যায় থেকে প্রশ্ন membership টেবিল দিয়ে; একটি প্রশ্ন একাধিক স্তরে থাকতে পারে।
+        # প্রশ্নের শর্ত join-এ, যাতে অধ্যায়ের ইনডেক্স থেকে শুরু হয় (subquery পুরো class পড়ত)
+        scope = {'chapter_id__in': chapter_ids}
+        rows = QuestionChapter.objects.filter(question__class_name_id=class_id)
+        prefix, columns = 'question__', ('chapter_id', 'question_id')
+    else:
+        scope = {'class_name_id': class_id}
+        if subject_ids:
+            scope['subject_id__in'] = subject_ids
+        elif share is not None and share < 1:
+            # (class, subject, sample_key) ইনডেক্সে key পরিসর পড়তে subject জানা লাগে
+            scope['subject_id__in'] = [s['id'] for s in taxonomy.get_subjects(class_id)]
+        rows = Question.objects.all()
+        prefix, columns = '', ('chapter_id', 'id')
+    if subject_ids and chapter_ids:
+        rows = rows.filter(question__subject_id__in=subject_ids)
+    qtype = _question_type(question_type)
+    if qtype:
+        rows = rows.filter(**{f'{prefix}question_type': qtype})
+    if exclude:
+        rows = rows.exclude(**{f'{columns[1]}__in': list(exclude)})
+    rows = rows.filter(_key_windows(rng, share, **scope) if share is not None and share < 1 else Q(**scope))
+
+    strata = {}
+    # id ক্রমে সাজানো থাকলে একই seed সবসময় একই ফল দেয়
+    for chapter_id, qid in rows.order_by(*columns).values_list(*columns):
+        strata.setdefault(chapter_id, []).append(qid)
+    return strata
+
+
+def _read_strata(rng, size, want, chapter_ids, skip=(), **filters):
+    """Candidate strata with at least `want` ids outside `skip` when the strata hold that many.
+
+    Strata up to FULL_SCAN_LIMIT are read whole; bigger ones by random key
+    windows, widened until they return enough.
+    """
+    share = OVERSAMPLE * want / size if size > FULL_SCAN_LIMIT else 1
+    while True:
+        strata = candidate_ids(chapter_ids=chapter_ids, share=share if share < 1 else None, rng=rng, **filters)
+        if share >= 1 or len({qid for ids in strata.values() for qid in ids} - set(skip)) >= want:
+            return strata
+        share = min(1, share * 4)
+
+
+def sample_questions(class_id, count=None, subject_ids=None, chapter_ids=None, question_type=None,
+                     quotas=None, seed=None, exclude=None):
+    """Draw random questions without ORDER BY RANDOM().
+
+    - quotas: {chapter_id: n} draws n questions from each chapter; without
+      quotas `count` questions are drawn uniformly from all matching chapters.
+    - seed: same seed + same data = same selection. A seed is generated (and
+      returned in the result) when none is given.
+    - exclude: question ids that must not be drawn (e.g. used in earlier papers).
+    """
+    if seed is None:
+        seed = random.SystemRandom().randrange(1, 2 ** 31)
+    rng = random.Random(seed)
+
+    if quotas:
+        chapter_ids = list(quotas.keys())
+    filters = {'class_id': class_id, 'subject_ids': subject_ids, 'question_type': question_type, 'exclude': exclude}
+    sizes = stratum_sizes(class_id, subject_ids, chapter_ids, question_type)
+
+    picked = []
+    shortfall = {}
+    if quotas:
+        requested = sum(quotas.values())
+        # ছোট অধ্যায়গুলো এক query-তে পুরো; বড়গুলো আলাদা key পরিসরে
+        small = [c for c in chapter_ids if sizes.get(c, 0) <= FULL_SCAN_LIMIT]
+        strata = candidate_ids(chapter_ids=small, **filters) if small else {}
+        for chapter_id in sorted(quotas, key=lambda c: (c is None, c)):
+            want = max(0, int(quotas[chapter_id]))
+            chosen = set(picked)
+            if chapter_id not in small:
+                strata.update(_read_strata(rng, sizes[chapter_id], want, [chapter_id], chosen, **filters))
+            pool = [qid for qid in strata.get(chapter_id, []) if qid not in chosen]
+            take = min(want, len(pool))
+            picked.extend(rng.sample(pool, take))
+            if take < want:
+                shortfall[chapter_id] = want - take
+    else:
+        requested = max(0, int(count or 0))
+        # সব অধ্যায়ে একই key পরিসর, তাই বড়-ছোট সব অধ্যায়ের প্রশ্নের সম্ভাবনা সমান
+        strata = _read_strata(rng, sum(sizes.values()), requested, chapter_ids, **filters)
+        pool = list(dict.fromkeys(
+            qid for chapter_id in sorted(strata, key=lambda c: (c is None, c)) for qid in strata[chapter_id]
+        ))
+        take = min(requested, len(pool))
+        picked = rng.sample(pool, take)
+        if take < requested:
+            shortfall[None] = requested - take
+
+    by_id = Question.objects.select_related('class_name', 'subject', 'chapter').in_bulk(picked)
+    questions = [by_id[qid] for qid in picked if qid in by_id]
+    return SampleResult(questions, seed, requested, shortfall)
+
+
+def parse_quotas(raw):
+    """Parse 'chapter_id:n,chapter_id:n' into {chapter_id: n}; bad pairs are ignored."""
+    quotas = {}
+    for part in (raw or '').split(','):
+        chapter, _, n = part.partition(':')
+        if chapter.strip().isdigit() and n.strip().isdigit():
+            quotas[int(chapter)] = int(n)
+    return quotas
+
+
+def parse_id_list(raw):
+    return [int(x) for x in str(raw or '').split(',') if x.strip().isdigit()]
@@ -0,0 +1,224 @@
+# file: core/search.py
+"""
+প্রশ্নের full-text সার্চ।
+
+ডাটাবেস অনুযায়ী একটি backend বেছে নেওয়া হয়:
+  - PostgreSQL: Question.search_vector (SearchVectorField) কলাম + GIN ইনডেক্স
+  - SQLite: core_question_fts নামের FTS5 shadow টেবিল (rowid = question id)
+  - অন্য কিছু: icontains fallback
+
+ইনডেক্সে লেখা ও সার্চ — দুই দিকেই একই `normalize_text()` ব্যবহার হয়
+(Unicode NFC, zero-width joiner বাদ, বাংলা অঙ্ক -> ASCII), তাই "১০" আর "10"
+একই ভাবে মেলে। Question save/delete signal ইনডেক্স হালনাগাদ রাখে, bulk ইমপোর্ট
+`index_questions()` সরাসরি ডাকে, আর `manage.py rebuild_search_index` পুরোটা নতুন করে বানায়।
+"""
+import re
+import unicodedata
+
+from asgiref.sync import sync_to_async
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchQuery
+from django.db import connections, transaction
+from django.db.models import Index, Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_TEXT_FIELDS = ('text', 'option_a', 'option_b', 'option_c', 'option_d')
+
+# ZWSP, ZWNJ, ZWJ, word joiner, BOM
+_ZERO_WIDTH = dict.fromkeys(map(ord, '\u200b\u200c\u200d\u2060\ufeff'))
+_DIGITS = str.maketrans('০১২৩৪৫৬৭৮৯', '0123456789')
+# \w বাংলা কার/ফলা (combining mark) ধরে না, তাই পুরো বাংলা ব্লক আলাদা করে যোগ করা হয়েছে
+_TOKEN_RE = re.compile(r'[\w\u0980-\u09FF]+')
+
+
+def normalize_text(value):
+    """Normalize Bengali/English text for indexing and querying."""
+    if not value:
+        return ''
+    value = unicodedata.normalize('NFC', value).translate(_ZERO_WIDTH).translate(_DIGITS)
+    return ' '.join(value.lower().split())
+
+
+def query_tokens(query):
+    return _TOKEN_RE.findall(normalize_text(query))
+
+
+def question_document(values):
+    """The normalized text that gets indexed for one question (text + options)."""
+    return normalize_text(' '.join(v for v in values if v))
+
+
+class SearchVectorIndex(GinIndex):
+    """GIN index on PostgreSQL; a plain index elsewhere, where the column stays NULL."""
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        # SQLite টেবিল নতুন করে বানানোর সময় সব Meta.indexes আবার তৈরি করে; "USING gin" সেখানে চলে না
+        if schema_editor.connection.vendor != 'postgresql':
+            return Index.create_sql(self, model, schema_editor, using=using, **kwargs)
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
+
+
+class BaseSearchBackend:
+    def __init__(self, alias):
+        self.alias = alias
+
+    @property
+    def connection(self):
+        return connections[self.alias]
+
+    def filter(self, queryset, query):
+        raise NotImplementedError
+
+    def index(self, rows, replace=True):
+        """rows: iterable of (question_id, document). `replace=False` skips removing old entries."""
+
+    def remove(self, question_ids):
+        pass
+
+    def clear(self):
+        pass
+
+
+class FallbackSearchBackend(BaseSearchBackend):
+    """No full-text support: every token must appear in the text or an option."""
+
+    def filter(self, queryset, query):
+        for token in query_tokens(query):
+            cond = Q()
+            for field in SEARCH_TEXT_FIELDS:
+                cond |= Q(**{f'{field}__icontains': token})
+            queryset = queryset.filter(cond)
+        return queryset
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    CONFIG = 'simple'  # বাংলার জন্য PostgreSQL-এ stemmer নেই, তাই simple config
+
+    def filter(self, queryset, query):
+        tokens = query_tokens(query)
+        if not tokens:
+            return queryset
+        tsquery = ' & '.join(f'{t}:*' for t in tokens)
+        return queryset.filter(search_vector=SearchQuery(tsquery, config=self.CONFIG, search_type='raw'))
+
+    def index(self, rows, replace=True):
+        rows = list(rows)
+        if not rows:
+            return
+        values = ', '.join(['(%s, %s)'] * len(rows))
+        params = [p for row in rows for p in row]
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE core_question AS q SET search_vector = to_tsvector('{self.CONFIG}', v.doc) "
+                f"FROM (VALUES {values}) AS v(id, doc) WHERE q.id = v.id::bigint",
+                params,
+            )
+
+    def remove(self, question_ids):
+        # সারি মুছে গেলে কলামটিও মুছে যায়, আলাদা কিছু করার দরকার নেই
+        pass
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute('UPDATE core_question SET search_vector = NULL')
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    TABLE = 'core_question_fts'
+
+    def filter(self, queryset, query):
+        tokens = query_tokens(query)
+        if not tokens:
+            return queryset
+        match = ' '.join(f'"{t}"*' for t in tokens)
+        return queryset.filter(id__in=RawSQL(f'SELECT rowid FROM {self.TABLE} WHERE {self.TABLE} MATCH %s', [match]))
+
+    def index(self, rows, replace=True):
+        rows = list(rows)
+        if not rows:
+            return
+        # autocommit-এ executemany প্রতি সারিতে আলাদা commit করে, তাই একটি transaction
+        # (বাইরের transaction থাকলে তাতেই যোগ হয়, আলাদা savepoint লাগে না)
+        with transaction.atomic(using=self.alias, savepoint=False), self.connection.cursor() as cursor:
+            if replace:
+                cursor.executemany(f'DELETE FROM {self.TABLE} WHERE rowid = %s', [(r[0],) for r in rows])
+            cursor.executemany(f'INSERT INTO {self.TABLE}(rowid, document) VALUES (%s, %s)', rows)
+
+    def remove(self, question_ids):
+        with transaction.atomic(using=self.alias, savepoint=False), self.connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.TABLE} WHERE rowid = %s', [(i,) for i in question_ids])
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.TABLE}')
+
+
+_backends = {}
+
+
+def get_backend(alias='default'):
+    backend = _backends.get(alias)
+    if backend is None:
+        connection = connections[alias]
+        if connection.vendor == 'postgresql':
+            backend = PostgresSearchBackend(alias)
+        elif (connection.vendor == 'sqlite'
+              and SQLiteSearchBackend.TABLE in connection.introspection.table_names()):
+            backend = SQLiteSearchBackend(alias)
+        else:
+            # cache করা হয় না: মাইগ্রেশনের আগে ডাকলে FTS টেবিল পরে তৈরি হলেও fallback-এ আটকে থাকত
+            return FallbackSearchBackend(alias)
+        _backends[alias] = backend
+    return backend
+
+
+def search_questions(queryset, query):
+    """Filter a Question queryset down to rows matching the search query."""
+    if not query or not query.strip():
+        return queryset
+    return get_backend(queryset.db).filter(queryset, query)
+
+
+async def asearch_questions(queryset, query):
+    """search_questions() for async views; the backend is picked (maybe introspected) off the event loop."""
+    if not query or not query.strip():
+        return queryset
+    backend = _backends.get(queryset.db) or await sync_to_async(get_backend)(queryset.db)
+    return backend.filter(queryset, query)
+
+
+def index_questions(questions, alias='default', replace=True):
+    """Add/refresh the index entries for saved Question instances (replace=False: newly inserted rows)."""
+    get_backend(alias).index(
+        ((q.id, question_document(getattr(q, f) for f in SEARCH_TEXT_FIELDS))
+         for q in questions if q.id is not None),
+        replace=replace,
+    )
+
+
+def remove_questions(question_ids, alias='default'):
+    get_backend(alias).remove(list(question_ids))
+
+
+def rebuild_index(chunk_size=2000, alias='default', model=None):
+    """Re-index every question; returns the number of rows indexed.
+
+    Migrations pass the historical Question model as `model`.
+    """
+    if model is None:
+        from core.models import Question as model
+
+    backend = get_backend(alias)
+    backend.clear()
+    total = 0
+    batch = []
+    rows = model._default_manager.using(alias).values_list('id', *SEARCH_TEXT_FIELDS).order_by()
+    for row in rows.iterator(chunk_size=chunk_size):
+        batch.append((row[0], question_document(row[1:])))
+        if len(batch) >= chunk_size:
+            backend.index(batch, replace=False)
+            total += len(batch)
+            batch = []
+    backend.index(batch, replace=False)
+    return total + len(batch)
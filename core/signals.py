@@ -0,0 +1,107 @@
+# file: core/signals.py
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+
+from core.availability import adjust, question_deltas
+from core.models import Question, QuestionChapter, ClassName, Subject, Chapter
+from core.near_duplicates import index_signatures
+from core.search import index_questions, remove_questions
+from core.taxonomy import bump_version
+
+COUNT_FIELDS = ('class_name_id', 'subject_id', 'question_type')
+# save-এর আগে ডাটাবেসে যা ছিল: গণনার ঘর, প্রধান অধ্যায়, আর লেখা/অপশন বদলেছে কিনা বোঝার content_hash
+STORED_FIELDS = (*COUNT_FIELDS, 'chapter_id', 'content_hash')
+
+# মুছতে থাকা প্রশ্নের (class, subject, type) — cascade-এ তার অধ্যায় লিংক মোছার সময় আবার query না করতে
+_deleting = {}
+
+
+def _count_key(question):
+    return tuple(getattr(question, f) for f in COUNT_FIELDS)
+
+
+@receiver(pre_save, sender=Question)
+def question_saving(sender, instance, raw=False, using='default', **kwargs):
+    instance._stored = None
+    if not raw and not instance._state.adding:
+        instance._stored = Question.objects.using(using).filter(pk=instance.pk).values_list(*STORED_FIELDS).first()
+
+
+@receiver(post_save, sender=Question)
+def question_saved(sender, instance, created=False, raw=False, using='default', **kwargs):
+    if raw:  # loaddata
+        return
+    index_questions([instance], alias=using)
+    stored = getattr(instance, '_stored', None)
+    old, old_chapter_id, old_hash = (stored[:-2], stored[-2], stored[-1]) if stored else (None, None, None)
+    # MinHash শুধু লেখা/অপশন (content_hash) বদলালে নতুন করে হিসাব হয়
+    if created or stored is None or old_hash != instance.content_hash:
+        instance._minhash = None
+        index_signatures([instance], using=using)
+
+    # আগের class/subject/type বদলালে প্রশ্নটি সব গণনায় নতুন ঘরে সরে যায়
+    key = _count_key(instance)
+    if created:
+        adjust(question_deltas([(*key, [])]), using=using)
+    elif old is not None and old != key:
+        chapter_ids = list(QuestionChapter.objects.using(using).filter(question_id=instance.pk)
+                           .values_list('chapter_id', flat=True))
+        deltas = question_deltas([(*old, chapter_ids)], sign=-1)
+        for cell, n in question_deltas([(*key, chapter_ids)]).items():
+            deltas[cell] += n
+        adjust(deltas, using=using)
+
+    # প্রধান অধ্যায়টি সবসময় membership টেবিলেও থাকে, কারণ অধ্যায়ের ফিল্টার সেখান দিয়েই হয়;
+    # অধ্যায় বদলালে পুরনো প্রধান লিংক মোছে। লিংকের post_save/post_delete অধ্যায়ের গণনা
+    # বদলায় (উপরে ঘর সরানোর পরে, তাই নতুন ঘরে)
+    if old_chapter_id and old_chapter_id != instance.chapter_id:
+        QuestionChapter.objects.using(using).filter(question=instance, chapter_id=old_chapter_id).delete()
+    if instance.chapter_id:
+        QuestionChapter.objects.using(using).get_or_create(question=instance, chapter_id=instance.chapter_id)
+
+
+@receiver(pre_delete, sender=Question)
+def question_deleting(sender, instance, using='default', **kwargs):
+    _deleting[using, instance.pk] = _count_key(instance)
+
+
+@receiver(post_delete, sender=Question)
+def question_deleted(sender, instance, using='default', **kwargs):
+    remove_questions([instance.id], alias=using)
+    key = _deleting.pop((using, instance.id), None) or _count_key(instance)
+    adjust(question_deltas([(*key, [])], sign=-1), using=using)
+
+
+def _chapter_cell(key, chapter_id):
+    class_id, subject_id, question_type = key
+    return class_id, subject_id, chapter_id, question_type
+
+
+def _link_key(link, using):
+    if QuestionChapter._meta.get_field('question').is_cached(link):
+        return _count_key(link.question)
+    key = _deleting.get((using, link.question_id))
+    if key is None:
+        key = Question.objects.using(using).filter(pk=link.question_id).values_list(*COUNT_FIELDS).first()
+    return key
+
+
+@receiver(post_save, sender=QuestionChapter)
+def question_linked(sender, instance, created=False, raw=False, using='default', **kwargs):
+    if created and not raw:
+        key = _link_key(instance, using)
+        if key is not None:
+            adjust({_chapter_cell(key, instance.chapter_id): 1}, using=using)
+
+
+@receiver(post_delete, sender=QuestionChapter)
+def question_unlinked(sender, instance, using='default', **kwargs):
+    key = _link_key(instance, using)
+    if key is not None:
+        adjust({_chapter_cell(key, instance.chapter_id): -1}, using=using)
+
+
+# ক্লাস/বিষয়/অধ্যায় বদলালে শেয়ার্ড taxonomy ক্যাশের ভার্সন বাড়ানো হয়
+for _model in (ClassName, Subject, Chapter):
+    post_save.connect(bump_version, sender=_model, dispatch_uid=f'taxonomy_save_{_model.__name__}')
+    post_delete.connect(bump_version, sender=_model, dispatch_uid=f'taxonomy_delete_{_model.__name__}')
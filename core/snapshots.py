@@ -0,0 +1,77 @@
+# file: core/snapshots.py
+"""
+প্রশ্নপত্রের স্থির (frozen) snapshot।
+
+পেপার চূড়ান্ত হওয়ার সময় প্রশ্নের লেখা, অপশন, সঠিক উত্তর আর ক্রম একটি
+compact JSON-এ QuestionPaper.snapshot কলামে লেখা হয়। এরপর paper_detail শুধু
+পেপারের সারিটি পড়েই রেন্ডার হয় (কোনো join নেই), আর পরে প্রশ্ন এডিট বা মুছে
+গেলেও পুরনো ছাপা পেপার বদলায় না।
+
+ফরম্যাট (v1):
+    {"v": 1, "class": "<ক্লাস>", "subjects": ["<বিষয়>", ...],
+     "q": [[id, type, text, a, b, c, d, correct], ...]}
+"""
+from django.db import transaction
+from django.utils import timezone
+
+SNAPSHOT_VERSION = 1
+QUESTION_FIELDS = ('id', 'question_type', 'text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_option')
+
+
+def build_snapshot(paper, questions=None):
+    """Snapshot dict for `paper`; `questions` (in paper order) defaults to the paper's linked questions."""
+    if questions is None:
+        # একটি পেপারের জন্য link আর প্রশ্ন একটি join-এ
+        questions = [link.question for link in paper.question_links.select_related('question')]
+    return {
+        'v': SNAPSHOT_VERSION,
+        'class': paper.class_level.name if paper.class_level_id else '',
+        # all() যাতে prefetch_related কাজে লাগে
+        'subjects': [s.name for s in sorted(paper.subjects.all(), key=lambda s: s.id)],
+        'q': [[getattr(q, f) for f in QUESTION_FIELDS] for q in questions],
+    }
+
+
+def ordered_questions(papers):
+    """{paper_id: [Question]} in paper order (two queries for any number of papers)."""
+    from core.models import PaperQuestion, Question
+
+    links = (PaperQuestion.objects.filter(paper_id__in=[p.id for p in papers])
+             .order_by('paper_id', 'position', 'id').values_list('paper_id', 'question_id'))
+    by_paper = {p.id: [] for p in papers}
+    for paper_id, question_id in links:
+        by_paper[paper_id].append(question_id)
+    by_id = Question.objects.in_bulk({qid for ids in by_paper.values() for qid in ids})
+    return {paper_id: [by_id[qid] for qid in ids if qid in by_id] for paper_id, ids in by_paper.items()}
+
+
+def freeze_paper(paper, questions=None, force=False):
+    """Write the snapshot once; returns True when a snapshot was written."""
+    if paper.snapshot is not None and not force:
+        return False
+    paper.snapshot = build_snapshot(paper, questions)
+    paper.finalized_at = timezone.now()
+    paper.save(update_fields=['snapshot', 'finalized_at'])
+    return True
+
+
+def snapshot_questions(snapshot):
+    """Question dicts (same keys as the model fields) for templates."""
+    return [dict(zip(QUESTION_FIELDS, row)) for row in (snapshot or {}).get('q', [])]
+
+
+def backfill_snapshots(queryset, chunk_size=500, force=False):
+    """Freeze every paper in `queryset` that has no snapshot yet; returns the number written."""
+    if not force:
+        queryset = queryset.filter(snapshot__isnull=True)
+    written = 0
+    ids = list(queryset.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        papers = list(queryset.model.objects.filter(id__in=chunk)
+                      .select_related('class_level').prefetch_related('subjects'))
+        questions = ordered_questions(papers)
+        with transaction.atomic():
+            for paper in papers:
+                written += freeze_paper(paper, questions[paper.id], force=force)
+    return written
@@ -0,0 +1,211 @@
+# file: core/taxonomy.py
+"""
+Class -> Subject -> Chapter ট্রির শেয়ার্ড, ভার্সনযুক্ত ক্যাশ।
+
+পুরো ট্রি Django cache framework-এ একটি ভার্সন key-এর অধীনে থাকে, তাই সব
+gunicorn worker একই ডেটা দেখে। ClassName/Subject/Chapter-এর post_save/post_delete
+signal `bump_version()` ডাকে; পরের request নতুন ভার্সনে ট্রি আবার তৈরি করে।
+প্রতিটি process শেষ দেখা ভার্সনের ট্রি মেমরিতেও রাখে, ফলে সাধারণ request-এ
+ডাটাবেস তো নয়ই, cache থেকেও শুধু ভার্সন নম্বরটি পড়া হয়। async view-এর জন্য
+`aget_tree()` একই কাজ async cache ও async ORM দিয়ে করে।
+"""
+import functools
+import threading
+import time
+
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import add_never_cache_headers
+from django.urls import re_path
+
+CACHE_ALIAS = 'default'
+VERSION_KEY = 'taxonomy:version'
+TREE_TIMEOUT = 24 * 60 * 60
+
+# smart_selects chaining endpoint-এর যেসব মডেলের রেসপন্স ক্যাশ করা নিরাপদ
+TAXONOMY_APP = 'core'
+TAXONOMY_MODELS = {'classname', 'subject', 'chapter'}
+
+_lock = threading.Lock()
+_process_tree = {'version': None, 'tree': None}
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def get_version():
+    version = _cache().get(VERSION_KEY)
+    if version is None:
+        version = bump_version()
+    return version
+
+
+def bump_version(**kwargs):
+    """Invalidate every cached tree (signal receiver compatible)."""
+    # time_ns প্রতিবার আলাদা, তাই দুই worker একসাথে bump করলেও পুরনো ভার্সন ফিরে আসে না
+    version = time.time_ns()
+    _cache().set(VERSION_KEY, version, None)
+    return version
+
+
+def _assemble(classes, subject_rows, chapter_rows):
+    classes = [{'id': c['id'], 'name': c['name']} for c in classes]
+    subjects = {}
+    subjects_by_class = {}
+    for s in subject_rows:
+        subjects[s['id']] = s
+        subjects_by_class.setdefault(s['class_name_id'], []).append({'id': s['id'], 'name': s['name']})
+    chapters = {}
+    chapters_by_subject = {}
+    for ch in chapter_rows:
+        chapters[ch['id']] = ch
+        chapters_by_subject.setdefault(ch['subject_id'], []).append({'id': ch['id'], 'name': ch['name']})
+    return {
+        'classes': classes,
+        'subjects': subjects,
+        'subjects_by_class': subjects_by_class,
+        'chapters': chapters,
+        'chapters_by_subject': chapters_by_subject,
+    }
+
+
+def _tree_querysets():
+    from core.models import ClassName, Subject, Chapter
+
+    return (
+        ClassName.objects.order_by('id').values('id', 'name'),
+        Subject.objects.order_by('id').values('id', 'name', 'class_name_id'),
+        Chapter.objects.order_by('id').values('id', 'name', 'subject_id'),
+    )
+
+
+def build_tree():
+    """Load the whole taxonomy with three queries."""
+    return _assemble(*(list(qs) for qs in _tree_querysets()))
+
+
+async def abuild_tree():
+    """build_tree() through the async ORM."""
+    return _assemble(*[[row async for row in qs] for qs in _tree_querysets()])
+
+
+def get_tree():
+    version = get_version()
+    if _process_tree['version'] == version:
+        return _process_tree['tree']
+    with _lock:
+        if _process_tree['version'] == version:
+            return _process_tree['tree']
+        key = f'taxonomy:{version}:tree'
+        tree = _cache().get(key)
+        if tree is None:
+            tree = build_tree()
+            _cache().set(key, tree, TREE_TIMEOUT)
+        _process_tree.update(version=version, tree=tree)
+        return tree
+
+
+async def aget_tree():
+    """get_tree() for async views: async cache calls, async ORM on a miss."""
+    version = await _cache().aget(VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        await _cache().aset(VERSION_KEY, version, None)
+    if _process_tree['version'] == version:
+        return _process_tree['tree']
+    # threading lock event loop আটকে দেবে; একসাথে দুবার বানালেও ফল একই
+    key = f'taxonomy:{version}:tree'
+    tree = await _cache().aget(key)
+    if tree is None:
+        tree = await abuild_tree()
+        await _cache().aset(key, tree, TREE_TIMEOUT)
+    _process_tree.update(version=version, tree=tree)
+    return tree
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_classes(tree=None):
+    return (tree or get_tree())['classes']
+
+
+def get_subjects(class_id, tree=None):
+    return (tree or get_tree())['subjects_by_class'].get(_as_int(class_id), [])
+
+
+def get_chapters(subject_id, tree=None):
+    return (tree or get_tree())['chapters_by_subject'].get(_as_int(subject_id), [])
+
+
+def get_class(class_id, tree=None):
+    class_id = _as_int(class_id)
+    return next((c for c in (tree or get_tree())['classes'] if c['id'] == class_id), None)
+
+
+def get_subject(subject_id, tree=None):
+    return (tree or get_tree())['subjects'].get(_as_int(subject_id))
+
+
+def get_chapter(chapter_id, tree=None):
+    return (tree or get_tree())['chapters'].get(_as_int(chapter_id))
+
+
+def class_tree(class_id, tree=None):
+    """One class with its subjects and their chapters, or None."""
+    tree = tree or get_tree()
+    class_id = _as_int(class_id)
+    cls = get_class(class_id, tree)
+    if cls is None:
+        return None
+    return {
+        'id': cls['id'],
+        'name': cls['name'],
+        'subjects': [
+            dict(s, chapters=tree['chapters_by_subject'].get(s['id'], []))
+            for s in tree['subjects_by_class'].get(class_id, [])
+        ],
+    }
+
+
+def taxonomy_cached(view):
+    """Cache a GET view's 200 responses under the taxonomy version (for smart_selects chaining).
+
+    Only the listed model (`model`) decides: the foreign key model is the
+    form's owner (Question, QuestionPaper), and it is part of the URL and
+    so of the cache key anyway.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        taxonomy_model = (str(kwargs.get('app', '')).lower() == TAXONOMY_APP
+                          and str(kwargs.get('model', '')).lower() in TAXONOMY_MODELS)
+        if request.method != 'GET' or not taxonomy_model:
+            return view(request, *args, **kwargs)
+        key = f'taxonomy:{get_version()}:resp:{request.get_full_path()}'
+        cached = _cache().get(key)
+        if cached is not None:
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+            # মূল view-এর মতোই (never_cache) — ব্রাউজার যেন পুরনো ভার্সনের তালিকা ধরে না রাখে
+            add_never_cache_headers(response)
+            return response
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200 and not getattr(response, 'streaming', False):
+            _cache().set(key, (response.content, response['Content-Type']), TREE_TIMEOUT)
+        return response
+    return wrapper
+
+
+def chaining_urlpatterns():
+    """smart_selects URL patterns with their views wrapped in taxonomy_cached()."""
+    from smart_selects import urls as smart_selects_urls
+
+    return [
+        re_path(p.pattern.regex.pattern, taxonomy_cached(p.callback), name=p.name)
+        for p in smart_selects_urls.urlpatterns
+    ]
@@ -0,0 +1,39 @@
+# file: core/testing.py
+"""
+টেস্টে query বাজেট যাচাইয়ের সাহায্যকারী।
+
+settings-এ `TEST_RUNNER = 'core.testing.QueryBudgetTestRunner'` থাকলে টেস্ট
+চলাকালীন QueryBudgetMiddleware strict হয়ে যায়, অর্থাৎ বাজেট ছাড়ানো যেকোনো
+request টেস্ট ফেল করায়। কোনো নির্দিষ্ট কোড ব্লক মাপতে `assert_max_queries()`।
+"""
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+from core.query_budget import QueryRecorder, check_budget
+
+
+@contextmanager
+def assert_max_queries(budget, label='block'):
+    """Fail if the block runs more than `budget` queries; yields the recorder.
+
+        with assert_max_queries(4) as queries:
+            client.get(url)
+        queries.duplicates()
+    """
+    recorder = QueryRecorder()
+    with recorder.record():
+        yield recorder
+    check_budget(recorder, budget, label, strict=True)
+
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._old_strict = getattr(settings, 'QUERY_BUDGET_STRICT', False)
+        settings.QUERY_BUDGET_STRICT = True
+
+    def teardown_test_environment(self, **kwargs):
+        settings.QUERY_BUDGET_STRICT = self._old_strict
+        super().teardown_test_environment(**kwargs)
@@ -1,3 +1,929 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import random
+import tempfile
+import time
+import zipfile
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from core import authoring, benchmarks, pdf, search, taxonomy
+from core.availability import available_count, recount
+from core.jobs import JobLost, JobProgress, claim_next, enqueue, run_pending
+from core.membership import merge_duplicates, question_hash, store_questions
+from core.models import (Chapter, ClassName, Job, PaperQuestion, PaperWeekCount, Question, QuestionChapter,
+                         QuestionCount, QuestionPaper, Subject, TeacherChapterUsage)
+from core.query_budget import QueryBudgetExceeded
+from core.replicas import PIN_COOKIE, ReplicaMiddleware
+from core.sampling import sample_questions
+from core.search import search_questions
+from core.testing import assert_max_queries
+from core.views import save_selection_as_paper
+
+
+class QueryBudgetTests(TestCase):
+    """Every view named in QUERY_BUDGETS, requested through the client on a cold cache.
+
+    The test runner makes QueryBudgetMiddleware strict, so a view that goes
+    over its budget raises QueryBudgetExceeded and fails here.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('teacher', password='pw', is_staff=True)
+        cls.class_name = ClassName.objects.create(name='নবম')
+        cls.subject = Subject.objects.create(name='পদার্থবিজ্ঞান', class_name=cls.class_name)
+        cls.chapters = [Chapter.objects.create(name=f'অধ্যায় {i}', subject=cls.subject) for i in range(1, 4)]
+        entries = []
+        for i in range(12):
+            chapter = cls.chapters[i % 3]
+            question = Question(text=f'প্রশ্ন {i}', question_type='mcq' if i % 2 else 'short',
+                                class_name=cls.class_name, subject=cls.subject, chapter=chapter,
+                                option_a='ক', option_b='খ', correct_option='a')
+            entries.append((question, [chapter.id, cls.chapters[(i + 1) % 3].id]))
+        store_questions(entries)
+        cls.question_ids = list(Question.objects.order_by('id').values_list('id', flat=True))
+        cls.paper, _ = save_selection_as_paper(cls.user, cls.question_ids[:5], 'পরীক্ষা')
+        cls.job = enqueue('render_papers_pdf', payload={'paper_ids': [cls.paper.id]}, user=cls.user)
+
+    def setUp(self):
+        # ঠান্ডা cache-এই query সবচেয়ে বেশি হয়
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def get(self, name, *args, **params):
+        response = self.client.get(reverse(name, args=args), params)
+        self.assertLess(response.status_code, 400, f'{name}: {response.status_code}')
+        return response
+
+    def selection(self, **extra):
+        return {'class_id': self.class_name.id, 'subject_id': self.subject.id, **extra}
+
+    def test_every_budgeted_view_is_covered(self):
+        tested = {name[len('test_'):] for name in dir(self) if name.startswith('test_')}
+        self.assertEqual(set(settings.QUERY_BUDGETS) - tested, set())
+
+    def test_dashboard(self):
+        self.get('dashboard')
+
+    def test_dashboard_stats(self):
+        self.get('dashboard_stats')
+
+    def test_question(self):
+        self.get('question')
+
+    def test_teacher_select_questions(self):
+        chapters = ','.join(str(c.id) for c in self.chapters[:2])
+        self.get('teacher_select_questions', **self.selection(chapter_ids=chapters, question_type='mcq'))
+        self.get('teacher_select_questions', **self.selection(format='json'))
+
+    def test_teacher_search_questions(self):
+        self.get('teacher_search_questions', **self.selection(q='প্রশ্ন'))
+
+    def test_sample_questions(self):
+        self.get('sample_questions', **self.selection(count=5, seed=1, exclude_used=1))
+
+    def test_prepare_paper(self):
+        for extra in ({}, {'save': '1'}, {'save': '1', 'paper_id': self.paper.id}):
+            response = self.client.post(reverse('prepare_paper'), {'question_ids': self.question_ids[:8],
+                                                                   'school_name': 'স্কুল', **extra})
+            self.assertEqual(response.status_code, 200)
+
+    def test_prepare_paper_saves_once_then_updates(self):
+        papers = QuestionPaper.objects.filter(creator=self.user)
+        before = papers.count()
+        data = {'question_ids': self.question_ids[3:6], 'school_name': 'স্কুল'}
+        self.client.post(reverse('prepare_paper'), data)
+        self.assertEqual(papers.count(), before)
+        saved = self.client.post(reverse('prepare_paper'), {**data, 'save': '1'}).context['paper']
+        again = self.client.post(reverse('prepare_paper'), {**data, 'question_ids': self.question_ids[:2],
+                                                            'save': '1', 'paper_id': saved.id}).context['paper']
+        self.assertEqual((papers.count(), again.id), (before + 1, saved.id))
+        self.assertEqual([q.id for q in again.ordered_questions()], self.question_ids[:2])
+
+    def test_my_papers_list(self):
+        self.get('my_papers_list')
+        self.get('my_papers_list', format='json')
+
+    def test_paper_detail(self):
+        self.get('paper_detail', self.paper.id)
+
+    def test_paper_detail_freezes_an_old_paper_within_budget(self):
+        QuestionPaper.objects.filter(id=self.paper.id).update(snapshot=None)
+        response = self.get('paper_detail', self.paper.id)
+        self.assertEqual([q['id'] for q in response.context['questions']], self.question_ids[:5])
+        self.paper.refresh_from_db()
+        self.assertIsNotNone(self.paper.snapshot)
+
+    def test_paper_pdf(self):
+        with tempfile.TemporaryDirectory() as tmp, override_settings(PAPER_PDF_CACHE_DIR=tmp), \
+                mock.patch('core.pdf.html_to_pdf', return_value=b'%PDF-1.4\n'):
+            self.get('paper_pdf', self.paper.id).close()
+
+    def test_papers_pdf_batch(self):
+        response = self.client.post(reverse('papers_pdf_batch'), {'paper_ids': [self.paper.id]})
+        self.assertEqual(response.status_code, 202)
+
+    def test_api_create_questions(self):
+        items = [{'class_id': self.class_name.id, 'subject_id': self.subject.id,
+                  'chapters': [c.id for c in self.chapters], 'text': f'নতুন প্রশ্ন {i}',
+                  'options': {'a': 'ক', 'b': 'খ'}, 'correct_option': 'a'} for i in range(10)]
+        response = self.client.post(reverse('api_create_questions'), json.dumps(items),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['created'], 10)
+
+    def test_job_status(self):
+        self.get('job_status', self.job.id)
+
+    def test_job_output(self):
+        self.job.output.save('papers-test.pdf', ContentFile(b'%PDF-1.4\n'), save=False)
+        self.addCleanup(self.job.output.delete, save=False)
+        Job.objects.filter(id=self.job.id).update(status=Job.STATUS_DONE, output=self.job.output.name)
+        self.get('job_output', self.job.id).close()
+
+    def test_ajax_load_subjects(self):
+        self.get('ajax_load_subjects', class_id=self.class_name.id)
+
+    def test_ajax_load_chapters(self):
+        self.get('ajax_load_chapters', subject_id=self.subject.id)
+
+    def test_ajax_load_class_tree(self):
+        self.get('ajax_load_class_tree', class_id=self.class_name.id)
+
+    def test_ajax_question_counts(self):
+        self.get('ajax_question_counts', class_id=self.class_name.id)
+
+    def test_ajax_load_districts(self):
+        self.get('ajax_load_districts', division='ঢাকা')
+
+    def test_ajax_load_thanas(self):
+        self.get('ajax_load_thanas', division='ঢাকা', district='ঢাকা')
+
+
+class JobTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('exporter', password='pw')
+        cls.other = User.objects.create_user('other', password='pw')
+        class_name = ClassName.objects.create(name='দশম')
+        subject = Subject.objects.create(name='রসায়ন', class_name=class_name)
+        chapter = Chapter.objects.create(name='অধ্যায় ১', subject=subject)
+        store_questions([(Question(text='পরমাণু কী?', question_type='short', class_name=class_name,
+                                   subject=subject, chapter=chapter), [chapter.id])])
+
+    def make_stale(self, job):
+        Job.objects.filter(id=job.id).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+
+    def test_stale_job_is_requeued_then_failed(self):
+        job = enqueue('export_questions', user=self.user)
+        first = claim_next('w1')
+        self.make_stale(first)
+        second = claim_next('w2')
+        self.assertEqual((second.id, second.attempts, second.worker), (job.id, 2, 'w2'))
+        # আগের worker বেঁচে থাকলেও নতুন দাবির সারিতে লিখতে পারে না
+        with self.assertRaises(JobLost):
+            JobProgress(first).update(processed=1)
+        self.make_stale(second)
+        self.assertEqual(claim_next('w3').attempts, 3)
+        self.make_stale(job)
+        self.assertIsNone(claim_next('w4'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+
+    def test_export_output_only_for_its_creator(self):
+        job = enqueue('export_questions', payload={'format': 'csv'}, user=self.user)
+        run_pending()
+        job.refresh_from_db()
+        self.addCleanup(job.output.delete, save=False)
+        self.assertEqual(job.status, Job.STATUS_DONE)
+        self.assertEqual(job.as_dict()['output_url'], reverse('job_output', args=[job.id]))
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(reverse('job_output', args=[job.id])).status_code, 403)
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('job_output', args=[job.id]))
+        self.assertIn('পরমাণু কী?', b''.join(response.streaming_content).decode('utf-8-sig'))
+
+
+class ImportCommandTests(TestCase):
+
+    def import_csv(self, text):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'questions.csv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            call_command('import_questions', path, workers=1, stdout=io.StringIO())
+            if not os.path.exists(path + '.rejected.csv'):
+                return []
+            with open(path + '.rejected.csv', encoding='utf-8') as f:
+                return list(csv.reader(f))
+
+    def test_worker_hash_matches_and_rejects_keep_the_source_columns(self):
+        header = 'class_name,subject,chapter,text,option_a,correct_option,note\n'
+        rejects = self.import_csv(header + 'নবম,গণিত,অধ্যায় ১,সেট কী?,ক,a,x1\nনবম,,অধ্যায় ১,বিষয় নেই,,,x2\n')
+        self.assertEqual(rejects, [['class_name', 'subject', 'chapter', 'text', 'option_a', 'correct_option',
+                                    'note', 'error'],
+                                   ['নবম', '', 'অধ্যায় ১', 'বিষয় নেই', '', '', 'x2', 'missing subject']])
+        question = Question.objects.get()
+        self.assertEqual(question.content_hash, question_hash(question))
+        self.import_csv(header + 'নবম,গণিত,অধ্যায় ২,সেট কী?,ক,a,x3\n')
+        self.assertEqual(Question.objects.count(), 1)
+        self.assertEqual(QuestionChapter.objects.filter(question=question).count(), 2)
+
+
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('admin', password='pw', is_staff=True)
+        class_name = ClassName.objects.create(name='দশম')
+        subject = Subject.objects.create(name='জীববিজ্ঞান', class_name=class_name)
+        cls.chapters = [Chapter.objects.create(name=f'অধ্যায় {i}', subject=subject) for i in (1, 2)]
+        store_questions([(Question(text='কোষ কী?', question_type='short', class_name=class_name,
+                                   subject=subject, chapter=cls.chapters[0]), [c.id for c in cls.chapters])])
+
+    def export(self, **params):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('export_questions'), params)
+        return list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode('utf-8-sig'))))
+
+    def test_every_linked_chapter_is_exported_by_default(self):
+        self.assertEqual([row['chapter'] for row in self.export()], ['অধ্যায় 1', 'অধ্যায় 2'])
+        self.assertEqual([row['chapter'] for row in self.export(all_chapters=0)], ['অধ্যায় 1'])
+
+
+class SnapshotTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('snap', password='pw')
+        class_name = ClassName.objects.create(name='ষষ্ঠ')
+        subject = Subject.objects.create(name='বিজ্ঞান', class_name=class_name)
+        chapter = Chapter.objects.create(name='উদ্ভিদ', subject=subject)
+        store_questions([(Question(text=f'মূল প্রশ্ন {i}', question_type='mcq', class_name=class_name, subject=subject,
+                                   chapter=chapter, option_a='হ্যাঁ', option_b='না', correct_option='a'), [chapter.id])
+                         for i in range(3)])
+        cls.question_ids = list(Question.objects.order_by('id').values_list('id', flat=True))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def paper(self, ids):
+        return save_selection_as_paper(self.user, ids, 'পরীক্ষা')[0]
+
+    def shown(self, paper):
+        response = self.client.get(reverse('paper_detail', args=[paper.id]))
+        return [(q['id'], q['text'], q['correct_option']) for q in response.context['questions']]
+
+    def test_paper_keeps_its_questions_after_edit_and_delete(self):
+        first, second, third = self.question_ids
+        paper = self.paper([third, first, second])
+        before = self.shown(paper)
+        self.assertEqual([row[0] for row in before], [third, first, second])
+
+        edited = Question.objects.get(id=first)
+        edited.text, edited.correct_option = 'বদলানো প্রশ্ন', 'b'
+        edited.save()
+        Question.objects.filter(id=second).delete()
+
+        self.assertEqual(self.shown(paper), before)
+        response = self.client.get(reverse('paper_detail', args=[paper.id]))
+        self.assertContains(response, 'মূল প্রশ্ন 1')
+        self.assertNotContains(response, 'বদলানো প্রশ্ন')
+
+    def test_backfill_freezes_only_papers_without_a_snapshot(self):
+        frozen = self.paper(self.question_ids[:1])
+        old = self.paper(self.question_ids[1:])
+        QuestionPaper.objects.filter(id=old.id).update(snapshot=None, finalized_at=None)
+
+        out = io.StringIO()
+        call_command('backfill_paper_snapshots', dry_run=True, stdout=out)
+        self.assertIn('1 papers would be frozen', out.getvalue())
+        call_command('backfill_paper_snapshots', stdout=out)
+        self.assertIn('Wrote 1 paper snapshots', out.getvalue())
+
+        Question.objects.filter(id=self.question_ids[0]).update(text='বদলানো প্রশ্ন')
+        Question.objects.filter(id=self.question_ids[2]).delete()
+        call_command('backfill_paper_snapshots', stdout=io.StringIO())
+        self.assertEqual([row[1] for row in self.shown(frozen)], ['মূল প্রশ্ন 0'])
+        self.assertEqual([row[1] for row in self.shown(old)], ['মূল প্রশ্ন 1', 'মূল প্রশ্ন 2'])
+
+
+class DashboardStatsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('head', password='pw', is_staff=True)
+        cls.teacher = User.objects.create_user('rina', password='pw')
+        class_name = ClassName.objects.create(name='সপ্তম')
+        cls.subject = Subject.objects.create(name='গণিত', class_name=class_name)
+        chapters = [Chapter.objects.create(name=f'অধ্যায় {i}', subject=cls.subject) for i in (1, 2)]
+        store_questions([(Question(text=f'প্রশ্ন {i}', question_type='short', class_name=class_name,
+                                   subject=cls.subject, chapter=chapters[i % 2]), [chapters[i % 2].id])
+                         for i in range(6)])
+        cls.question_ids = list(Question.objects.order_by('id').values_list('id', flat=True))
+        now = timezone.now()
+        for user, ids, days_ago in ((cls.staff, cls.question_ids[:3], 21), (cls.teacher, cls.question_ids[2:5], 7),
+                                    (cls.teacher, cls.question_ids[::2], 0)):
+            paper = save_selection_as_paper(user, ids, 'পরীক্ষা')[0]
+            QuestionPaper.objects.filter(id=paper.id).update(created_at=now - timedelta(days=days_ago))
+
+    def setUp(self):
+        cache.clear()
+
+    @staticmethod
+    def live_weeks():
+        weeks = {}
+        for created_at in QuestionPaper.objects.values_list('created_at', flat=True):
+            day = timezone.localtime(created_at).date()
+            week = day - timedelta(days=day.weekday())
+            weeks[week] = weeks.get(week, 0) + 1
+        return weeks
+
+    @staticmethod
+    def live_usage():
+        usage = {}
+        for teacher_id, paper_id, chapter_id in PaperQuestion.objects.values_list(
+                'paper__creator_id', 'paper_id', 'question__chapter_id'):
+            questions, papers = usage.get((teacher_id, chapter_id), (0, set()))
+            usage[(teacher_id, chapter_id)] = (questions + 1, papers | {paper_id})
+        return {key: (questions, len(papers)) for key, (questions, papers) in usage.items()}
+
+    def assert_rollups_match(self):
+        self.assertEqual(dict(PaperWeekCount.objects.values_list('week', 'papers')), self.live_weeks())
+        rows = TeacherChapterUsage.objects.values_list('teacher_id', 'chapter_id', 'questions', 'papers')
+        self.assertEqual({(t, c): (q, p) for t, c, q, p in rows}, self.live_usage())
+        for teacher_id in (self.staff.id, self.teacher.id):
+            ranked = TeacherChapterUsage.objects.filter(teacher_id=teacher_id).order_by('rank')
+            counts = [row.questions for row in ranked]
+            self.assertEqual(counts, sorted(counts, reverse=True))
+
+    def test_full_refresh_matches_live_aggregates(self):
+        out = io.StringIO()
+        call_command('refresh_dashboard_stats', full=True, stdout=out)
+        self.assertIn('(all papers)', out.getvalue())
+        self.assert_rollups_match()
+
+    def test_incremental_refresh_adds_new_papers(self):
+        call_command('refresh_dashboard_stats', stdout=io.StringIO())
+        save_selection_as_paper(self.staff, self.question_ids[3:], 'নতুন')
+        out = io.StringIO()
+        call_command('refresh_dashboard_stats', stdout=out)
+        self.assertIn('since week of', out.getvalue())
+        self.assert_rollups_match()
+
+    def test_full_refresh_catches_deleted_old_papers(self):
+        call_command('refresh_dashboard_stats', stdout=io.StringIO())
+        QuestionPaper.objects.filter(creator=self.staff).delete()
+        # incremental শুধু শেষ সপ্তাহ থেকে দেখে; পুরনো সপ্তাহ --full-এ ঠিক হয়
+        call_command('refresh_dashboard_stats', stdout=io.StringIO())
+        self.assertNotEqual(dict(PaperWeekCount.objects.values_list('week', 'papers')), self.live_weeks())
+        call_command('refresh_dashboard_stats', full=True, stdout=io.StringIO())
+        self.assert_rollups_match()
+
+    def test_json_endpoint(self):
+        call_command('refresh_dashboard_stats', full=True, stdout=io.StringIO())
+        self.client.force_login(self.staff)
+        data = self.client.get(reverse('dashboard_stats'), {'top': 1}).json()
+        self.assertEqual(data['papers_per_week'],
+                         [{'week': week.isoformat(), 'papers': n} for week, n in sorted(self.live_weeks().items())])
+        subjects = [s for c in data['classes'] for s in c['subjects']]
+        self.assertEqual([(s['id'], s['questions']) for s in subjects],
+                         [(self.subject.id, Question.objects.filter(subject=self.subject).count())])
+        self.assertEqual({t['id'] for t in data['teachers']}, {self.staff.id, self.teacher.id})
+        self.assertTrue(all(len(t['chapters']) == 1 for t in data['teachers']))
+
+        self.client.force_login(self.teacher)
+        teachers = self.client.get(reverse('dashboard_stats')).json()['teachers']
+        self.assertEqual([t['username'] for t in teachers], ['rina'])
+
+
+class PaperPdfTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('printer', password='pw')
+        class_name = ClassName.objects.create(name='অষ্টম')
+        subject = Subject.objects.create(name='গণিত', class_name=class_name)
+        chapter = Chapter.objects.create(name='অধ্যায় ১', subject=subject)
+        store_questions([(Question(text=f'প্রশ্ন {i}', question_type='short', class_name=class_name,
+                                   subject=subject, chapter=chapter), [chapter.id]) for i in range(4)])
+        ids = list(Question.objects.order_by('id').values_list('id', flat=True))
+        cls.papers = [save_selection_as_paper(user, ids[:2], 'প্রথম')[0],
+                      save_selection_as_paper(user, ids[2:], 'দ্বিতীয়')[0]]
+
+    def test_batch_is_a_zip_of_cached_papers_in_order(self):
+        first, second = self.papers
+        with tempfile.TemporaryDirectory() as tmp, override_settings(PAPER_PDF_CACHE_DIR=tmp), \
+                mock.patch('core.pdf.html_to_pdf', return_value=b'%PDF-1.4\n') as render:
+            out = io.BytesIO()
+            self.assertEqual(pdf.render_batch([second, first], out), (2, 2))
+            self.assertEqual(pdf.render_batch([second, first], io.BytesIO()), (2, 0))
+        self.assertEqual(render.call_count, 2)
+        with zipfile.ZipFile(out) as archive:
+            self.assertEqual(archive.namelist(), [f'001-paper-{second.id}.pdf', f'002-paper-{first.id}.pdf'])
+
+    def test_missing_fonts_fail_loudly(self):
+        with tempfile.TemporaryDirectory() as tmp, override_settings(PAPER_PDF_FONT_DIR=tmp):
+            self.assertEqual([w.id for w in pdf.check_fonts()], ['core.W001'])
+            with self.assertRaises(ImproperlyConfigured):
+                pdf.html_to_pdf('<p>প্রশ্ন</p>')
+
+    def test_command_reports_missing_fonts_as_a_command_error(self):
+        with tempfile.TemporaryDirectory() as tmp, override_settings(PAPER_PDF_FONT_DIR=tmp, PAPER_PDF_CACHE_DIR=tmp):
+            with self.assertRaisesMessage(CommandError, 'PAPER_PDF_FONT_DIR'):
+                call_command('render_papers_pdf', ids=str(self.papers[0].id), output=os.path.join(tmp, 'out.zip'))
+
+    def test_command_writes_a_zip(self):
+        first, second = self.papers
+        with tempfile.TemporaryDirectory() as tmp, override_settings(PAPER_PDF_CACHE_DIR=tmp), \
+                mock.patch('core.pdf.html_to_pdf', return_value=b'%PDF-1.4\n'):
+            stderr = io.StringIO()
+            out = os.path.join(tmp, 'out.zip')
+            call_command('render_papers_pdf', ids=f'{first.id},{second.id}', output=out, stderr=stderr)
+            with zipfile.ZipFile(out) as archive:
+                self.assertEqual(len(archive.namelist()), 2)
+        self.assertIn('2 papers zipped', stderr.getvalue())
+
+
+@override_settings(ROOT_URLCONF='question_bank.urls_asgi')
+class AsyncViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('async', password='pw')
+        cls.class_name = ClassName.objects.create(name='সপ্তম')
+        cls.subject = Subject.objects.create(name='বিজ্ঞান', class_name=cls.class_name)
+        cls.chapters = [Chapter.objects.create(name=f'অধ্যায় {i}', subject=cls.subject) for i in (1, 2)]
+        store_questions([(Question(text=f'প্রশ্ন {i}', question_type='mcq', class_name=cls.class_name,
+                                   subject=cls.subject, chapter=cls.chapters[i % 2]), [c.id for c in cls.chapters])
+                         for i in range(5)])
+
+    def test_select_questions_matches_the_sync_view(self):
+        self.client.force_login(self.user)
+        params = {'class_id': self.class_name.id, 'subject_id': self.subject.id, 'question_type': 'mcq',
+                  'chapter_ids': ','.join(str(c.id) for c in self.chapters), 'question_count': 3, 'format': 'json'}
+        self.assertEqual(resolve(reverse('teacher_select_questions')).func.__module__, 'core.async_views')
+        data = self.client.get(reverse('teacher_select_questions'), params).json()
+        with override_settings(ROOT_URLCONF='question_bank.urls'):
+            self.assertEqual(self.client.get(reverse('teacher_select_questions'), params).json(), data)
+        self.assertEqual((len(data['questions']), data['available'], data['has_next']), (3, 5, True))
+        self.assertEqual(self.client.get(reverse('teacher_select_questions')).status_code, 200)
+
+
+class BenchmarkTests(TestCase):
+    """One iteration of every benchmark scenario on a tiny seeded dataset, so the runner does not rot."""
+
+    @classmethod
+    def setUpTestData(cls):
+        benchmarks.seed_dataset(classes=1, subjects=2, chapters=2, questions=40, users=3, papers=4,
+                                questions_per_paper=5, batch_size=20, prefix='t')
+        cls.context = benchmarks.BenchContext('t')
+
+    def test_every_scenario_runs(self):
+        scenarios = benchmarks.default_scenarios(self.context)
+        self.assertIn('paper_detail', scenarios)
+        for name, (user, fn) in scenarios.items():
+            with self.subTest(name):
+                client = Client()
+                if user is not None:
+                    client.force_login(user)
+                result = benchmarks.run_scenario(client, fn, 1, 0, random.Random(1))
+                self.assertEqual(set(result['status_codes']) - {'200', '202'}, set())
+                self.assertEqual(result['iterations'], 1)
+        for job in Job.objects.exclude(file=''):
+            job.file.delete(save=False)
+
+    def test_hot_read_requests_resolve(self):
+        client = Client()
+        client.force_login(self.context.teacher)
+        for path, query, _ in benchmarks.hot_read_requests(self.context, 20, random.Random(1)):
+            self.assertEqual(client.get(f'{path}?{query}').status_code, 200, path)
+
+
+class AuthoringTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('author', password='pw')
+        cls.class_name = ClassName.objects.create(name='নবম শ্রেণি')
+        cls.other_class = ClassName.objects.create(name='দশম শ্রেণি')
+        cls.subject = Subject.objects.create(name='গণিত', class_name=cls.class_name)
+        cls.other_subject = Subject.objects.create(name='গণিত', class_name=cls.other_class)
+        cls.chapter = Chapter.objects.create(name='বীজগণিত', subject=cls.subject)
+        cls.other_chapter = Chapter.objects.create(name='জ্যামিতি', subject=cls.other_subject)
+
+    def setUp(self):
+        cache.clear()
+        self.index = authoring.TaxonomyIndex()
+
+    def item(self, **extra):
+        return {'class': self.class_name.id, 'subject': self.subject.id, 'text': 'x² = 4 হলে x কত?',
+                'options': {'a': '2', 'b': '-2', 'c': '±2'}, 'correct_option': 'c', **extra}
+
+    def test_names_and_ids_resolve_to_the_same_rows(self):
+        by_id = authoring.validate_item(self.item(chapters=[self.chapter.id]), self.index)
+        by_name = authoring.validate_item(self.item(**{'class': ' নবম শ্রেণি ', 'subject': 'গণিত',
+                                                       'chapters': ['বীজগণিত', str(self.chapter.id)]}), self.index)
+        self.assertEqual(by_id, by_name)
+        fields, chapter_ids, errors = by_id
+        self.assertEqual((fields['class_name_id'], fields['subject_id'], chapter_ids, errors),
+                         (self.class_name.id, self.subject.id, [self.chapter.id], []))
+
+    def test_names_are_scoped_to_the_parent(self):
+        # একই নামের বিষয় অন্য ক্লাসে, অধ্যায় অন্য বিষয়ে — মেলানো হয় না
+        _, _, errors = authoring.validate_item(self.item(subject=self.other_subject.id), self.index)
+        self.assertEqual(errors, ['unknown subject for this class'])
+        _, _, errors = authoring.validate_item(self.item(chapters=['জ্যামিতি', self.other_chapter.id]), self.index)
+        self.assertEqual(len(errors), 2)
+
+    def test_bengali_option_labels(self):
+        fields, _, errors = authoring.validate_item(self.item(correct_option='খ'), self.index)
+        self.assertEqual((fields['correct_option'], errors), ('b', []))
+        _, _, errors = authoring.validate_item(self.item(correct_option='ঘ'), self.index)
+        self.assertEqual(errors, ['correct_option must name one of the given options (a-d / ক-ঘ)'])
+
+    def test_mcq_needs_two_options(self):
+        _, _, errors = authoring.validate_item(self.item(options={'a': '2'}, correct_option='ক'), self.index)
+        self.assertEqual(errors, ['mcq needs at least two options'])
+        _, _, errors = authoring.validate_item(self.item(options={}, question_type='short', correct_option=''),
+                                               self.index)
+        self.assertEqual(errors, [])
+
+    def test_all_or_nothing(self):
+        items = [self.item(), self.item(text='')]
+        results = authoring.create_questions(items, all_or_nothing=True)
+        self.assertEqual([r['ok'] for r in results], [False, False])
+        self.assertFalse(Question.objects.exists())
+        results = authoring.create_questions(items)
+        self.assertEqual([r['ok'] for r in results], [True, False])
+        self.assertEqual(Question.objects.get().id, results[0]['id'])
+
+    def test_modal_rejects_invalid_input(self):
+        self.client.force_login(self.user)
+        url = reverse('create_question_from_modal')
+        data = {'class_id': self.class_name.id, 'subject_id': self.subject.id, 'question_type': 'mcq',
+                'option_a': '2', 'option_b': '-2', 'correct_option': 'ক'}
+        self.assertEqual(self.client.post(url, data).status_code, 400)
+        self.assertEqual(self.client.post(url, {**data, 'text': 'প্রশ্ন', 'option_b': ''}).status_code, 400)
+        response = self.client.post(url, {**data, 'text': 'প্রশ্ন', 'chapters': [self.chapter.id]})
+        self.assertEqual((response.status_code, response.json()['created']), (200, 1))
+        self.assertEqual(list(Question.objects.get().chapters.all()), [self.chapter])
+
+
+@skipUnless(connections[DEFAULT_DB_ALIAS].vendor == 'sqlite', 'SQLite FTS5 backend')
+class SQLiteSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        class_name = ClassName.objects.create(name='দশম')
+        subject = Subject.objects.create(name='পদার্থবিজ্ঞান', class_name=class_name)
+        chapter = Chapter.objects.create(name='বল', subject=subject)
+        common = {'question_type': 'short', 'class_name': class_name, 'subject': subject, 'chapter': chapter}
+        cls.mass = Question.objects.create(text='বস্তুর ভর ১০ কেজি হলে ওজন কত?', **common)
+        # precomposed য় (U+09DF) আর ZWJ সহ লেখা
+        cls.topic = Question.objects.create(text='আলোর বিষ\u09dfবস্তু র\u200d্যাম্প', **common)
+
+    def search(self, query):
+        return set(search_questions(Question.objects.all(), query).values_list('id', flat=True))
+
+    def test_uses_the_fts_table(self):
+        self.assertIsInstance(search.get_backend(), search.SQLiteSearchBackend)
+
+    def test_bengali_and_ascii_digits_match(self):
+        self.assertEqual(self.search('10 কেজি'), {self.mass.id})
+        self.assertEqual(self.search('১০'), {self.mass.id})
+
+    def test_composition_and_zero_width_do_not_matter(self):
+        # decomposed য + নুক্তা, ZWJ ছাড়া
+        self.assertEqual(self.search('বিষ\u09af\u09bcবস্তু'), {self.topic.id})
+        self.assertEqual(self.search('র্যাম্প'), {self.topic.id})
+
+    def test_prefix_match(self):
+        self.assertEqual(self.search('ওজ'), {self.mass.id})
+
+    def test_fallback_backend_is_not_cached(self):
+        with mock.patch.dict(search._backends, clear=True):
+            with mock.patch.object(connections[DEFAULT_DB_ALIAS].introspection, 'table_names', return_value=[]):
+                self.assertIsInstance(search.get_backend(), search.FallbackSearchBackend)
+            self.assertIsInstance(search.get_backend(), search.SQLiteSearchBackend)
+
+
+class ConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.class_name = ClassName.objects.create(name='অষ্টম')
+        Subject.objects.create(name='বাংলা', class_name=cls.class_name)
+
+    def setUp(self):
+        cache.clear()
+
+    def assert_not_modified(self, url, params, response):
+        for headers in ({'HTTP_IF_NONE_MATCH': response['ETag']},
+                        {'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']}):
+            with self.assertNumQueries(0):
+                again = self.client.get(url, params, **headers)
+            self.assertEqual((again.status_code, again.content), (304, b''))
+
+    def test_taxonomy_lookups_answer_304(self):
+        url, params = reverse('ajax_load_subjects'), {'class_id': self.class_name.id}
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('must-revalidate', response['Cache-Control'])
+        self.assert_not_modified(url, params, response)
+
+    def test_taxonomy_change_invalidates_the_etag(self):
+        url, params = reverse('ajax_load_subjects'), {'class_id': self.class_name.id}
+        old = self.client.get(url, params)
+        english = Subject.objects.create(name='ইংরেজি', class_name=self.class_name)  # signal ভার্সন বাড়ায়
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=old['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], old['ETag'])
+        self.assertIn(english.id, [s['id'] for s in response.json()])
+
+    def test_location_lookups_answer_304(self):
+        url, params = reverse('ajax_load_districts'), {'division': '1'}
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('public', response['Cache-Control'])
+        self.assert_not_modified(url, params, response)
+
+
+class TaxonomyCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.class_name = ClassName.objects.create(name='ষষ্ঠ')
+        Subject.objects.create(name='বাংলা', class_name=cls.class_name)
+
+    def setUp(self):
+        cache.clear()
+
+    def chain_url(self):
+        return f'/chaining/filter/core/Subject/class_name/core/Question/subject/{self.class_name.id}/'
+
+    def test_chaining_response_is_cached_until_the_taxonomy_changes(self):
+        first = self.client.get(self.chain_url())
+        self.assertEqual(len(first.json()), 1)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.chain_url())
+        self.assertEqual(second.content, first.content)
+        self.assertIn('no-cache', second['Cache-Control'])
+
+        english = Subject.objects.create(name='ইংরেজি', class_name=self.class_name)  # signal ভার্সন বাড়ায়
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            third = self.client.get(self.chain_url())
+        self.assertGreater(len(queries), 0)
+        self.assertIn(english.id, [s['value'] for s in third.json()])
+
+    def test_other_models_are_not_cached(self):
+        url = f'/chaining/filter/auth/User/id/core/Question/subject/{self.class_name.id}/'
+        self.client.get(url)
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            self.client.get(url)
+        self.assertGreater(len(queries), 0)
+
+
+class QueryBudgetEnforcementTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('teacher', password='pw'))
+
+    @override_settings(QUERY_BUDGETS={'dashboard': 0})
+    def test_view_over_budget_fails(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'GET dashboard'):
+            self.client.get(reverse('dashboard'))
+
+    def test_block_over_budget_fails(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with assert_max_queries(1):
+                list(ClassName.objects.all())
+                list(Subject.objects.all())
+
+
+class AvailableCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.class_name = ClassName.objects.create(name='দশম')
+        cls.subject = Subject.objects.create(name='রসায়ন', class_name=cls.class_name)
+        cls.chapters = [Chapter.objects.create(name=f'অধ্যায় {i}', subject=cls.subject) for i in range(3)]
+        first, second, third = [c.id for c in cls.chapters]
+        # দুটি প্রশ্ন প্রথম দুই অধ্যায়েই আছে
+        store_questions([
+            (Question(text='উভয় অধ্যায়ে ১', question_type='mcq', class_name=cls.class_name, subject=cls.subject),
+             [first, second]),
+            (Question(text='উভয় অধ্যায়ে ২', question_type='mcq', class_name=cls.class_name, subject=cls.subject),
+             [first, second]),
+            (Question(text='শুধু প্রথমে', question_type='short', class_name=cls.class_name, subject=cls.subject),
+             [first]),
+            (Question(text='শুধু তৃতীয়তে', question_type='mcq', class_name=cls.class_name, subject=cls.subject),
+             [third]),
+        ])
+
+    def count(self, chapters=(), question_type=None):
+        return available_count(self.class_name.id, self.subject.id, [self.chapters[i].id for i in chapters],
+                               question_type)
+
+    def test_counts(self):
+        self.assertEqual(self.count(), 4)
+        self.assertEqual(self.count([0]), 3)
+        self.assertEqual(self.count([0], 'mcq'), 2)
+
+    def test_question_in_several_chosen_chapters_counts_once(self):
+        self.assertEqual(self.count([0, 1]), 3)
+        self.assertEqual(self.count([0, 1], 'mcq'), 2)
+        self.assertEqual(self.count([0, 1, 2]), 4)
+
+
+class SamplingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.class_name = ClassName.objects.create(name='সপ্তম')
+        cls.subject = Subject.objects.create(name='বিজ্ঞান', class_name=cls.class_name)
+        cls.chapters = [Chapter.objects.create(name=f'অধ্যায় {i}', subject=cls.subject) for i in range(2)]
+        store_questions([
+            (Question(text=f'প্রশ্ন {i}', question_type='mcq' if i % 3 else 'short', class_name=cls.class_name,
+                      subject=cls.subject, chapter=cls.chapters[i % 2]), [cls.chapters[i % 2].id])
+            for i in range(300)
+        ])
+        cls.mcq = set(Question.objects.filter(question_type='mcq').values_list('id', flat=True))
+
+    def sample(self, **kwargs):
+        return sample_questions(self.class_name.id, question_type='mcq', seed=11, **kwargs)
+
+    def check(self, result, requested, exclude=()):
+        self.assertEqual(len(result.ids), requested)
+        self.assertEqual(len(set(result.ids)), requested)
+        self.assertTrue(set(result.ids) <= self.mcq - set(exclude))
+        self.assertEqual(result.shortfall, {})
+
+    def test_big_strata_are_read_by_key_windows(self):
+        chapter_ids = [c.id for c in self.chapters]
+        exclude = sorted(self.mcq)[:50]
+        taxonomy.get_tree()  # গোনা হবে শুধু counters, key window (দরকারে আরেকবার) আর সারি
+        with mock.patch('core.sampling.FULL_SCAN_LIMIT', 20):
+            for kwargs in ({'chapter_ids': chapter_ids}, {'subject_ids': [self.subject.id]}, {}):
+                with self.subTest(**kwargs), assert_max_queries(4):
+                    result = self.sample(count=30, exclude=exclude, **kwargs)
+                self.check(result, 30, exclude)
+                self.assertEqual(result.ids, self.sample(count=30, exclude=exclude, **kwargs).ids)
+            result = self.sample(quotas={chapter_ids[0]: 25, chapter_ids[1]: 5})
+            self.check(result, 30)
+
+    def test_windows_widen_until_enough(self):
+        with mock.patch('core.sampling.FULL_SCAN_LIMIT', 20), mock.patch('core.sampling.OVERSAMPLE', 0.1):
+            self.check(self.sample(count=150), 150)
+            self.assertEqual(self.sample(count=500).shortfall, {None: 500 - len(self.mcq)})
+
+
+class MembershipTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('teacher', password='pw')
+        cls.class_name = ClassName.objects.create(name='অষ্টম')
+        cls.subject = Subject.objects.create(name='গণিত', class_name=cls.class_name)
+        cls.first, cls.second = [Chapter.objects.create(name=f'অধ্যায় {i}', subject=cls.subject) for i in range(2)]
+
+    def question(self, **fields):
+        return Question(**{'text': 'প্রশ্ন', 'question_type': 'mcq', 'class_name': self.class_name,
+                           'subject': self.subject, 'chapter': self.first, **fields})
+
+    def assertNoDrift(self):
+        drift = recount(Question, QuestionChapter, QuestionCount, dry_run=True)
+        self.assertEqual((drift['created'], drift['updated'], drift['deleted']), (0, 0, 0))
+
+    def test_changing_chapter_moves_the_primary_link(self):
+        question = self.question()
+        question.save()
+        question.chapter = self.second
+        question.save()
+        self.assertEqual(list(question.chapter_links.values_list('chapter_id', flat=True)), [self.second.id])
+        self.assertEqual(available_count(self.class_name.id, self.subject.id, [self.first.id]), 0)
+        self.assertEqual(available_count(self.class_name.id, self.subject.id, [self.second.id]), 1)
+        self.assertNoDrift()
+
+    def test_merge_lowers_question_count_of_papers_that_held_both_copies(self):
+        copies = Question.objects.bulk_create([self.question(), self.question(chapter=self.second)])
+        other = self.question(text='অন্য প্রশ্ন')
+        other.save()
+        paper = QuestionPaper.objects.create(program_name='পরীক্ষা', creator=self.user, class_level=self.class_name,
+                                             question_type='mcq', number_of_questions=3)
+        paper.set_questions([copies[0].id, other.id, copies[1].id])
+
+        stats = merge_duplicates(Question, QuestionChapter, PaperQuestion)
+        recount(Question, QuestionChapter, QuestionCount)
+
+        self.assertEqual((stats['duplicates'], stats['papers']), (1, 1))
+        paper.refresh_from_db()
+        self.assertEqual(paper.number_of_questions, 2)
+        self.assertEqual(list(paper.question_links.values_list('question_id', flat=True)), [copies[0].id, other.id])
+        self.assertEqual(set(copies[0].chapter_links.values_list('chapter_id', flat=True)),
+                         {self.first.id, self.second.id})
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TransactionTestCase):
+    """ReplicaRouter + ReplicaMiddleware with the replica in its own SQLite file.
+
+    Each database holds a row the other does not, so a read shows where it went.
+    """
+
+    # replica alias-টি setUpClass-এ যোগ হয়; '__all__' তখনই মূল্যায়িত হয়, আর test runner
+    # এর জন্য আলাদা test database বানায় না
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        connections.settings['replica'] = connections.configure_settings({
+            DEFAULT_DB_ALIAS: {},
+            'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': os.path.join(cls.tmp.name, 'replica.sqlite3')},
+        })['replica']
+        super().setUpClass()
+        # replica-র স্কিমা replication থেকে আসার কথা (allow_migrate=False), তাই এখানে হাতে বানানো
+        with connections['replica'].schema_editor() as editor:
+            editor.create_model(ClassName)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        with connections['replica'].cursor() as cursor:
+            # ORM delete-এর cascade অন্য টেবিল খোঁজে, যা replica-তে নেই
+            cursor.execute(f'DELETE FROM {ClassName._meta.db_table}')
+        ClassName.objects.using('replica').create(name='replica')
+        ClassName.objects.using(DEFAULT_DB_ALIAS).create(name='primary')
+
+    def request(self, view, method='get', cookies=None):
+        request = getattr(RequestFactory(), method)('/')
+        request.COOKIES.update(cookies or {})
+        return ReplicaMiddleware(view)(request)
+
+    @staticmethod
+    def names(request=None):
+        return ','.join(ClassName.objects.order_by('name').values_list('name', flat=True))
+
+    def read_view(self, request):
+        return HttpResponse(self.names())
+
+    def write_view(self, request):
+        before = self.names()
+        ClassName.objects.create(name='new')
+        return HttpResponse(f'{before}|{self.names()}')
+
+    def test_reads_go_to_replica(self):
+        response = self.request(self.read_view)
+        self.assertEqual(response.content, b'replica')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_writes_go_to_primary_and_pin_the_rest_of_the_request(self):
+        response = self.request(self.write_view)
+        self.assertEqual(response.content.decode(), 'replica|new,primary')
+        self.assertTrue(ClassName.objects.using(DEFAULT_DB_ALIAS).filter(name='new').exists())
+        self.assertFalse(ClassName.objects.using('replica').filter(name='new').exists())
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+    def test_pin_cookie_reads_your_writes(self):
+        cookie = self.request(self.write_view).cookies[PIN_COOKIE].value
+        self.assertEqual(self.request(self.read_view, cookies={PIN_COOKIE: cookie}).content, b'new,primary')
+        expired = f'{time.time() - 1:.3f}'
+        self.assertEqual(self.request(self.read_view, cookies={PIN_COOKIE: expired}).content, b'replica')
+
+    def test_unsafe_methods_and_transactions_read_primary(self):
+        self.assertEqual(self.request(self.read_view, method='post').content, b'primary')
+
+        def atomic_view(request):
+            with transaction.atomic():
+                return HttpResponse(self.names())
+        self.assertEqual(self.request(atomic_view).content, b'primary')
+
+    def test_outside_requests_use_primary(self):
+        self.assertEqual(self.names(), 'primary')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas_falls_back_to_primary(self):
+        self.assertEqual(self.request(self.read_view).content, b'primary')
+        response = self.request(self.write_view)
+        self.assertEqual(response.content.decode(), 'primary|new,primary')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
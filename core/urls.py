@@ -9,6 +9,7 @@ urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
     path('dashboard/', views.dashboard_view, name='dashboard'),
+    path('dashboard/stats/', views.dashboard_stats_json, name='dashboard_stats'),
     path('question/', views.question_page, name='question'),
     path('question_bank/', views.question_bank, name='question_bank'),
     path('question_ready/', views.question_ready, name='question_ready'),
@@ -20,13 +21,25 @@ urlpatterns = [
     # AJAX URLs
     path('ajax/load-subjects/', views.ajax_load_subjects, name='ajax_load_subjects'),
     path('ajax/load-chapters/', views.ajax_load_chapters, name='ajax_load_chapters'),
+    path('ajax/class-tree/', views.ajax_load_class_tree, name='ajax_load_class_tree'),
+    path('ajax/question-counts/', views.ajax_question_counts, name='ajax_question_counts'),
     # Teacher selection and paper preparation
     path('teacher/select-questions/', views.teacher_question_select, name='teacher_select_questions'),
+    path('teacher/search-questions/', views.teacher_search_questions, name='teacher_search_questions'),
+    path('teacher/sample-questions/', views.sample_questions_json, name='sample_questions'),
     path('teacher/prepare-paper/', views.prepare_paper, name='prepare_paper'),
     path('teacher/create-question-modal/', views.create_question_from_modal, name='create_question_from_modal'),
+    path('api/questions/batch/', views.api_create_questions, name='api_create_questions'),
+    path('questions/export/', views.export_questions, name='export_questions'),
     
     # My Papers URLs
     path('my-papers/', views.my_papers_list, name='my_papers_list'),
     path('paper/<int:paper_id>/', views.paper_detail_view, name='paper_detail'),
     path('paper/<int:paper_id>/delete/', views.delete_paper, name='delete_paper'),
+    path('paper/<int:paper_id>/pdf/', views.paper_pdf_view, name='paper_pdf'),
+    path('papers/pdf/', views.papers_pdf_batch, name='papers_pdf_batch'),
+
+    # Background jobs
+    path('jobs/<int:job_id>/status/', views.job_status, name='job_status'),
+    path('jobs/<int:job_id>/output/', views.job_output, name='job_output'),
 ]
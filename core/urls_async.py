@@ -0,0 +1,16 @@
+from django.urls import path
+
+from . import async_views
+from .urls import urlpatterns as sync_urlpatterns
+
+# ASGI প্রোফাইল: একই URL ও নামে async view আগে বসে, বাকি সব core.urls থেকে
+urlpatterns = [
+    path('ajax/load-districts/', async_views.ajax_load_districts, name='ajax_load_districts'),
+    path('ajax/load-thanas/', async_views.ajax_load_thanas, name='ajax_load_thanas'),
+    path('ajax/load-subjects/', async_views.ajax_load_subjects, name='ajax_load_subjects'),
+    path('ajax/load-chapters/', async_views.ajax_load_chapters, name='ajax_load_chapters'),
+    path('ajax/class-tree/', async_views.ajax_load_class_tree, name='ajax_load_class_tree'),
+    path('teacher/select-questions/', async_views.teacher_question_select, name='teacher_select_questions'),
+    path('teacher/search-questions/', async_views.teacher_search_questions, name='teacher_search_questions'),
+    path('my-papers/', async_views.my_papers_list, name='my_papers_list'),
+] + sync_urlpatterns
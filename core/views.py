@@ -1,20 +1,36 @@
-from django import forms
+import json
+import os
+
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
+from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.models import User
-from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
-from django.http import JsonResponse
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.urls import reverse
 
-from core.forms import SignUpForm, BANGLADESH_DIVISIONS_DISTRICTS_THANAS, QuestionPaperForm
-from .models import Profile, ClassName, Subject, Chapter, QuestionPaper
+from core.forms import SignUpForm, QuestionPaperForm
+from .models import Profile, Subject, Chapter, QuestionPaper, PaperQuestion, Job
 from .models import Question
-
-from django.views.decorators.http import require_POST
-from django.db.models import Q
+from .question_types import normalize_question_type
+from . import authoring, availability, dashboard_stats, exporters, locations, pdf, taxonomy
+from .jobs import enqueue
+from .membership import filter_chapters
+from .http_cache import location_conditional, taxonomy_conditional
+from .pagination import keyset_page, parse_per_page, parse_start
+from .sampling import sample_questions, parse_quotas, parse_id_list
+from .search import search_questions
+from .snapshots import freeze_paper, snapshot_questions
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.middleware.csrf import CsrfViewMiddleware
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils.cache import get_conditional_response
 
 
 # Create your views here.
@@ -27,21 +43,6 @@ def signup_view(request):
     if request.method == 'POST':
         form = SignUpForm(request.POST)
 
-        # সাবমিট করার সময় জেলা ও থানার তালিকা লোড করা (ভ্যালিডেশনের জন্য)
-        selected_division = request.POST.get('division')
-        selected_district = request.POST.get('district')
-
-        if selected_division:
-            districts = BANGLADESH_DIVISIONS_DISTRICTS_THANAS.get(selected_division, {}).keys()
-            district_choices = [('', '----- জেলা নির্বাচন করুন -----')] + [(district, district) for district in
-                                                                           districts]
-            form.fields['district'].choices = district_choices
-
-        if selected_division and selected_district:
-            thanas = BANGLADESH_DIVISIONS_DISTRICTS_THANAS.get(selected_division, {}).get(selected_district, [])
-            thana_choices = [('', '----- থানা নির্বাচন করুন -----')] + [(thana, thana) for thana in thanas]
-            form.fields['thana'].choices = thana_choices
-
         if form.is_valid():
             cd = form.cleaned_data
             new_user = User.objects.create_user(username=cd['username'], password=cd['password'])
@@ -60,23 +61,19 @@ def signup_view(request):
     for field_name, field in form.fields.items():
         field.widget.attrs.update({'class': 'form-control'})
 
-    return render(request, 'users/signup.html', {'form': form})
+    return render(request, 'users/signup.html', {'form': form, 'locations_url': locations.static_url()})
 
 
 # AJAX View for loading districts
+@location_conditional
 def load_districts(request):
-    division = request.GET.get('division')
-    districts = list(BANGLADESH_DIVISIONS_DISTRICTS_THANAS.get(division, {}).keys())
-    return JsonResponse(districts, safe=False)
+    return JsonResponse(locations.districts(request.GET.get('division')), safe=False)
 
 
 # AJAX View for loading thanas
+@location_conditional
 def load_thanas(request):
-    division = request.GET.get('division')
-    district = request.GET.get('district')
-    thanas = []
-    if division and district:
-        thanas = BANGLADESH_DIVISIONS_DISTRICTS_THANAS.get(division, {}).get(district, [])
+    thanas = locations.thanas(request.GET.get('division'), request.GET.get('district'))
     return JsonResponse(thanas, safe=False)
 
 
@@ -105,7 +102,30 @@ def logout_view(request):
 # Dashboard View - Protected
 @login_required
 def dashboard_view(request):
-    return render(request, 'core/dashboard.html')
+    # প্রশ্ন গণনা টেবিল থেকে — পুরো Question টেবিলে COUNT চলে না
+    totals = availability.type_totals()
+    return render(request, 'core/dashboard.html', {
+        'question_totals': [(label, totals.get(key, 0)) for key, label in Question.QUESTION_TYPE_CHOICES],
+        'question_total': sum(totals.values()),
+    })
+
+
+@login_required
+@require_GET
+def dashboard_stats_json(request):
+    """Dashboard statistics from the precomputed rollups (see core.dashboard_stats).
+
+    GET params: weeks (default 12, max 104), top (chapters per teacher, default 5, max 20).
+    """
+    def int_param(name, default, maximum):
+        raw = request.GET.get(name) or ''
+        return min(max(int(raw), 1), maximum) if raw.isdigit() else default
+
+    return JsonResponse(dashboard_stats.dashboard_stats(
+        request.user,
+        weeks=int_param('weeks', dashboard_stats.DEFAULT_WEEKS, 104),
+        limit=int_param('top', dashboard_stats.DEFAULT_TOP_CHAPTERS, 20),
+    ))
 
 
 @login_required
@@ -113,7 +133,7 @@ def question_page(request):
     # Provide the QuestionPaperForm instance and classes queryset so the
     # template can render the class select and labels correctly.
     form = QuestionPaperForm()
-    classes = ClassName.objects.all()
+    classes = taxonomy.get_classes()
     return render(request, 'core/question.html', {'form': form, 'classes': classes})
 
 
@@ -125,14 +145,15 @@ def question_bank(request):
 @login_required
 def teacher_question_select(request):
     """Require class, subject, chapter(s), question_type and question_count to show questions.
-    Adds debug info and normalizes some common labels to internal keys (mcq/short/creative).
+    Normalizes the requested type to the canonical keys (mcq/short/creative).
     """
-    classes = ClassName.objects.all()
-    subjects = Subject.objects.none()
-    chapters = Chapter.objects.none()
+    classes = taxonomy.get_classes()
+    subjects = []
+    chapters = []
     questions = Question.objects.none()
+    page = None
+    available = None
     show_questions = False
-    debug = {}
 
     if request.method == 'GET':
         class_id = request.GET.get('class_id')
@@ -145,99 +166,102 @@ def teacher_question_select(request):
         question_type_raw = (request.GET.get('question_type') or '').strip()
         question_count_raw = request.GET.get('question_count')
 
-        # --- normalize question type robustly using keyword matching ---
-        def normalize_qtype(s):
-            if not s:
-                return ''
-            s_low = s.strip().lower()
-            # mcq variants (English + Bangla variants)
-            mcq_keywords = ['mcq', 'multiple', 'multiple choice', 'multiple-choice', 'multiplechoice', 'বহু', 'বহুনির্বাচনী', 'বহু-নির্বাচনী', 'বহু নির্বাচনি']
-            short_keywords = ['short', 'সংক্ষেপ', 'সংক্ষিপ্ত']
-            creative_keywords = ['creative', 'সৃজন', 'সৃজনশীল']
-
-            for kw in mcq_keywords:
-                if kw in s_low:
-                    return 'mcq'
-            for kw in short_keywords:
-                if kw in s_low:
-                    return 'short'
-            for kw in creative_keywords:
-                if kw in s_low:
-                    return 'creative'
-            return s_low  # fallback to the lowercased raw value
-
-        qtype_key = normalize_qtype(question_type_raw)
+        # মাইগ্রেশন ও save() সব প্রশ্নে ক্যানোনিকাল key রাখে, তাই ইনপুটও একইভাবে নরমালাইজ করা হয়
+        qtype_key = normalize_question_type(question_type_raw)
 
         # populate dropdowns
         if class_id:
-            subjects = Subject.objects.filter(class_name_id=class_id)
+            subjects = taxonomy.get_subjects(class_id)
         if subject_id:
-            chapters = Chapter.objects.filter(subject_id=subject_id)
-
-        debug['input'] = {
-            'class_id': class_id,
-            'subject_id': subject_id,
-            'chapter_ids_raw': chapter_ids_raw,
-            'chapter_ids_parsed': chapter_ids,
-            'question_type_raw': question_type_raw,
-            'question_type_key': qtype_key,
-            'question_count_raw': question_count_raw,
-        }
+            chapters = taxonomy.get_chapters(subject_id)
 
         # require all fields per your requirement (chapter_ids must be non-empty)
         if class_id and subject_id and chapter_ids and qtype_key:
             show_questions = True
 
-            base_qs = Question.objects.filter(
+            # অধ্যায় membership ইনডেক্স দিয়ে, বাকিটা core_q_subject_type_idx — একাধিক অধ্যায়ে থাকা প্রশ্ন একবারই আসে
+            base_qs = filter_chapters(Question.objects.filter(
                 class_name_id=class_id,
                 subject_id=subject_id,
-                chapter_id__in=chapter_ids,
+                question_type=qtype_key,
+            ), chapter_ids)
+
+            # question_count এখন পেজের আকার; পরের পেজ cursor দিয়ে আসে (OFFSET/COUNT ছাড়া)
+            page = keyset_page(
+                base_qs,
+                cursor=request.GET.get('cursor'),
+                per_page=parse_per_page(question_count_raw),
+                start_index=parse_start(request.GET.get('start')),
             )
+            questions = page.items
+            available = availability.available_count(class_id, subject_id, chapter_ids, qtype_key)
 
-            # build robust filter for question_type:
-            from django.db.models import Q
-            if qtype_key == 'mcq':
-                # match known mcq variants in DB
-                qfilter = Q(question_type__iexact='mcq') | Q(question_type__icontains='multiple') | Q(question_type__icontains='বহু')
-                base_qs = base_qs.filter(qfilter)
-            elif qtype_key == 'short':
-                qfilter = Q(question_type__iexact='short') | Q(question_type__icontains='সংক্ষিপ্ত') | Q(question_type__icontains='সংক্ষেপ')
-                base_qs = base_qs.filter(qfilter)
-            elif qtype_key == 'creative':
-                qfilter = Q(question_type__iexact='creative') | Q(question_type__icontains='সৃজন')
-                base_qs = base_qs.filter(qfilter)
-            else:
-                # unknown key — try exact match (case-insensitive)
-                base_qs = base_qs.filter(question_type__iexact=qtype_key)
-
-            debug['counts'] = {
-                'base_in_chapters': base_qs.count(),
-                'total_in_selected_chapters': Question.objects.filter(chapter_id__in=chapter_ids).count(),
-                'null_chapter_same_subject_class': Question.objects.filter(chapter__isnull=True, subject_id=subject_id, class_name_id=class_id).count()
-            }
-
-            try:
-                count = int(question_count_raw) if question_count_raw else 20
-            except (ValueError, TypeError):
-                count = 20
-
-            questions = base_qs.order_by('-created_at')[:max(1, count)]
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'questions': [q.as_dict() for q in questions],
+            'available': available,
+            'has_next': bool(page and page.has_next),
+            'next_cursor': page.next_cursor if page else None,
+            'next_start': page.next_start_index if page else None,
+        })
 
     return render(request, 'core/teacher_select_questions.html', {
         'classes': classes,
         'subjects': subjects,
         'chapters': chapters,
         'questions': questions,
+        'page': page,
+        'available': available,
         'show_questions': show_questions,
     })
 
 
+@login_required
+def teacher_search_questions(request):
+    """Full-text search over questions for teachers (JSON).
+
+    GET params: q (required), class_id, subject_id, chapter_ids (comma-separated),
+    question_type, limit (default 20, max 100).
+    """
+    query = (request.GET.get('q') or '').strip()
+    if not query:
+        return JsonResponse({'error': 'q is required'}, status=400)
+
+    qs = Question.objects.all()
+    class_id = request.GET.get('class_id')
+    subject_id = request.GET.get('subject_id')
+    chapter_ids = [int(x) for x in (request.GET.get('chapter_ids') or '').split(',') if x.strip().isdigit()]
+    qtype_key = normalize_question_type(request.GET.get('question_type') or '')
+    if class_id and class_id.isdigit():
+        qs = qs.filter(class_name_id=class_id)
+    if subject_id and subject_id.isdigit():
+        qs = qs.filter(subject_id=subject_id)
+    if chapter_ids:
+        qs = filter_chapters(qs, chapter_ids)
+    if qtype_key:
+        qs = qs.filter(question_type=qtype_key)
+
+    try:
+        limit = min(max(int(request.GET.get('limit') or 20), 1), 100)
+    except ValueError:
+        limit = 20
+
+    qs = search_questions(qs, query).order_by('-created_at', '-id')
+    results = list(qs.values(
+        'id', 'text', 'question_type', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_option',
+        'class_name_id', 'subject_id', 'chapter_id',
+    )[:limit])
+    return JsonResponse({'query': query, 'count': len(results), 'results': results})
+
+
 @login_required
 def prepare_paper(request):
     """
     Handle selected questions and render prepare_paper page.
     Safely read question ids and optional form fields (school_name, duration, total_marks, include_omr).
     Also precompute Bengali indices for template (no templatetags required).
+    The selection is only a preview until the page's save button posts save=1;
+    the saved paper's id is carried back in the form, so saving again updates it.
     """
     if request.method != 'POST':
         messages.error(request, "No questions submitted.")
@@ -259,13 +283,23 @@ def prepare_paper(request):
         messages.error(request, "কোনো প্রশ্ন নির্বাচিত হয়নি।")
         return redirect(request.META.get('HTTP_REFERER', '/'))
 
-    # load questions with related fks
-    from .models import Question
-    questions_qs = Question.objects.filter(id__in=qids).select_related('class_name', 'subject', 'chapter').order_by('id')
-    questions = list(questions_qs)
-
     # Read optional metadata (prefer POST, fallback to GET, default to empty string)
     school_name = request.POST.get('school_name') or request.GET.get('school_name', '') or ''
+
+    # শিক্ষকের নির্বাচন তার দেওয়া ক্রমেই দেখানো হয়; পেপার তৈরি/হালনাগাদ শুধু "সংরক্ষণ" চাপলে
+    paper_id = request.POST.get('paper_id') or ''
+    paper = None
+    if request.POST.get('save') == '1':
+        paper, questions = save_selection_as_paper(request.user, qids, school_name, paper_id=paper_id)
+        if paper is not None:
+            messages.success(request, "পেপার সংরক্ষিত হয়েছে।")
+    else:
+        questions = selected_questions(qids)
+        if paper_id.isdigit():
+            paper = QuestionPaper.objects.filter(id=int(paper_id), creator=request.user).first()
+    if not questions:
+        messages.error(request, "কোনো প্রশ্ন নির্বাচিত হয়নি।")
+        return redirect(request.META.get('HTTP_REFERER', '/'))
     duration = request.POST.get('duration') or request.GET.get('duration', '') or ''
     total_marks = request.POST.get('total_marks') or request.GET.get('total_marks', '') or ''
     include_omr = bool(request.POST.get('include_omr') or request.GET.get('include_omr'))
@@ -289,6 +323,7 @@ def prepare_paper(request):
         })
 
     context = {
+        'paper': paper,
         'questions': questions,
         'questions_with_index': questions_with_index,
         'school_name': school_name,
@@ -301,6 +336,46 @@ def prepare_paper(request):
     return render(request, 'core/prepare_paper.html', context)
 
 
+def selected_questions(question_ids):
+    """Questions with the given ids, with class/subject/chapter, in the given order (unknown ids dropped)."""
+    found = Question.objects.select_related('class_name', 'subject', 'chapter').in_bulk(question_ids)
+    return [found[qid] for qid in dict.fromkeys(question_ids) if qid in found]
+
+
+def save_selection_as_paper(user, question_ids, program_name='', paper_id=None):
+    """Store hand-picked questions (in the given order) as one of `user`'s papers.
+
+    With `paper_id` of an existing paper of the user its questions are replaced,
+    otherwise a new paper is created. Returns (paper, questions in order), or
+    (None, []) when no id is a real question.
+    """
+    question_ids = list(dict.fromkeys(question_ids))
+    rows = {r['id']: r for r in Question.objects.filter(id__in=question_ids)
+            .values('id', 'class_name_id', 'subject_id', 'question_type')}
+    question_ids = [qid for qid in question_ids if qid in rows]
+    if not question_ids:
+        return None, []
+    types = {rows[qid]['question_type'] for qid in question_ids}
+    question_type = types.pop() if len(types) == 1 and types <= {'mcq', 'creative'} else 'combined'
+
+    with transaction.atomic():
+        paper = None
+        if paper_id and str(paper_id).isdigit():
+            paper = QuestionPaper.objects.filter(id=int(paper_id), creator=user).first()
+        if paper is None:
+            paper = QuestionPaper(creator=user)
+        paper.program_name = (program_name or 'প্রশ্নপত্র')[:255]
+        paper.class_level_id = rows[question_ids[0]]['class_name_id']
+        paper.question_type = question_type
+        paper.number_of_questions = len(question_ids)
+        paper.save()
+        paper.subjects.set({rows[qid]['subject_id'] for qid in question_ids})
+        paper.set_questions(question_ids)
+        questions = paper.ordered_questions()
+        freeze_paper(paper, questions, force=True)
+    return paper, questions
+
+
 @login_required
 def question_ready(request):
     return render(request, template_name='core/question_ready.html')
@@ -309,22 +384,35 @@ def question_ready(request):
 @login_required
 def my_papers_list(request):
     """Display papers created by current user and any papers with null creator (fallback)."""
-    from django.db.models import Q
-
     # include papers created by user OR with null creator
     papers_list = QuestionPaper.objects.filter(
         Q(creator=request.user) | Q(creator__isnull=True)
-    ).order_by('-created_at')
+    ).select_related('class_level').prefetch_related('subjects').annotate(question_total=Count('questions'))
 
-    paginator = Paginator(papers_list, 10)
-    page_number = request.GET.get('page', 1)
+    papers = keyset_page(
+        papers_list,
+        cursor=request.GET.get('cursor'),
+        per_page=10,
+        start_index=parse_start(request.GET.get('start')),
+    )
 
-    try:
-        papers = paginator.page(page_number)
-    except PageNotAnInteger:
-        papers = paginator.page(1)
-    except EmptyPage:
-        papers = paginator.page(paginator.num_pages)
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'papers': [
+                {
+                    'id': p.id,
+                    'program_name': p.program_name,
+                    'question_type': p.question_type,
+                    'number_of_questions': p.number_of_questions,
+                    'created_at': p.created_at.isoformat(),
+                    'detail_url': reverse('paper_detail', args=[p.id]),
+                }
+                for p in papers
+            ],
+            'has_next': papers.has_next,
+            'next_cursor': papers.next_cursor,
+            'next_start': papers.next_start_index,
+        })
 
     return render(request, 'core/my_papers_list.html', {'papers': papers})
 
@@ -344,15 +432,22 @@ def paper_delete_view(request, paper_id):
 def paper_detail_view(request, paper_id):
     """Display a specific paper in A4 format for viewing/printing"""
     try:
-        paper = QuestionPaper.objects.get(id=paper_id, creator=request.user)
+        # class_level join-এ: snapshot না থাকলে freeze-এর সময় আলাদা query লাগে না
+        paper = QuestionPaper.objects.select_related('class_level').get(id=paper_id, creator=request.user)
     except QuestionPaper.DoesNotExist:
         return redirect('my_papers_list')
 
-    questions = paper.questions.all()
+    # snapshot থেকে রেন্ডার — পেপারের এই একটি সারিই যথেষ্ট; পুরনো পেপারের snapshot প্রথমবার খোলার সময় তৈরি হয়
+    if paper.snapshot is None:
+        freeze_paper(paper)
+    snapshot = paper.snapshot
+    questions = snapshot_questions(snapshot)
 
     context = {
         'paper': paper,
         'questions': questions,
+        'class_name': snapshot['class'],
+        'subject_names': snapshot['subjects'],
         'school_name': paper.program_name,
         'total_marks': paper.number_of_questions * 1,  # Assuming 1 mark per question
         'duration': '60 মিনিট',  # Default duration
@@ -360,6 +455,50 @@ def paper_detail_view(request, paper_id):
     return render(request, 'core/paper_detail_a4.html', context)
 
 
+@login_required
+def paper_pdf_view(request, paper_id):
+    """Server-rendered PDF of a paper (`?omr=1` adds the OMR answer sheet), served from the PDF cache."""
+    paper = get_object_or_404(QuestionPaper, id=paper_id, creator=request.user)
+    include_omr = request.GET.get('omr') in ('1', 'true', 'on')
+
+    # hash পেপারের কনটেন্ট থেকে — ব্রাউজারের কাছে আগের কপি থাকলে 304, ফাইল খোলারও দরকার নেই
+    digest = pdf.paper_hash(paper, include_omr)
+    etag = f'"{digest}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    try:
+        path, digest, _ = pdf.get_paper_pdf(paper, include_omr)
+    except (ImportError, ImproperlyConfigured) as e:
+        return JsonResponse({'error': str(e)}, status=501)
+    filename = f"paper-{paper.id}{'-omr' if include_omr else ''}.pdf"
+    response = FileResponse(open(path, 'rb'), content_type='application/pdf', filename=filename)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, max-age=86400'
+    return response
+
+
+@login_required
+@require_POST
+def papers_pdf_batch(request):
+    """Queue a print run: a background job zips the papers' PDFs (in the given order)."""
+    ids = parse_id_list(','.join(request.POST.getlist('paper_ids')))
+    own = set(QuestionPaper.objects.filter(id__in=ids, creator=request.user).values_list('id', flat=True))
+    paper_ids = [i for i in dict.fromkeys(ids) if i in own]
+    if not paper_ids:
+        return JsonResponse({'error': 'কোনো পেপার নির্বাচন করা হয়নি'}, status=400)
+
+    job = enqueue('render_papers_pdf', payload={
+        'paper_ids': paper_ids,
+        'include_omr': request.POST.get('omr') in ('1', 'true', 'on'),
+    }, user=request.user)
+    return JsonResponse({
+        'job_id': job.id,
+        'status_url': reverse('job_status', args=[job.id]),
+    }, status=202)
+
+
 @login_required
 def create_paper_submit_view(request):
     """Processes the submitted question paper form data."""
@@ -395,10 +534,30 @@ def create_paper_submit_view(request):
             paper.subjects.set(subjects_from_form)
             paper.chapters.set(chapters_from_form)
 
+            # নির্বাচিত অধ্যায় থেকে র‍্যান্ডম প্রশ্ন দিয়ে পেপার পূরণ করা
+            seed_raw = request.POST.get('seed') or ''
+            exclude = set(parse_id_list(request.POST.get('exclude_ids')))
+            if request.POST.get('exclude_used'):
+                exclude.update(used_question_ids(request.user))
+            result = sample_questions(
+                class_id=paper.class_level_id,
+                count=paper.number_of_questions,
+                subject_ids=[s.id for s in subjects_from_form],
+                chapter_ids=[c.id for c in chapters_from_form],
+                question_type=paper.question_type,
+                quotas=parse_quotas(request.POST.get('quotas')),
+                seed=int(seed_raw) if seed_raw.isdigit() else None,
+                exclude=exclude,
+            )
+            paper.set_questions(result.questions)
+            paper.sample_seed = result.seed
+            paper.save(update_fields=['sample_seed'])
+            freeze_paper(paper, result.questions)
+
             # Redirect to the create page and show the created paper there
             return redirect(f"/accounts/create-paper/?created={paper.id}")
         else:
-            print(form.errors)
+            messages.error(request, "পেপার তৈরি হয়নি — ফর্মের তথ্য আবার দেখুন।")
             # যদি ফর্ম ভ্যালিড না হয়, তাহলে error সহ ফর্ম পেইজে ফেরত পাঠানো যেতে পারে
             # কিন্তু এর জন্য question_form_view-তে POST হ্যান্ডেল করতে হবে
             # আপাতত সহজ রাখার জন্য ড্যাশবোর্ডে রিডাইরেক্ট করা হলো
@@ -427,36 +586,116 @@ def create_question_paper_view(request):
     return render(request, 'core/question_paper_form.html', {'form': form, 'created_paper': created_paper})
 
 
+@login_required
+def job_status(request, job_id):
+    """JSON progress/status of a background job, polled by the upload and export pages."""
+    job = get_object_or_404(Job, id=job_id)
+    if not request.user.is_staff and job.created_by_id != request.user.id:
+        return JsonResponse({'error': 'not allowed'}, status=403)
+    return JsonResponse(job.as_dict())
+
+
+@login_required
+def job_output(request, job_id):
+    """Download the file a finished job produced (export, PDF batch); only its creator and staff."""
+    job = get_object_or_404(Job, id=job_id)
+    if not request.user.is_staff and job.created_by_id != request.user.id:
+        return JsonResponse({'error': 'not allowed'}, status=403)
+    if job.status != Job.STATUS_DONE or not job.output:
+        return JsonResponse({'error': 'no output yet'}, status=404)
+    try:
+        f = job.output.open('rb')
+    except FileNotFoundError:
+        return JsonResponse({'error': 'output file is missing'}, status=404)
+    response = FileResponse(f, as_attachment=True, filename=os.path.basename(job.output.name))
+    response['Cache-Control'] = 'private, no-store'
+    return response
+
+
+def used_question_ids(user):
+    """Ids of questions already used in this teacher's papers (for exclusion lists)."""
+    return PaperQuestion.objects.filter(
+        paper__creator=user,
+    ).values_list('question_id', flat=True)
+
+
+@login_required
+def sample_questions_json(request):
+    """Random/stratified question sample as JSON.
+
+    GET params: class_id (required), subject_ids, chapter_ids, question_type, count,
+    quotas ('chapter_id:n,...'), seed, exclude_ids, exclude_used=1.
+    """
+    class_id = request.GET.get('class_id') or ''
+    if not class_id.isdigit():
+        return JsonResponse({'error': 'class_id is required'}, status=400)
+
+    try:
+        count = min(max(int(request.GET.get('count') or 20), 0), 500)
+    except ValueError:
+        count = 20
+    seed_raw = request.GET.get('seed') or ''
+    exclude = set(parse_id_list(request.GET.get('exclude_ids')))
+    if request.GET.get('exclude_used'):
+        exclude.update(used_question_ids(request.user))
+
+    result = sample_questions(
+        class_id=int(class_id),
+        count=count,
+        subject_ids=parse_id_list(request.GET.get('subject_ids') or request.GET.get('subject_id')),
+        chapter_ids=parse_id_list(request.GET.get('chapter_ids') or request.GET.get('chapter_id')),
+        question_type=request.GET.get('question_type'),
+        quotas=parse_quotas(request.GET.get('quotas')),
+        seed=int(seed_raw) if seed_raw.isdigit() else None,
+        exclude=exclude,
+    )
+    return JsonResponse(result.as_dict())
+
+
 # ---------------------------------
 # --- AJAX Helper Views ---
 # ---------------------------------
 
+@location_conditional
 def ajax_load_districts(request):
     """Provides a list of districts based on the selected division for AJAX calls."""
-    division = request.GET.get('division')
-    districts = list(BANGLADESH_DIVISIONS_DISTRICTS_THANAS.get(division, {}).keys())
-    return JsonResponse(districts, safe=False)
+    return JsonResponse(locations.districts(request.GET.get('division')), safe=False)
 
 
+@location_conditional
 def ajax_load_thanas(request):
     """Provides a list of thanas based on the selected division and district for AJAX calls."""
-    division = request.GET.get('division')
-    district = request.GET.get('district')
-    thanas = []
-    if division and district:
-        thanas = BANGLADESH_DIVISIONS_DISTRICTS_THANAS.get(division, {}).get(district, [])
+    thanas = locations.thanas(request.GET.get('division'), request.GET.get('district'))
     return JsonResponse(thanas, safe=False)
 
 
+@taxonomy_conditional
 def ajax_load_subjects(request):
     class_id = request.GET.get('class_id')
-    subjects = Subject.objects.filter(class_name_id=class_id).values('id', 'name')
-    return JsonResponse(list(subjects), safe=False)
+    return JsonResponse(taxonomy.get_subjects(class_id), safe=False)
 
+@taxonomy_conditional
 def ajax_load_chapters(request):
     subject_id = request.GET.get('subject_id')
-    chapters = Chapter.objects.filter(subject_id=subject_id).values('id', 'name') if subject_id else []
-    return JsonResponse(list(chapters), safe=False)
+    return JsonResponse(taxonomy.get_chapters(subject_id), safe=False)
+
+
+@taxonomy_conditional
+def ajax_load_class_tree(request):
+    """Whole taxonomy of one class (subjects with their chapters) in one response."""
+    tree = taxonomy.class_tree(request.GET.get('class_id'))
+    if tree is None:
+        return JsonResponse({'error': 'invalid class'}, status=404)
+    return JsonResponse(tree)
+
+
+@login_required
+def ajax_question_counts(request):
+    """Available questions of a class per subject and chapter, by type, from the counter table."""
+    class_id = request.GET.get('class_id') or ''
+    if not class_id.isdigit():
+        return JsonResponse({'error': 'class_id is required'}, status=400)
+    return JsonResponse(availability.class_counts(int(class_id)))
 
 
 @login_required
@@ -472,28 +711,21 @@ def create_question_from_modal(request):
       - subjects (optional, multiple)
       - chapters (optional, multiple)
 
-    Returns JSON {created: n, errors: [..]}.
+    One question is stored per selected subject and linked to its selected
+    chapters. Validation is core.authoring.validate_item: an MCQ needs at
+    least two options, and correct_option (a-d or ক-ঘ) must name one of them.
+    Returns JSON {created: n, errors: [..]}; status 400 when nothing could be
+    saved because the input is invalid.
     """
     class_id = request.POST.get('class_id') or request.POST.get('class')
     if not class_id:
         return JsonResponse({'error': 'class_id is required'}, status=400)
-
-    try:
-        class_obj = ClassName.objects.get(id=int(class_id))
-    except (ClassName.DoesNotExist, ValueError):
+    if taxonomy.get_class(class_id) is None:
         return JsonResponse({'error': 'invalid class'}, status=400)
-
     text = (request.POST.get('text') or '').strip()
     if not text:
         return JsonResponse({'error': 'question text is required'}, status=400)
 
-    question_type = request.POST.get('question_type') or 'mcq'
-    option_a = request.POST.get('option_a') or None
-    option_b = request.POST.get('option_b') or None
-    option_c = request.POST.get('option_c') or None
-    option_d = request.POST.get('option_d') or None
-    correct_option = (request.POST.get('correct_option') or '').strip() or None
-
     subjects = request.POST.getlist('subjects')
     chapters = request.POST.getlist('chapters')
 
@@ -507,79 +739,127 @@ def create_question_from_modal(request):
         if cur_chap:
             chapters = [cur_chap]
 
-    subj_qs = Subject.objects.filter(id__in=subjects, class_name=class_obj) if subjects else None
-    chap_qs = Chapter.objects.filter(id__in=chapters) if chapters else None
+    # অধ্যায়গুলো ক্যাশ করা taxonomy থেকে বিষয় অনুযায়ী ভাগ করা হয় — আলাদা query লাগে না
+    chapters_by_subject = {}
+    for chapter_id in chapters:
+        chapter = taxonomy.get_chapter(chapter_id)
+        if chapter:
+            chapters_by_subject.setdefault(chapter['subject_id'], []).append(chapter['id'])
+    subject_ids = parse_id_list(','.join(subjects)) or list(chapters_by_subject)
+    if not subject_ids:
+        return JsonResponse({'created': 0, 'errors': ['subject is required']}, status=400)
+    if subjects and chapters:
+        # আগের মতোই: বিষয় × অধ্যায় — যে বিষয়ের কোনো অধ্যায় বাছাই হয়নি সেটি বাদ
+        subject_ids = [sid for sid in subject_ids if sid in chapters_by_subject]
+
+    base = {
+        'class': class_id,
+        'text': text,
+        'question_type': request.POST.get('question_type') or 'mcq',
+        'correct_option': request.POST.get('correct_option'),
+        **{f'option_{k}': request.POST.get(f'option_{k}') for k in 'abcd'},
+    }
+    results = authoring.create_questions(
+        [dict(base, subject=sid, chapters=chapters_by_subject.get(sid, [])) for sid in subject_ids]
+    )
+    return JsonResponse({
+        'created': sum(1 for r in results if r.get('created')),
+        'errors': [e for r in results for e in r.get('errors', [])],
+    }, status=200 if any(r['ok'] for r in results) else 400)
 
-    created = 0
-    errors = []
 
-    # Create per combinations similar to admin behavior
-    try:
-        if subj_qs and chap_qs:
-            for s in subj_qs:
-                for ch in chap_qs.filter(subject_id=s.id):
-                    Question.objects.create(
-                        text=text,
-                        question_type=question_type,
-                        class_name=class_obj,
-                        subject=s,
-                        chapter=ch,
-                        option_a=option_a,
-                        option_b=option_b,
-                        option_c=option_c,
-                        option_d=option_d,
-                        correct_option=correct_option
-                    )
-                    created += 1
-        elif subj_qs:
-            for s in subj_qs:
-                Question.objects.create(
-                    text=text,
-                    question_type=question_type,
-                    class_name=class_obj,
-                    subject=s,
-                    chapter=None,
-                    option_a=option_a,
-                    option_b=option_b,
-                    option_c=option_c,
-                    option_d=option_d,
-                    correct_option=correct_option
-                )
-                created += 1
-        elif chap_qs:
-            for ch in chap_qs:
-                Question.objects.create(
-                    text=text,
-                    question_type=question_type,
-                    class_name=class_obj,
-                    subject=ch.subject,
-                    chapter=ch,
-                    option_a=option_a,
-                    option_b=option_b,
-                    option_c=option_c,
-                    option_d=option_d,
-                    correct_option=correct_option
-                )
-                created += 1
-        else:
-            # no subjects/chapters provided — create single question in no-subject state (not ideal)
-            Question.objects.create(
-                text=text,
-                question_type=question_type,
-                class_name=class_obj,
-                subject=None,
-                chapter=None,
-                option_a=option_a,
-                option_b=option_b,
-                option_c=option_c,
-                option_d=option_d,
-                correct_option=correct_option
-            )
-            created = 1
-    except Exception as e:
-        errors.append(str(e))
+def _api_user(request):
+    """Session user, or the user mapped to the request's `Authorization: Bearer <token>`."""
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        username = getattr(settings, 'AUTHORING_API_TOKENS', {}).get(header[7:].strip())
+        return User.objects.filter(username=username, is_active=True).first() if username else None
+    return request.user if request.user.is_authenticated else None
 
-    return JsonResponse({'created': created, 'errors': errors})
+
+@csrf_exempt
+@require_POST
+def api_create_questions(request):
+    """Batch authoring API: JSON array of questions (or {"questions": [...], "all_or_nothing": true}).
+
+    Token clients skip CSRF; session clients must still send the CSRF token.
+    """
+    user = _api_user(request)
+    if user is None:
+        return JsonResponse({'error': 'authentication required'}, status=401)
+    if 'Authorization' not in request.headers:
+        rejected = CsrfViewMiddleware(lambda r: None).process_view(request, None, (), {})
+        if rejected is not None:
+            return rejected
+    if not (user.is_staff or user.has_perm('core.add_question')):
+        return JsonResponse({'error': 'not allowed'}, status=403)
+
+    try:
+        payload = json.loads(request.body or b'null')
+    except ValueError as e:
+        return JsonResponse({'error': f'invalid JSON: {e}'}, status=400)
+    all_or_nothing = False
+    if isinstance(payload, dict):
+        all_or_nothing = bool(payload.get('all_or_nothing'))
+        payload = payload.get('questions')
+    if not isinstance(payload, list) or not payload:
+        return JsonResponse({'error': 'expected a non-empty array of questions'}, status=400)
+    if len(payload) > authoring.MAX_BATCH_SIZE:
+        return JsonResponse({'error': f'at most {authoring.MAX_BATCH_SIZE} questions per request'}, status=413)
+
+    results = authoring.create_questions(payload, all_or_nothing=all_or_nothing)
+    saved = sum(1 for r in results if r['ok'])
+    return JsonResponse({
+        'created': sum(1 for r in results if r.get('created')),
+        'existing': sum(1 for r in results if r['ok'] and not r['created']),
+        'failed': len(results) - saved,
+        'results': results,
+    }, status=201 if saved else 400)
+
+
+@require_GET
+def export_questions(request):
+    """Stream questions as CSV/JSONL with the upload_csv columns (session or API token).
+
+    GET params: format (csv | jsonl), gzip=1, class_id, subject_id, chapter_ids
+    (comma-separated), question_type, all_chapters=0 (one row with the primary
+    chapter instead of one per linked chapter). With background=1 the export
+    runs as a worker job instead: 202 with the job's status URL, and the file
+    comes from job_output when it is done.
+    """
+    user = _api_user(request)
+    if user is None:
+        return JsonResponse({'error': 'authentication required'}, status=401)
+    if not (user.is_staff or user.has_perm('core.view_question')):
+        return JsonResponse({'error': 'not allowed'}, status=403)
+    fmt = request.GET.get('format') or 'csv'
+    if fmt not in exporters.FORMATS:
+        return JsonResponse({'error': f'format must be one of {", ".join(exporters.FORMATS)}'}, status=400)
+
+    def int_param(name):
+        value = request.GET.get(name) or ''
+        return int(value) if value.isdigit() else None
+
+    compress = request.GET.get('gzip') in ('1', 'true')
+    filters = dict(
+        class_id=int_param('class_id'),
+        subject_id=int_param('subject_id'),
+        chapter_ids=[int(x) for x in (request.GET.get('chapter_ids') or '').split(',') if x.strip().isdigit()],
+        question_type=request.GET.get('question_type'),
+        all_chapters=request.GET.get('all_chapters') not in ('0', 'false'),
+    )
+    if request.GET.get('background') in ('1', 'true'):
+        job = enqueue('export_questions', payload={'format': fmt, 'gzip': compress, **filters}, user=user)
+        return JsonResponse({'job_id': job.id, 'status_url': reverse('job_status', args=[job.id])}, status=202)
+    queryset = exporters.export_queryset(**filters)
+    # বডি লেখার সময় query চলে, তাই পুরো ব্যাংকও স্থির মেমরিতে যায়
+    response = StreamingHttpResponse(
+        exporters.stream_export(queryset, fmt, compress=compress),
+        content_type='application/gzip' if compress else exporters.CONTENT_TYPES[fmt],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{exporters.export_filename(fmt, compress)}"'
+    response['Cache-Control'] = 'private, no-store'
+    return response
 
 
 @login_required
@@ -604,70 +884,3 @@ def delete_paper(request, paper_id):
             'success': False,
             'message': f'একটি সমস্যা হয়েছে: {str(e)}'
         }, status=500)
-
-from django.shortcuts import render
-from django.apps import apps
-from core.models import Question
-
-# try to load optional models; if missing, fallback to deriving lists from Question records
-try:
-    ClassLevel = apps.get_model('core', 'ClassLevel')
-except LookupError:
-    ClassLevel = None
-
-try:
-    Subject = apps.get_model('core', 'Subject')
-except LookupError:
-    Subject = None
-
-def teacher_select_questions(request):
-    # build classes and subjects lists — prefer real models if available,
-    # otherwise derive from Question records so page still works.
-    if ClassLevel is not None:
-        classes = ClassLevel.objects.all()
-    else:
-        # list of dicts with id/name keys (template can use c.id and c.name)
-        classes = []
-        for c in Question.objects.values('class_name_id', 'class_name__name').distinct().order_by('class_name_id'):
-            classes.append({'id': c['class_name_id'], 'name': c.get('class_name__name') or f'Class {c["class_name_id"]}'})
-    if Subject is not None:
-        subjects = Subject.objects.all()
-    else:
-        subjects = []
-        for s in Question.objects.values('subject_id', 'subject__name').distinct().order_by('subject_id'):
-            subjects.append({'id': s['subject_id'], 'name': s.get('subject__name') or f'Subject {s["subject_id"]}'})
-
-    questions = []
-    show_questions = False
-
-    class_id = request.GET.get('class_id')
-    subject_id = request.GET.get('subject_id')
-    qcount = int(request.GET.get('question_count') or 20)
-    qtype = request.GET.get('question_type')
-    chapter_ids = request.GET.get('chapter_ids')
-
-    if class_id and subject_id:
-        qs = Question.objects.filter(class_name_id=class_id, subject_id=subject_id)
-        if qtype:
-            qs = qs.filter(question_type__iexact=qtype)
-        if chapter_ids:
-            ids = [int(x) for x in chapter_ids.split(',') if x.strip()]
-            qs = qs.filter(chapter__id__in=ids)
-        questions = qs.order_by('id')[:qcount]
-        show_questions = True
-    else:
-        # fallback: show recent questions so page never empty during testing
-        qs = Question.objects.all().order_by('-id')
-        if qs.exists():
-            questions = qs[:qcount]
-            show_questions = True
-
-    return render(request, 'core/teacher_select_questions.html', {
-        'classes': classes,
-        'subjects': subjects,
-        'questions': questions,
-        'show_questions': show_questions,
-    })
-
-
-
@@ -2,6 +2,14 @@
 ASGI config for question_bank project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+By default it uses question_bank.settings, like wsgi.py. The ASGI profile
+(question_bank.settings_asgi), which serves the hot read endpoints from async
+views, is opt-in; measure it with `manage.py benchmark_concurrency` against
+the real database before switching:
+
+    DJANGO_SETTINGS_MODULE=question_bank.settings_asgi uvicorn question_bank.asgi:application --workers 4
+    DJANGO_SETTINGS_MODULE=question_bank.settings_asgi \
+        gunicorn question_bank.asgi:application -k uvicorn.workers.UvicornWorker -w 4
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
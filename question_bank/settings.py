@@ -40,6 +40,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # সবার আগে, যাতে session/auth query-ও গোনা হয়
+    'core.query_budget.QueryBudgetMiddleware',
+    # session-এর আগে, যাতে লগইনের session write-ও read-your-writes কুকি পায়
+    'core.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -51,6 +55,34 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'question_bank.urls'
 
+# প্রতি URL name-এ সর্বোচ্চ query সংখ্যা; বেশি হলে লগ (টেস্টে ফেল)
+QUERY_BUDGET_DEFAULT = 30
+# (session + user = 2 query প্রায় সব পেজে; taxonomy ক্যাশ ঠান্ডা থাকলে +3)
+QUERY_BUDGETS = {
+    'dashboard': 4,
+    'dashboard_stats': 8,
+    'question': 6,
+    'teacher_select_questions': 7,
+    'teacher_search_questions': 6,
+    'sample_questions': 7,
+    'prepare_paper': 15,
+    'my_papers_list': 5,
+    'paper_detail': 6,
+    'paper_pdf': 6,
+    'papers_pdf_batch': 5,
+    # প্রশ্ন + অধ্যায় লিংক + সার্চ ইনডেক্স + MinHash signature/bucket + গণনা (SELECT, UPDATE)
+    'api_create_questions': 15,
+    'job_status': 4,
+    'job_output': 4,
+    'ajax_load_subjects': 3,
+    'ajax_load_chapters': 3,
+    'ajax_load_class_tree': 3,
+    'ajax_question_counts': 3,
+    'ajax_load_districts': 0,
+    'ajax_load_thanas': 0,
+}
+TEST_RUNNER = 'core.testing.QueryBudgetTestRunner'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -83,6 +115,24 @@ DATABASES = {
     }
 }
 
+# Read replica — DATABASES-এ replica alias যোগ করে তার নাম DATABASE_REPLICAS-এ দিন, যেমন:
+#   DATABASES['replica'] = {**DATABASES['default'], 'HOST': 'replica.internal', 'TEST': {'MIRROR': 'default'}}
+#   DATABASE_REPLICAS = ['replica']
+# write-এর পরে এত সেকেন্ড সেই ব্যবহারকারীর read primary থেকে হয় (replica lag ঢাকতে)
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+DATABASE_REPLICAS = []
+REPLICA_PIN_SECONDS = 5
+
+# Cache — workers একই হোস্টে ফাইল ক্যাশ শেয়ার করে (taxonomy ট্রি ইত্যাদি)
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache',
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -117,9 +167,31 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+# ব্যাকগ্রাউন্ড job-এর আপলোড/এক্সপোর্ট আর PDF ক্যাশ — ওয়েব সার্ভার থেকে সরাসরি serve হয় না,
+# শুধু লগইন করা মালিক `job_output` view দিয়ে পায়
+PRIVATE_MEDIA_ROOT = BASE_DIR / 'private_media'
 LOGIN_REDIRECT_URL = 'dashboard'  # Name of the URL to redirect to after a successful login
 LOGOUT_REDIRECT_URL = 'login'  # Name of the URL to redirect to after a logout
 LOGIN_URL = 'login'  # Name of the URL to redirect to for pages that require login
+# CSV/bulk ইমপোর্টে প্রতি transaction-এ কয়টি প্রশ্ন bulk_create হবে
+QUESTION_IMPORT_BATCH_SIZE = 1000
+# `manage.py run_workers` — worker process সংখ্যা ও খালি queue-তে অপেক্ষার সময় (সেকেন্ড)
+JOB_WORKERS = 2
+JOB_POLL_INTERVAL = 2.0
+# এত সেকেন্ড heartbeat না এলে চলমান job আবার queue-তে যায়; JOB_MAX_ATTEMPTS বার চেষ্টার পর ব্যর্থ
+JOB_STALE_SECONDS = 600
+JOB_MAX_ATTEMPTS = 3
+# সার্ভারে তৈরি পেপার PDF — বাংলা ফন্ট (HindSiliguri-*.ttf) এর ফোল্ডার ও content-hash ক্যাশ
+PAPER_PDF_FONT_DIR = BASE_DIR / 'static' / 'fonts'
+PAPER_PDF_CACHE_DIR = PRIVATE_MEDIA_ROOT / 'pdf_cache'
+# JSON batch authoring API — প্রতি request-এ সর্বোচ্চ কয়টি প্রশ্ন, আর বাইরের টুলের token -> username
+AUTHORING_MAX_BATCH = 1000
+AUTHORING_API_TOKENS = {}
+# প্রায়-একই প্রশ্ন (MinHash মিল) — কত মিল হলে ধরা হবে, আর ইমপোর্টে কী করা হবে: flag | skip | off
+NEAR_DUPLICATE_THRESHOLD = 0.8
+NEAR_DUPLICATE_MODE = 'flag'
 # AUTH_USER_MODEL = 'core.CustomUser'
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -0,0 +1,16 @@
+"""
+ASGI deployment profile.
+
+Everything from question_bank.settings, plus the URLconf that routes the hot
+read endpoints (AJAX lookups, question selection and search, paper listing)
+to async views. Opt-in: set DJANGO_SETTINGS_MODULE=question_bank.settings_asgi
+for the ASGI server (question_bank/asgi.py defaults to question_bank.settings).
+"""
+from question_bank.settings import *  # noqa: F401,F403
+from question_bank.settings import DATABASES
+
+ROOT_URLCONF = 'question_bank.urls_asgi'
+
+# async মোডে প্রতিটি request আলাদা thread-sensitive context-এ query চালায়; সেই thread-এর
+# persistent connection পরে আর কেউ বন্ধ করে না, তাই connection প্রতি request-এ খোলা-বন্ধ হয়
+DATABASES = {alias: dict(db, CONN_MAX_AGE=0) for alias, db in DATABASES.items()}
@@ -17,12 +17,14 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from core.taxonomy import chaining_urlpatterns
 from core.views import landing_page
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', landing_page, name='landing_page'),
     path('accounts/', include('core.urls')),
-    path('chaining/', include('smart_selects.urls')),  # এই লাইনটি যোগ করুন
+    # smart_selects-এর chaining endpoint, taxonomy ভার্সন অনুযায়ী ক্যাশ করা
+    path('chaining/', include(chaining_urlpatterns())),
 
 ]
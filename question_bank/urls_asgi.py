@@ -0,0 +1,13 @@
+"""
+URL configuration for the ASGI profile (question_bank.settings_asgi).
+
+Same routes as question_bank.urls; the hot read endpoints under accounts/
+resolve to the async views in core.async_views first.
+"""
+from django.urls import path, include
+
+from question_bank.urls import urlpatterns as wsgi_urlpatterns
+
+urlpatterns = [
+    path('accounts/', include('core.urls_async')),
+] + [p for p in wsgi_urlpatterns if str(p.pattern) != 'accounts/']
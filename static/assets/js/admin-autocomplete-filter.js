@@ -0,0 +1,15 @@
+'use strict';
+// core.changelist.AutocompleteListFilter: নির্বাচিত id দিয়ে changelist আবার লোড করা
+{
+    const $ = django.jQuery;
+
+    $(function() {
+        $('.autocomplete-list-filter').on('change', function() {
+            const params = new URLSearchParams(this.dataset.queryString);
+            if (this.value) {
+                params.set(this.dataset.param, this.value);
+            }
+            window.location.search = params.toString();
+        });
+    });
+}